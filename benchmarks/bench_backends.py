@@ -0,0 +1,91 @@
+'''
+Benchmark and equivalence matrix for the compute backends of the path dependent kernels, see ts.use_backend.
+Every kernel and every public function built on one is run under each backend on the same synthetic inputs,
+float32 and float64 where the kernel takes both, and the outputs must be identical to the numpy backend bit for bit,
+NaN positions included, before anything is timed. Compile time is excluded, each backend is warmed up first.
+
+Example:
+python benchmarks/bench_backends.py
+python benchmarks/bench_backends.py --sizes 1e3 1e6 --backends numpy numba
+'''
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import trade_strat as ts
+from trade_strat.indicators.chunked import ema_chunked, rsi_chunked
+from synthetic import synthetic_ohlc
+
+#chunk rows for the chunked case, several chunks per history so the carried state is exercised
+CHUNK_ROWS = 4_096
+
+def chunked_ema(close):
+    ema = ema_chunked(ema_period = 21)
+    return np.concatenate([ema.update(close[start:start + CHUNK_ROWS]) for start in range(0, close.shape[0], CHUNK_ROWS)])
+
+def chunked_rsi(close):
+    rsi = rsi_chunked(length = 14)
+    return np.concatenate([rsi.update(close[start:start + CHUNK_ROWS]) for start in range(0, close.shape[0], CHUNK_ROWS)])
+
+#name -> function(close, pivots) returning a numpy array, kernels on their own then the functions that call them
+CASES = {
+    'seeded_ema_kernel': lambda close, pivots: ts.seeded_ema_kernel(data = close, length = 21),
+    'ema_kernel float64': lambda close, pivots: ts.ema_kernel(data = close, period = 21),
+    'ema_kernel float32': lambda close, pivots: ts.ema_kernel(data = close, period = 21, dtype = np.float32),
+    'ema_kernel with NaN': lambda close, pivots: ts.ema_kernel(data = np.where(np.arange(close.shape[0]) % 97 == 5, np.nan, close), period = 21),
+    'rsi_kernel': lambda close, pivots: ts.rsi_kernel(data = close, length = 14),
+    'stoch_rsi_kernel': lambda close, pivots: ts.stoch_rsi_kernel(data = close, length = 14, rsi_length = 14, k = 3, d = 3),
+    'ema_chunked': lambda close, pivots: chunked_ema(close),
+    'rsi_chunked': lambda close, pivots: chunked_rsi(close),
+    'ewm_update ema_stream': lambda close, pivots: ts.ema_stream(ema_period = 21).update_many(close),
+    'ewm_update rsi_stream': lambda close, pivots: ts.rsi_stream(rsi_len = 14).update_many(close),
+    'pivot_trend': lambda close, pivots: ts.pivot_trend(input_col = pivots),
+}
+
+def best_time(func, min_time = 0.2, max_runs = 20):
+    '''
+    Best and median of repeated runs, at least one run and at most max_runs or min_time seconds.
+    '''
+    timings = []
+    while len(timings) == 0 or (len(timings) < max_runs and sum(timings) < min_time):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), statistics.median(timings)
+
+def main():
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5, 1e6], help='bar counts')
+    parser.add_argument('--backends', nargs='+', default=['numpy', 'numba'], help='backends to compare, the first is the reference')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed')
+    args = parser.parse_args()
+
+    previous = ts.active_backend()
+    try:
+        for n_bars in [int(size) for size in args.sizes]:
+            close = synthetic_ohlc(n_bars = n_bars, seed = args.seed)['Close'].to_numpy()
+            #sparse column of the fast rsi pivot highs, as Local Max in double_rsi
+            is_high, _ = ts.pivot_points(data_col = ts.rsi_kernel(data = close, length = 2), order = 5)
+            pivots = np.where(is_high, close, np.nan)
+            print(f'\nbars={n_bars:,}')
+            for name, case in CASES.items():
+                timings = []
+                for backend in args.backends:
+                    ts.use_backend(name = backend)
+                    result = case(close, pivots)
+                    if backend == args.backends[0]:
+                        expected = result
+                    elif result.dtype != expected.dtype or not np.array_equal(result, expected, equal_nan = True):
+                        raise AssertionError(f'{name}: {backend} differs from {args.backends[0]}')
+                    timings.append(best_time(lambda: case(close, pivots))[0])
+                columns = '  '.join(f'{backend} {t * 1e3:9.3f} ms' for backend, t in zip(args.backends, timings))
+                print(f'  {name:25s} {columns}  x{timings[0] / timings[-1]:7.1f}  identical')
+    finally:
+        ts.use_backend(name = previous)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+'''
+Import time regression benchmark for trade_strat.
+Each scenario runs in a fresh interpreter so module caches do not hide the cost, the median of several runs is reported.
+Light scenarios also check that pandas, scipy and pandas_ta were not imported.
+
+Example:
+python benchmarks/bench_import.py
+python benchmarks/bench_import.py --max-ms 50
+'''
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'scipy', 'pandas_ta']
+
+#name -> (statement timed after interpreter start, heavy modules allowed afterwards)
+SCENARIOS = {
+    'import trade_strat': ('import trade_strat', False),
+    'trade_strat.crossover': ('import trade_strat as ts; ts.crossover', False),
+    'trade_strat.grad_check': ('import trade_strat as ts; ts.grad_check', False),
+    'trade_strat.double_rsi': ('import trade_strat as ts; ts.double_rsi', False),
+    'trade_strat.core': ('import trade_strat.core', False),
+}
+
+PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{'ms': elapsed * 1e3, 'heavy': [m for m in {heavy} if m in sys.modules]}}))
+'''
+
+def run_scenario(statement, repeats):
+    '''
+    Median import time in ms and the heavy modules loaded, over fresh interpreters.
+    '''
+    timings = []
+    heavy = []
+    for _ in range(repeats):
+        code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result['ms'])
+        heavy = result['heavy']
+    return statistics.median(timings), heavy
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if "import trade_strat" is slower than this')
+    args = parser.parse_args()
+
+    failed = False
+    for name, (statement, heavy_allowed) in SCENARIOS.items():
+        ms, heavy = run_scenario(statement, args.repeats)
+        flag = ''
+        if heavy and not heavy_allowed:
+            flag = f'  FAIL heavy modules imported: {heavy}'
+            failed = True
+        print(f'{name:<28} {ms:8.1f} ms{flag}')
+
+        if name == 'import trade_strat' and args.max_ms is not None and ms > args.max_ms:
+            print(f'FAIL import trade_strat took {ms:.1f} ms, limit {args.max_ms:.1f} ms')
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+'''
+Benchmark of the async ingestion pipeline against the sequential loader, fetch a symbol then scan it then fetch the next.
+Bars come from a mock_feed with a fixed latency per fetch, standing in for a market data API, so the benchmark
+measures how much waiting the pipeline hides behind scanning. Both runs must return the same signals.
+Reports the time to the first result and the time for the whole universe.
+
+Example:
+python benchmarks/bench_ingest.py
+python benchmarks/bench_ingest.py --symbols 500 --bars 5000 --latency 0.05 --workers 4
+'''
+
+import argparse
+import asyncio
+import time
+
+import pandas as pd
+
+import trade_strat as ts
+from synthetic import synthetic_ohlc
+
+async def sequential(feed, symbols):
+    '''
+    The loader the pipeline replaces, returns (seconds to first result, results).
+    '''
+    t0 = time.perf_counter()
+    first = None
+    results = {}
+    for symbol in symbols:
+        df = await feed.fetch(symbol)
+        results[symbol] = ts.double_rsi(df_scan = df, output = 'compact').run_scan()
+        first = first or time.perf_counter() - t0
+    return first, results
+
+async def pipelined(feed, args):
+    t0 = time.perf_counter()
+    first = None
+    results = {}
+    pipeline = ts.scan_pipeline(source = feed, strategy = ts.double_rsi, workers = args.workers, fetch_concurrency = args.fetch_concurrency)
+    async for symbol, df_signals in pipeline:
+        results[symbol] = df_signals
+        first = first or time.perf_counter() - t0
+    return first, results
+
+def main():
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=200, help='symbols in the universe')
+    parser.add_argument('--bars', type=int, default=2000, help='bars per symbol')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per fetch')
+    parser.add_argument('--workers', type=int, default=None, help='scans in flight - default cpu count')
+    parser.add_argument('--fetch-concurrency', type=int, default=16, help='fetches in flight')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed')
+    args = parser.parse_args()
+
+    frames = {f'SYM{i:05d}': synthetic_ohlc(n_bars = args.bars, seed = args.seed + i) for i in range(args.symbols)}
+    symbols = list(frames)
+    ts.default_cache.enabled = False
+    #imports and kernel compiles are not timed
+    ts.double_rsi(df_scan = frames[symbols[0]], output = 'compact').run_scan()
+
+    t0 = time.perf_counter()
+    seq_first, expected = asyncio.run(sequential(ts.mock_feed(data = frames, latency = args.latency), symbols))
+    seq_total = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pipe_first, results = asyncio.run(pipelined(ts.mock_feed(data = frames, latency = args.latency), args))
+    pipe_total = time.perf_counter() - t0
+
+    if sorted(results) != sorted(expected):
+        raise AssertionError('pipeline returned different symbols')
+    for symbol, df_signals in results.items():
+        pd.testing.assert_frame_equal(df_signals, expected[symbol])
+
+    print(f'symbols={args.symbols} bars={args.bars} latency={args.latency * 1e3:.0f} ms')
+    print(f'  sequential  first {seq_first * 1e3:9.1f} ms  total {seq_total:8.3f} s')
+    print(f'  pipeline    first {pipe_first * 1e3:9.1f} ms  total {pipe_total:8.3f} s  x{seq_total / pipe_total:5.1f}')
+
+if __name__ == '__main__':
+    main()
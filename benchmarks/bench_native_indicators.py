@@ -0,0 +1,75 @@
+'''
+Benchmark for the first party RSI, StochRSI and seeded EMA kernels against pandas_ta, which they replace by default.
+Every size and parameter set is first checked to be bit for bit identical to pandas_ta on the same closes,
+NaN positions included, then both are timed. Needs pandas_ta installed, the kernels themselves do not.
+The equivalence itself is tested in tests/test_native_indicators.py.
+
+Example:
+python benchmarks/bench_native_indicators.py
+python benchmarks/bench_native_indicators.py --sizes 1e3 1e5
+'''
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import trade_strat as ts
+from synthetic import synthetic_ohlc
+
+try:
+    import pandas_ta as pta
+except ImportError:
+    sys.exit('pandas_ta is not installed, nothing to compare against')
+
+CASES = [
+    ('rsi', dict(length = 2), lambda close, p: pta.rsi(close = close, **p), lambda x, p: ts.rsi_kernel(data = x, **p)),
+    ('rsi', dict(length = 14), lambda close, p: pta.rsi(close = close, **p), lambda x, p: ts.rsi_kernel(data = x, **p)),
+    ('stochrsi', dict(length = 14, rsi_length = 14, k = 3, d = 3), lambda close, p: pta.stochrsi(close = close, **p), lambda x, p: ts.stoch_rsi_kernel(data = x, **p)),
+    ('stochrsi', dict(length = 14, rsi_length = 3, k = 3, d = 3), lambda close, p: pta.stochrsi(close = close, **p), lambda x, p: ts.stoch_rsi_kernel(data = x, **p)),
+    ('pta_ema', dict(length = 21), lambda close, p: pta.ema(close = close, **p), lambda x, p: ts.seeded_ema_kernel(data = x, **p)),
+    ('pta_ema', dict(length = 200), lambda close, p: pta.ema(close = close, **p), lambda x, p: ts.seeded_ema_kernel(data = x, **p)),
+]
+
+def best_time(func, min_time = 0.2, max_runs = 20):
+    '''
+    Best and median of repeated runs, at least one run and at most max_runs or min_time seconds.
+    '''
+    timings = []
+    while len(timings) == 0 or (len(timings) < max_runs and sum(timings) < min_time):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), statistics.median(timings)
+
+def check(expected, result):
+    '''
+    Raises unless the kernel output is identical to pandas_ta, NaN positions included.
+    '''
+    expected = np.asarray(expected, dtype=float).reshape(result.shape)
+    if not np.array_equal(expected, result, equal_nan=True):
+        raise AssertionError('kernel output differs from pandas_ta')
+
+def main():
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5, 1e6], help='bar counts')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed')
+    args = parser.parse_args()
+
+    for n_bars in [int(size) for size in args.sizes]:
+        close = synthetic_ohlc(n_bars = n_bars, seed = args.seed)['Close'].reset_index(drop=True)
+        x = close.to_numpy()
+        print(f'\nbars={n_bars:,}')
+        for name, params, reference, native in CASES:
+            check(reference(close, params), native(x, params))
+            ref_min, _ = best_time(lambda: reference(close, params))
+            nat_min, _ = best_time(lambda: native(x, params))
+            label = f"{name}({', '.join(f'{k}={v}' for k, v in params.items())})"
+            print(f'  {label:45s} pandas_ta {ref_min * 1e3:9.3f} ms  native {nat_min * 1e3:9.3f} ms  x{ref_min / nat_min:6.1f}  identical')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+'''
+Benchmark for pivot_trend against the row by row loop it replaced in double_rsi.run_scan.
+The legacy loop is only timed on the smallest size, larger sizes take minutes to hours.
+Every size is checked for identical output against a plain python reference before timing.
+
+Example:
+python benchmarks/bench_pivot_trend.py
+'''
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+import trade_strat as ts
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+LEGACY_MAX_ROWS = 10_000
+
+def legacy_iterrows(df):
+    '''
+    Copy of the original iterrows state machine from double_rsi.run_scan.
+    '''
+    df['Higher High'] = False
+    df['Higher Low'] = False
+
+    rsi_low_ref = False
+    rsi_high_ref = False
+    higher_high = False
+    higher_low = False
+
+    for i, row in df.iterrows():
+
+        if math.isnan(df.at[i,'RSI Trend Max']) == False:
+            if rsi_high_ref == False:
+                rsi_high_second = df.at[i,'RSI Trend Max']
+                rsi_high_ref = True
+            else:
+                rsi_high_first = rsi_high_second
+                rsi_high_second = df.at[i,'RSI Trend Max']
+                higher_high = rsi_high_first < rsi_high_second
+
+        if math.isnan(df.at[i,'RSI Trend Min']) == False:
+            if rsi_low_ref == False:
+                rsi_low_second = df.at[i,'RSI Trend Min']
+                rsi_low_ref = True
+            else:
+                rsi_low_first = rsi_low_second
+                rsi_low_second = df.at[i,'RSI Trend Min']
+                higher_low = rsi_low_first < rsi_low_second
+
+        df.at[i,'Higher Low'] = higher_low
+        df.at[i,'Higher High'] = higher_high
+
+    return df['Higher High'].to_numpy(), df['Higher Low'].to_numpy()
+
+def reference_loop(x):
+    '''
+    Same state machine as the legacy loop over a plain numpy array, fast enough to verify every size.
+    '''
+    out = np.zeros(x.shape[0], dtype=bool)
+    prev = None
+    state = False
+    for i, v in enumerate(x.tolist()):
+        if not math.isnan(v):
+            if prev is not None:
+                state = prev < v
+            prev = v
+        out[i] = state
+    return out
+
+def sparse_pivots(n, rng):
+    '''
+    RSI like values with roughly one pivot every 20 rows, NaN elsewhere.
+    '''
+    x = np.full(n, np.nan)
+    idx = np.flatnonzero(rng.random(n) < 0.05)
+    x[idx] = rng.uniform(0, 100, idx.shape[0])
+    return x
+
+def main():
+    rng = np.random.default_rng(42)
+
+    for n in SIZES:
+        trend_max = sparse_pivots(n, rng)
+        trend_min = sparse_pivots(n, rng)
+
+        t0 = time.perf_counter()
+        higher_high = ts.pivot_trend(input_col = trend_max)
+        higher_low = ts.pivot_trend(input_col = trend_min)
+        t_vec = time.perf_counter() - t0
+
+        assert np.array_equal(higher_high, reference_loop(trend_max))
+        assert np.array_equal(higher_low, reference_loop(trend_min))
+
+        line = f"rows={n:>10,d}  pivot_trend={t_vec*1e3:10.2f} ms"
+
+        if n <= LEGACY_MAX_ROWS:
+            df = pd.DataFrame({'RSI Trend Max': trend_max, 'RSI Trend Min': trend_min})
+            t0 = time.perf_counter()
+            legacy_high, legacy_low = legacy_iterrows(df)
+            t_loop = time.perf_counter() - t0
+
+            assert np.array_equal(higher_high, legacy_high)
+            assert np.array_equal(higher_low, legacy_low)
+            line += f"  iterrows={t_loop*1e3:10.2f} ms  speedup={t_loop/t_vec:8.0f}x"
+
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+Benchmark of single symbol scan latency with independent indicators computed on a thread pool, see graph_executor workers.
+Each strategy scans the same synthetic bars serially and with every worker count. The output must be identical to the
+serial scan before anything is timed. Gains need a multi core machine, on one core the threaded scan
+only adds scheduling overhead. The indicator cache is switched off so every run computes its indicators.
+
+Example:
+python benchmarks/bench_threads.py
+python benchmarks/bench_threads.py --sizes 1e4 1e6 --workers 2 4 8
+'''
+
+import argparse
+import os
+import statistics
+import time
+
+import pandas as pd
+
+import trade_strat as ts
+from trade_strat.strategies.weekly_stoch_rsi import weekly_stoch_rsi
+from synthetic import synthetic_ohlc
+
+TRIPLE_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+WEEKLY_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+
+#name -> function(df, workers) returning the compact scan output
+CASES = {
+    'triple_ema_stoch_rsi': lambda df, workers: ts.triple_ema_stoch_rsi(df_scan = df, output = 'compact', workers = workers, **TRIPLE_PARAMS).run_scan(),
+    'double_rsi': lambda df, workers: ts.double_rsi(df_scan = df, output = 'compact', workers = workers).run_scan(),
+    #weekly_stoch_rsi has no Signal column, its output is the Crossover diagnostic
+    'weekly_stoch_rsi': lambda df, workers: weekly_stoch_rsi(df_scan = df, output = 'compact', diagnostics = ['Crossover'], workers = workers, **WEEKLY_PARAMS).run_scan(),
+    'run_graphs all three': lambda df, workers: ts.run_graphs(df_scan = df, workers = workers, graphs = [
+        ts.triple_ema_stoch_rsi(**TRIPLE_PARAMS).graph(), ts.double_rsi().graph(), weekly_stoch_rsi(**WEEKLY_PARAMS).graph()]),
+}
+
+def best_time(func, min_time = 0.5, max_runs = 50):
+    '''
+    Best and median of repeated runs, at least one run and at most max_runs or min_time seconds.
+    '''
+    timings = []
+    while len(timings) == 0 or (len(timings) < max_runs and sum(timings) < min_time):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), statistics.median(timings)
+
+def main():
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e4, 1e5, 1e6], help='bar counts')
+    parser.add_argument('--workers', nargs='+', type=int, default=sorted({2, 4, os.cpu_count() or 1}), help='thread counts to compare with the serial scan')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed')
+    args = parser.parse_args()
+
+    ts.default_cache.enabled = False
+    print(f'cpus={os.cpu_count()} backend={ts.active_backend()}')
+    for n_bars in [int(size) for size in args.sizes]:
+        df = synthetic_ohlc(n_bars = n_bars, seed = args.seed)
+        print(f'\nbars={n_bars:,}')
+        for name, case in CASES.items():
+            expected = case(df, None)
+            for workers in args.workers:
+                pd.testing.assert_frame_equal(case(df, workers), expected)
+
+            serial, _ = best_time(lambda: case(df, None))
+            columns = [f'serial {serial * 1e3:9.3f} ms']
+            for workers in args.workers:
+                threaded, _ = best_time(lambda: case(df, workers))
+                columns.append(f'{workers} workers {threaded * 1e3:9.3f} ms x{serial / threaded:4.2f}')
+            print(f'  {name:22s} ' + '  '.join(columns))
+
+if __name__ == '__main__':
+    main()
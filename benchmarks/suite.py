@@ -0,0 +1,401 @@
+'''
+Benchmark suite covering every public function and class in trade_strat.indicators, trade_strat.signals and trade_strat.strategies.
+Inputs come from the seeded synthetic OHLC generator, so runs on the same machine are comparable.
+Every case first runs once on a small input so lazy imports are not measured. At each size a case runs once under
+tracemalloc for its peak memory, then is timed for --min-time seconds, at most --max-runs times and at least once.
+Fresh inputs are prepared before every run, untimed.
+
+Results can be saved as a JSON baseline and later runs compared against it. A case is flagged as a regression
+when its best time or peak memory grows by more than --threshold, ignoring timing changes below --noise-ms.
+The suite also fails if a public name has no case, so new functions get benchmarked when they are added.
+
+Example:
+python benchmarks/suite.py --sizes 1e3 1e5 --save benchmarks/baseline.json
+python benchmarks/suite.py --sizes 1e3 1e5 --compare benchmarks/baseline.json --threshold 1.2
+python benchmarks/suite.py --sizes 1e7 --filter strategies.
+'''
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import cached_property
+
+import numpy as np
+
+import trade_strat as ts
+from trade_strat.strategies.weekly_stoch_rsi import weekly_stoch_rsi
+from synthetic import synthetic_ohlc
+
+SUBPACKAGES = ['indicators', 'signals', 'strategies', 'backtest', 'timeframe', 'graph']
+
+#public names that do no work of their own
+NOT_TIMED = {'register_indicator', 'default_cache', 'use_pandas_ta', 'use_backend', 'register_backend', 'active_backend', 'register_op', 'node', 'scan_graph', 'register_chunk_op'}
+
+#per bar python loops, larger sizes take minutes
+STREAM_MAX_ROWS = 100_000
+
+#signal columns per backtest, 1e7 bars would need several GB per block of columns
+BACKTEST_COLUMNS = 64
+BACKTEST_MAX_ROWS = 1_000_000
+
+#rows per chunk of the chunked classes
+CHUNK_ROWS = 65_536
+
+TRIPLE_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+WEEKLY_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+SWEEP_GRID = dict(stoch_lens = [14], stochrsi_lengths = [14], stoch_ks = [3], stoch_ds = [3], ema_slow_lens = [100, 200], ema_med_lens = [50], ema_fast_lens = [9, 21])
+
+class bench_inputs:
+
+    '''
+    Synthetic bars for one size plus derived indicator inputs, each computed once on first use.
+    '''
+
+    def __init__(self, n_bars = None, seed = 0):
+
+        self.n_bars = n_bars
+        self.bars = synthetic_ohlc(n_bars = n_bars, seed = seed)
+        self.close = self.bars['Close']
+        self.closes = self.close.to_numpy()
+
+    @cached_property
+    def emas(self):
+        return np.column_stack([ts.ema_kernel(data = self.closes, period = p) for p in (200, 50, 21)])
+
+    @cached_property
+    def ema_universe(self):
+        #the same bars split into 8 symbols, symbols x bars x series
+        return self.emas[:self.n_bars // 8 * 8].reshape(8, -1, 3)
+
+    @cached_property
+    def stoch(self):
+        k, d = ts.stoch_rsi_batch(data_col = self.closes, stoch_params = [(14, 14, 3, 3)])
+        return np.ascontiguousarray(k[:, 0]), np.ascontiguousarray(d[:, 0])
+
+    @cached_property
+    def rsi_fast(self):
+        return ts.rsi_batch(data_col = self.closes, rsi_lens = [2])[:, 0].copy()
+
+    @cached_property
+    def trend_max(self):
+        rng = np.random.default_rng(1)
+        x = np.full(self.n_bars, np.nan)
+        idx = np.flatnonzero(rng.random(self.n_bars) < 0.05)
+        x[idx] = rng.uniform(0, 100, idx.shape[0])
+        return x
+
+    @cached_property
+    def signals(self):
+        rng = np.random.default_rng(2)
+        signals = np.zeros((self.n_bars, BACKTEST_COLUMNS), dtype=np.int8)
+        idx = np.flatnonzero(rng.random(signals.size) < 0.01)
+        signals.reshape(-1)[idx] = rng.choice(np.array([-1, 1], dtype=np.int8), idx.shape[0])
+        return signals
+
+    @cached_property
+    def store(self):
+        #closes written once per size, run_chunked replaces its output columns on every run
+        self._store_dir = tempfile.TemporaryDirectory()
+        store = ts.columnar_store(path = self._store_dir.name)
+        store.write('SYN', self.bars[['Close']])
+        return store
+
+    def frame(self):
+        #strategies add columns to their input in full mode, each run gets its own copy
+        ts.default_cache.clear()
+        return self.bars[['Open', 'High', 'Low', 'Close']].copy()
+
+class bench_case:
+
+    '''
+    One benchmark, kwargs(inputs) is called untimed before every run and func(**kwargs) is timed.
+    '''
+
+    def __init__(self, name = None, func = None, kwargs = None, max_rows = None):
+
+        self.name = name
+        self.func = func
+        self.kwargs = kwargs
+        self.max_rows = max_rows
+
+    @property
+    def covers(self):
+        return self.name.split('[')[0].split('.', 1)[1]
+
+def _scan(strategy):
+    return lambda **kwargs: strategy(**kwargs).run_scan()
+
+def _update_many(stream = None, data = ()):
+    return stream.update_many(*data)
+
+def _stream(make, data, warmup = 500):
+    '''
+    Streaming classes are seeded on the first bars, update_many on the rest is timed.
+    '''
+    return lambda inp: dict(stream = make(inp.closes[:warmup]), data = [col[warmup:] for col in data(inp)])
+
+def _lookup(cache = None, **kwargs):
+    return cache.lookup('ema', **kwargs)
+
+def _primed_cache(inp):
+    cache = ts.indicator_cache()
+    cache.lookup('ema', data_col = inp.closes, ema_period = 50)
+    return dict(cache = cache, data_col = inp.closes, ema_period = 50)
+
+def _primed_default_cache(inp):
+    ts.default_cache.clear()
+    ts.cached_indicator('ema', data_col = inp.closes, ema_period = 50)
+    return dict(indicator = 'ema', data_col = inp.closes, ema_period = 50)
+
+def _backtest(**kwargs):
+    return ts.vector_backtest(**kwargs).run_backtest()
+
+def _aggregate(aggregator = None, df_scan = None):
+    return aggregator.update_many(df_scan = df_scan)
+
+def _strategy_graphs():
+    return [ts.triple_ema_stoch_rsi(**TRIPLE_PARAMS).graph(name = 'triple'), ts.triple_ema_stoch_rsi(**dict(TRIPLE_PARAMS, ema_slow_len = 100)).graph(name = 'triple 100'),
+            ts.double_rsi().graph(name = 'double'), weekly_stoch_rsi(**WEEKLY_PARAMS).graph(name = 'weekly')]
+
+def _run_executor(executor = None, df_scan = None):
+    return executor.run(df_scan = df_scan)
+
+def _chunked(state = None, data = ()):
+    '''
+    Chunked classes are fed CHUNK_ROWS rows at a time, then finished.
+    '''
+    for start in range(0, data[0].shape[0], CHUNK_ROWS):
+        state.update(*[col[start:start + CHUNK_ROWS] for col in data])
+    if hasattr(state, 'finish'):
+        state.finish()
+
+def _run_chunked_executor(executor = None, df_scan = None):
+    executor.run(chunks = (df_scan.iloc[start:start + CHUNK_ROWS] for start in range(0, df_scan.shape[0], CHUNK_ROWS)), emit = lambda *args: None)
+
+def _fresh_default_cache(**kwargs):
+    ts.default_cache.clear()
+    return kwargs
+
+CASES = [
+    #indicators
+    bench_case('indicators.simple_moving_average', ts.simple_moving_average, lambda inp: dict(sma_period = 50, data_col = inp.close)),
+    bench_case('indicators.exp_moving_average', ts.exp_moving_average, lambda inp: dict(ema_period = 50, data_col = inp.close)),
+    bench_case('indicators.sma_kernel', ts.sma_kernel, lambda inp: dict(data = inp.closes, period = 50)),
+    bench_case('indicators.ema_kernel', ts.ema_kernel, lambda inp: dict(data = inp.closes, period = 50)),
+    bench_case('indicators.rsi_kernel', ts.rsi_kernel, lambda inp: dict(data = inp.closes, length = 14)),
+    bench_case('indicators.stoch_rsi_kernel', ts.stoch_rsi_kernel, lambda inp: dict(data = inp.closes, length = 14, rsi_length = 14, k = 3, d = 3)),
+    bench_case('indicators.seeded_ema_kernel', ts.seeded_ema_kernel, lambda inp: dict(data = inp.closes, length = 200)),
+    bench_case('indicators.ema_kernel[float32]', ts.ema_kernel, lambda inp: dict(data = inp.closes, period = 50, dtype = np.float32)),
+    bench_case('indicators.grad_check', ts.grad_check, lambda inp: dict(grad_array = inp.emas)),
+    bench_case('indicators.grad_check[kbar]', ts.grad_check, lambda inp: dict(grad_array = inp.emas, method = 'kbar', period = 5, min_slope = 0.01)),
+    bench_case('indicators.grad_check[lsq]', ts.grad_check, lambda inp: dict(grad_array = inp.emas, method = 'lsq', period = 20)),
+    bench_case('indicators.grad_check[universe]', ts.grad_check, lambda inp: dict(grad_array = inp.ema_universe, method = 'lsq', period = 20)),
+    bench_case('indicators.ema_batch', ts.ema_batch, lambda inp: dict(data_col = inp.closes, ema_periods = [9, 21, 50, 100, 200])),
+    bench_case('indicators.sma_batch', ts.sma_batch, lambda inp: dict(data_col = inp.closes, sma_periods = [9, 21, 50, 100, 200])),
+    bench_case('indicators.rsi_batch', ts.rsi_batch, lambda inp: dict(data_col = inp.closes, rsi_lens = [2, 14])),
+    bench_case('indicators.stoch_rsi_batch', ts.stoch_rsi_batch, lambda inp: dict(data_col = inp.closes, stoch_params = [(14, 14, 3, 3), (21, 14, 3, 3)])),
+    bench_case('indicators.indicator_cache[miss]', _lookup, lambda inp: dict(cache = ts.indicator_cache(), data_col = inp.closes, ema_period = 50)),
+    bench_case('indicators.indicator_cache[hit]', _lookup, _primed_cache),
+    bench_case('indicators.cached_indicator[hit]', ts.cached_indicator, _primed_default_cache),
+    bench_case('indicators.ema_stream', _update_many, _stream(lambda seed: ts.ema_stream(ema_period = 50, seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+    bench_case('indicators.sma_stream', _update_many, _stream(lambda seed: ts.sma_stream(sma_period = 50, seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+    bench_case('indicators.rsi_stream', _update_many, _stream(lambda seed: ts.rsi_stream(rsi_len = 14, seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+    bench_case('indicators.stoch_rsi_stream', _update_many, _stream(lambda seed: ts.stoch_rsi_stream(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+
+    bench_case('indicators.ema_chunked', _chunked, lambda inp: dict(state = ts.ema_chunked(ema_period = 50), data = [inp.closes])),
+    bench_case('indicators.sma_chunked', _chunked, lambda inp: dict(state = ts.sma_chunked(sma_period = 50), data = [inp.closes])),
+    bench_case('indicators.rsi_chunked', _chunked, lambda inp: dict(state = ts.rsi_chunked(length = 14), data = [inp.closes])),
+    bench_case('indicators.stoch_rsi_chunked', _chunked, lambda inp: dict(state = ts.stoch_rsi_chunked(length = 14, rsi_length = 14, k = 3, d = 3), data = [inp.closes])),
+    bench_case('indicators.seeded_ema_chunked', _chunked, lambda inp: dict(state = ts.seeded_ema_chunked(length = 200), data = [inp.closes])),
+    bench_case('indicators.grad_check_chunked', _chunked, lambda inp: dict(state = ts.grad_check_chunked(), data = [inp.emas])),
+    bench_case('indicators.grad_check_chunked[lsq]', _chunked, lambda inp: dict(state = ts.grad_check_chunked(method = 'lsq', period = 20), data = [inp.emas])),
+
+    #signals
+    bench_case('signals.crossover', ts.crossover, lambda inp: dict(lead_col = inp.stoch[0], trailing_col = inp.stoch[1])),
+    bench_case('signals.indicator_threshold', ts.indicator_threshold, lambda inp: dict(column = inp.stoch[0], upper_threshold = 80, lower_threshold = 20)),
+    bench_case('signals.crossover_fixed', ts.crossover_fixed, lambda inp: dict(lead_col = inp.rsi_fast, threshold_low = 15.0, threshold_high = 85.0)),
+    bench_case('signals.higher_trend', ts.higher_trend, lambda inp: dict(input_col = inp.trend_max)),
+    bench_case('signals.pivot_trend', ts.pivot_trend, lambda inp: dict(input_col = inp.trend_max)),
+    bench_case('signals.pivot_points', ts.pivot_points, lambda inp: dict(data_col = inp.rsi_fast, order = 5)),
+    bench_case('signals.pivot_detector', _update_many, _stream(lambda seed: ts.pivot_detector(order = 5), lambda inp: [inp.rsi_fast]), STREAM_MAX_ROWS),
+    bench_case('signals.crossover_stream', _update_many, _stream(lambda seed: ts.crossover_stream(), lambda inp: list(inp.stoch)), STREAM_MAX_ROWS),
+    bench_case('signals.crossover_chunked', _chunked, lambda inp: dict(state = ts.crossover_chunked(), data = list(inp.stoch))),
+    bench_case('signals.crossover_fixed_chunked', _chunked, lambda inp: dict(state = ts.crossover_fixed_chunked(threshold_low = 15.0, threshold_high = 85.0), data = [inp.rsi_fast])),
+    bench_case('signals.pivot_points_chunked', _chunked, lambda inp: dict(state = ts.pivot_points_chunked(order = 5), data = [inp.rsi_fast])),
+    bench_case('signals.pivot_trend_chunked', _chunked, lambda inp: dict(state = ts.pivot_trend_chunked(), data = [inp.trend_max])),
+
+    #timeframe, synthetic bars are one minute apart
+    bench_case('timeframe.timeframe_bins', ts.timeframe_bins, lambda inp: dict(index = inp.bars.index, timeframe = '1h')),
+    bench_case('timeframe.resample_ohlc', ts.resample_ohlc, lambda inp: dict(df_scan = inp.bars, timeframe = '1h')),
+    bench_case('timeframe.resample_ohlc[W]', ts.resample_ohlc, lambda inp: dict(df_scan = inp.bars, timeframe = 'W')),
+    bench_case('timeframe.align_htf', ts.align_htf, lambda inp: dict(values = ts.resample_ohlc(df_scan = inp.bars, timeframe = '1h')['Close'], index = inp.bars.index, timeframe = '1h')),
+    bench_case('timeframe.timeframe_aggregator', _aggregate, lambda inp: dict(aggregator = ts.timeframe_aggregator(timeframe = '1h'), df_scan = inp.bars), STREAM_MAX_ROWS),
+
+    #graph, the strategies run together with shared nodes computed once
+    bench_case('graph.run_graphs', ts.run_graphs, lambda inp: dict(df_scan = inp.frame(), graphs = _strategy_graphs())),
+    bench_case('graph.graph_executor', _run_executor, lambda inp: dict(executor = ts.graph_executor(graphs = _strategy_graphs()), df_scan = inp.frame())),
+    bench_case('graph.chunked_executor', _run_chunked_executor, lambda inp: dict(executor = ts.chunked_executor(graphs = _strategy_graphs()), df_scan = inp.bars)),
+    bench_case('graph.run_chunked', ts.run_chunked, lambda inp: dict(store = inp.store, symbol = 'SYN', graphs = [ts.double_rsi().graph()], columns = {'double_rsi': ['Signal']}, chunk_size = CHUNK_ROWS)),
+
+    #backtest
+    bench_case('backtest.vector_backtest', _backtest, lambda inp: dict(close = inp.closes, signal = inp.signals, fee = 0.0005, slippage = 0.0002), BACKTEST_MAX_ROWS),
+    bench_case('backtest.vector_backtest[open]', _backtest, lambda inp: dict(close = inp.closes, signal = inp.signals, open_ = inp.bars['Open'].to_numpy(), fee = 0.0005), BACKTEST_MAX_ROWS),
+    bench_case('signals.crossover_fixed_stream', _update_many, _stream(lambda seed: ts.crossover_fixed_stream(threshold_low = 15.0, threshold_high = 85.0), lambda inp: [inp.rsi_fast]), STREAM_MAX_ROWS),
+
+    #strategies
+    bench_case('strategies.triple_ema_stoch_rsi', _scan(ts.triple_ema_stoch_rsi), lambda inp: dict(df_scan = inp.frame(), **TRIPLE_PARAMS)),
+    bench_case('strategies.triple_ema_stoch_rsi[compact]', _scan(ts.triple_ema_stoch_rsi), lambda inp: dict(df_scan = inp.frame(), **TRIPLE_PARAMS, output = 'compact')),
+    bench_case('strategies.double_rsi', _scan(ts.double_rsi), lambda inp: dict(df_scan = inp.frame())),
+    bench_case('strategies.double_rsi[compact]', _scan(ts.double_rsi), lambda inp: dict(df_scan = inp.frame(), output = 'compact')),
+    bench_case('strategies.weekly_stoch_rsi', _scan(weekly_stoch_rsi), lambda inp: dict(df_scan = inp.frame(), **WEEKLY_PARAMS)),
+    bench_case('strategies.weekly_stoch_rsi[timeframe]', _scan(weekly_stoch_rsi), lambda inp: dict(df_scan = inp.frame(), **WEEKLY_PARAMS, timeframe = '15min', output = 'compact')),
+    bench_case('strategies.triple_ema_stoch_rsi_stream', _update_many, _stream(lambda seed: ts.triple_ema_stoch_rsi_stream(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21, seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+    bench_case('strategies.double_rsi_stream', _update_many, _stream(lambda seed: ts.double_rsi_stream(seed_data = seed), lambda inp: [inp.closes]), STREAM_MAX_ROWS),
+    bench_case('strategies.triple_ema_stoch_rsi_sweep', _scan(ts.triple_ema_stoch_rsi_sweep), lambda inp: _fresh_default_cache(df_scan = inp.closes, **SWEEP_GRID)),
+]
+
+def public_names(subpackage):
+    '''
+    Public functions and classes exported by a trade_strat subpackage.
+    '''
+    module = getattr(ts, subpackage)
+    return {name for name in dir(module) if not name.startswith('_') and not type(getattr(module, name)).__name__ == 'module'}
+
+def uncovered_names():
+    '''
+    Public names without a benchmark case.
+    '''
+    covered = {case.covers for case in CASES}
+    missing = []
+    for subpackage in SUBPACKAGES:
+        missing += [f'{subpackage}.{name}' for name in sorted(public_names(subpackage) - covered - NOT_TIMED)]
+    return missing
+
+def run_case(case, inp, max_runs, min_time):
+    '''
+    Peak traced memory of one run, then the best and median of the timed runs.
+    '''
+    kwargs = case.kwargs(inp)
+    tracemalloc.start()
+    case.func(**kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del kwargs
+
+    timings = []
+    while len(timings) == 0 or (len(timings) < max_runs and sum(timings) < min_time):
+        kwargs = case.kwargs(inp)
+        #as timeit, keep garbage collection out of the timed run
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            case.func(**kwargs)
+            timings.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+        del kwargs
+
+    return {'time_min': min(timings), 'time_median': statistics.median(timings), 'peak_bytes': peak, 'runs': len(timings)}
+
+def compare(results, baseline, threshold, noise_ms):
+    '''
+    Keys of cases that are slower or use more memory than the baseline by more than the threshold.
+    '''
+    flagged = {}
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        reasons = []
+        if result['time_min'] > base['time_min'] * threshold and (result['time_min'] - base['time_min']) * 1e3 > noise_ms:
+            reasons.append(f"time x{result['time_min'] / base['time_min']:.2f}")
+        if result['peak_bytes'] > base['peak_bytes'] * threshold and result['peak_bytes'] - base['peak_bytes'] > 1 << 16:
+            reasons.append(f"memory x{result['peak_bytes'] / max(base['peak_bytes'], 1):.2f}")
+        if reasons:
+            flagged[key] = reasons
+    return flagged
+
+def machine_info():
+
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'numpy': np.__version__, 'cpus': os.cpu_count()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5], help='bar counts, 1e3 to 1e7')
+    parser.add_argument('--filter', default=None, help='only run cases whose name contains this text')
+    parser.add_argument('--max-runs', type=int, default=1000)
+    parser.add_argument('--min-time', type=float, default=0.5, help='stop repeating a case after this many seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', default=None, help='write results as a JSON baseline')
+    parser.add_argument('--compare', default=None, help='JSON baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='flag ratios above this')
+    parser.add_argument('--noise-ms', type=float, default=0.1, help='ignore timing changes smaller than this')
+    args = parser.parse_args()
+
+    failed = False
+    missing = uncovered_names()
+    if missing:
+        print(f'FAIL public names without a benchmark case: {missing}')
+        failed = True
+
+    cases = [case for case in CASES if args.filter is None or args.filter in case.name]
+    results = {}
+    errors = {}
+
+    #load lazily imported modules before anything is measured
+    warm = bench_inputs(n_bars = 1000, seed = args.seed)
+    for case in cases:
+        try:
+            case.func(**case.kwargs(warm))
+        except Exception:
+            pass
+    del warm
+
+    for n_bars in [int(size) for size in args.sizes]:
+        inp = bench_inputs(n_bars = n_bars, seed = args.seed)
+        print(f'\nbars={n_bars:,d}')
+        for case in cases:
+            if case.max_rows is not None and n_bars > case.max_rows:
+                continue
+            key = f'{case.name}@{n_bars}'
+            try:
+                result = run_case(case, inp, args.max_runs, args.min_time)
+            except Exception as exc:
+                errors[key] = f'{type(exc).__name__}: {exc}'
+                print(f'  {case.name:<44} ERROR {errors[key]}')
+                continue
+            results[key] = result
+            print(f"  {case.name:<44} {result['time_min']*1e3:11.3f} ms  median {result['time_median']*1e3:11.3f} ms  peak {result['peak_bytes']/2**20:9.2f} MB")
+        del inp
+
+    if errors:
+        failed = True
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        flagged = compare(results, baseline['results'], args.threshold, args.noise_ms)
+        print(f"\ncompared with {args.compare} ({baseline['machine']['platform']})")
+        for key, reasons in flagged.items():
+            print(f"  REGRESSION {key}: {', '.join(reasons)}")
+        if flagged:
+            failed = True
+        else:
+            print('  no regressions')
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'machine': machine_info(), 'results': results, 'errors': errors}, f, indent=1, sort_keys=True)
+        print(f'\nsaved {len(results)} results to {args.save}')
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+'''
+Seeded synthetic OHLC generator for the benchmarks.
+Closes follow geometric brownian motion whose drift and volatility switch between bull, bear and flat regimes
+on a Markov chain, so indicators see trends, reversals and quiet stretches rather than pure noise.
+Bars are one minute apart, which keeps 1e7 bars inside the pandas timestamp range.
+
+Example:
+from synthetic import synthetic_ohlc
+df = synthetic_ohlc(n_bars = 1_000_000, seed = 1)
+'''
+
+import numpy as np
+import pandas as pd
+
+#regime name -> (annualised drift, annualised volatility)
+REGIMES = {
+    'bull': (0.25, 0.15),
+    'bear': (-0.30, 0.35),
+    'flat': (0.0, 0.08),
+}
+
+def synthetic_ohlc(n_bars = None, seed = 0, start_price = 100.0, bars_per_year = 252, switch_prob = 0.01, start = '2000-01-03'):
+    '''
+    Function to generate an OHLCV dataframe from regime switching geometric brownian motion.
+
+    Arguments:
+    n_bars (int): number of bars
+    seed (int): random seed, the same seed always gives the same bars - default 0
+    start_price (float): first open - default 100.0
+    bars_per_year (int): bars per year used to scale the annualised regime parameters - default 252
+    switch_prob (float): probability of leaving the current regime on each bar - default 0.01
+    start (str): timestamp of the first bar - default '2000-01-03'
+
+    Returns:
+    Pandas dataframe with Open, High, Low, Close, Volume and Regime (int8 index into REGIMES) on a minute DatetimeIndex
+
+    Example:
+    df = synthetic_ohlc(n_bars = 10_000, seed = 7)
+    '''
+
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / bars_per_year
+    drift = np.array([mu for mu, _ in REGIMES.values()])
+    vol = np.array([sigma for _, sigma in REGIMES.values()])
+
+    #a switch moves to one of the other regimes, chosen uniformly
+    switches = rng.random(n_bars) < switch_prob
+    steps = np.where(switches, rng.integers(1, len(REGIMES), n_bars), 0)
+    regime = ((rng.integers(len(REGIMES)) + np.cumsum(steps)) % len(REGIMES)).astype(np.int8)
+    del switches, steps
+
+    sigma = vol[regime] * np.sqrt(dt)
+    log_ret = (drift[regime] - 0.5 * vol[regime] ** 2) * dt + sigma * rng.standard_normal(n_bars)
+    close = start_price * np.exp(np.cumsum(log_ret))
+
+    #opens gap slightly from the previous close, highs and lows extend past the body
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * np.exp(0.1 * sigma[1:] * rng.standard_normal(n_bars - 1))
+    high = np.maximum(open_, close) * np.exp(0.5 * sigma * np.abs(rng.standard_normal(n_bars)))
+    low = np.minimum(open_, close) * np.exp(-0.5 * sigma * np.abs(rng.standard_normal(n_bars)))
+    volume = np.round(1e5 * np.exp(0.5 * rng.standard_normal(n_bars)) * (1.0 + 50.0 * np.abs(log_ret)))
+
+    index = pd.date_range(start, periods=n_bars, freq='min')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume, 'Regime': regime}, index=index)
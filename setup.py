@@ -27,7 +27,13 @@ setup(
     packages=['trade_strat',
               'trade_strat.indicators',
               'trade_strat.signals',
-              'trade_strat.strategies'],
+              'trade_strat.strategies',
+              'trade_strat.universe',
+              'trade_strat.ingest',
+              'trade_strat.store',
+              'trade_strat.backtest',
+              'trade_strat.timeframe',
+              'trade_strat.graph'],
     description='Python package to apply trading algorithms to financial instruments',
     long_description=long_description,
     long_description_content_type="text/x-rst",
@@ -36,6 +42,9 @@ setup(
     license='MIT',
     author_email='kevin.jaggs@gmail.com',
     install_requires=[required],
+    #pandas_ta is only used as a reference for the first party rsi, stochrsi and ema kernels, numba speeds up the
+    #path dependent kernels and pyarrow reads parquet files for directory_source
+    extras_require={'pandas_ta': ['pandas-ta==0.3.14b0'], 'numba': ['numba>=0.58'], 'parquet': ['pyarrow']},
     #keywords='python git setup example',
     classifiers=[
         'Intended Audience :: Developers',
@@ -0,0 +1,57 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+
+#numba is optional, its backend is only tested where it is installed
+BACKENDS = ['numpy'] + (['numba'] if importlib.util.find_spec('numba') is not None else [])
+
+#kinds of closes made by the prices fixture
+PRICE_KINDS = ['walk', 'rounded', 'flat', 'leading_nan']
+
+def _closes(kind = 'walk', n_bars = 3000, seed = 0):
+    '''
+    Seeded closes: 'walk' is a random walk, 'rounded' the walk on a whole unit grid so indicator lines tie,
+    'flat' rounded prices held for long stretches and 'leading_nan' a walk whose first bars are missing.
+    '''
+    rng = np.random.default_rng(seed)
+    closes = 100 + rng.normal(0, 1, n_bars).cumsum()
+    if kind in ('rounded', 'flat'):
+        closes = np.round(closes)
+    if kind == 'flat':
+        #each price is held for up to 60 bars
+        closes = np.repeat(closes, rng.integers(1, 60, n_bars))[:n_bars]
+    if kind == 'leading_nan':
+        closes[:7] = np.nan
+    return closes
+
+def _bars(closes):
+    '''
+    OHLC dataframe around a close array, as the strategies take.
+    '''
+    return pd.DataFrame({'Open': closes, 'High': closes + 0.5, 'Low': closes - 0.5, 'Close': closes})
+
+@pytest.fixture(params=PRICE_KINDS)
+def prices(request):
+    return _closes(kind = request.param, seed = PRICE_KINDS.index(request.param))
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    '''
+    Runs the test under each installed compute backend, the previous backend is restored afterwards.
+    '''
+    previous = ts.active_backend()
+    ts.use_backend(name = request.param)
+    yield request.param
+    ts.use_backend(name = previous)
+
+@pytest.fixture
+def make_closes():
+    return _closes
+
+@pytest.fixture
+def make_bars():
+    return _bars
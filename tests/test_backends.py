@@ -0,0 +1,101 @@
+'''
+Equivalence matrix for the compute backends, see ts.use_backend: every kernel and every public function built on one
+must give the same output under each installed backend as under numpy, bit for bit with NaN positions and dtype.
+'''
+
+import numpy as np
+import pytest
+
+import trade_strat as ts
+from trade_strat.indicators.backend import _backends, _kernel
+from trade_strat.indicators.chunked import ema_chunked, rsi_chunked, stoch_rsi_chunked
+
+from conftest import BACKENDS
+
+def chunked(indicator, close, rows = 257):
+    return np.concatenate([indicator.update(close[start:start + rows]) for start in range(0, close.shape[0], rows)])
+
+def sparse_highs(close):
+    is_high, _ = ts.pivot_points(data_col = ts.rsi_kernel(data = close, length = 2), order = 5)
+    return np.where(is_high, close, np.nan)
+
+def backtest(close, per_column = False, **kwargs):
+    #vector_backtest takes NaN free prices, signals are seeded so every price kind trades
+    close = close[~np.isnan(close)]
+    signal = np.random.default_rng(0).choice(np.array([-1, 0, 0, 0, 0, 1], dtype=np.int8), (close.shape[0], 5))
+    if per_column:
+        close = close[:, None] * np.linspace(1.0, 1.5, 5)
+    if kwargs.pop('with_open', False):
+        kwargs['open_'] = np.roll(close, 1, axis=0)
+    return ts.vector_backtest(close = close, signal = signal, chunk_size = 2, **kwargs).run_backtest().to_numpy()
+
+#name -> function(close) returning a numpy array, kernels on their own then the functions that call them
+CASES = {
+    'seeded_ema_kernel': lambda close: ts.seeded_ema_kernel(data = close, length = 21),
+    'ema_kernel float64': lambda close: ts.ema_kernel(data = close, period = 21),
+    'ema_kernel float32': lambda close: ts.ema_kernel(data = close, period = 21, dtype = np.float32),
+    'rsi_kernel': lambda close: ts.rsi_kernel(data = close, length = 14),
+    'stoch_rsi_kernel': lambda close: ts.stoch_rsi_kernel(data = close, length = 14, rsi_length = 14, k = 3, d = 3),
+    'ema_batch': lambda close: ts.ema_batch(data_col = close, ema_periods = [1, 2, 21, 200]),
+    'rsi_batch': lambda close: ts.rsi_batch(data_col = close, rsi_lens = [2, 14, 30]),
+    'rsi_batch gaps': lambda close: ts.rsi_batch(data_col = np.where(np.arange(close.shape[0]) % 97 == 50, np.nan, close), rsi_lens = [2, 14]),
+    'stoch_rsi_batch': lambda close: np.stack(ts.stoch_rsi_batch(data_col = close, stoch_params = [(14, 14, 3, 3), (5, 7, 1, 2)])),
+    'ema_chunked': lambda close: chunked(ema_chunked(ema_period = 21), close),
+    'rsi_chunked': lambda close: chunked(rsi_chunked(length = 14), close),
+    'stoch_rsi_chunked': lambda close: chunked(stoch_rsi_chunked(length = 14, rsi_length = 14, k = 3, d = 3), close),
+    'ema_stream': lambda close: ts.ema_stream(ema_period = 21).update_many(close),
+    'rsi_stream': lambda close: ts.rsi_stream(rsi_len = 14).update_many(close),
+    'pivot_trend': lambda close: ts.pivot_trend(input_col = sparse_highs(close)),
+    'vector_backtest': lambda close: backtest(close, fee = 0.001, slippage = 0.0005),
+    'vector_backtest per column long_only': lambda close: backtest(close, per_column = True, fee = 0.001, long_only = True),
+    'vector_backtest open': lambda close: backtest(close, per_column = True, with_open = True, fee = 0.001),
+}
+
+@pytest.fixture
+def restore_backend():
+    previous = ts.active_backend()
+    yield
+    ts.use_backend(name = previous)
+
+@pytest.mark.skipif(len(BACKENDS) < 2, reason = 'numba is not installed')
+@pytest.mark.parametrize('case', CASES)
+def test_backends_identical(prices, restore_backend, case):
+    results = {}
+    for name in BACKENDS:
+        ts.use_backend(name = name)
+        results[name] = CASES[case](prices)
+    expected = results['numpy']
+    for name, result in results.items():
+        assert result.dtype == expected.dtype, name
+        np.testing.assert_array_equal(result, expected, err_msg = name)
+
+@pytest.mark.parametrize('n_bars', [0, 1, 20, 3000])
+def test_batch_columns_match_single_kernels(make_closes, backend, n_bars):
+    #the batch kernels advance every period together, each column must still be its single period kernel
+    periods = [1, 2, 14, 30]
+    closes = make_closes(n_bars = n_bars)
+    ema = ts.ema_batch(data_col = closes, ema_periods = periods)
+    rsi = ts.rsi_batch(data_col = closes, rsi_lens = periods)
+    for j, period in enumerate(periods):
+        np.testing.assert_array_equal(ema[:, j], ts.ema_kernel(data = closes, period = period))
+        np.testing.assert_array_equal(rsi[:, j], ts.rsi_kernel(data = closes, length = period))
+
+def test_unknown_backend_raises(restore_backend):
+    with pytest.raises(ValueError):
+        ts.use_backend(name = 'no_such_backend')
+
+def test_registered_backend_falls_back_to_numpy(restore_backend):
+    calls = []
+    def pivot_trend(x):
+        calls.append(x.shape[0])
+        return _backends['numpy']['pivot_trend'](x)
+    ts.register_backend(name = 'test_partial', kernels = {'pivot_trend': pivot_trend})
+    try:
+        ts.use_backend(name = 'test_partial')
+        assert ts.active_backend() == 'test_partial'
+        ts.pivot_trend(input_col = np.array([1.0, np.nan, 2.0]))
+        assert calls == [3]
+        #kernels the backend does not register are the numpy ones
+        assert _kernel('ewm_filter') is _backends['numpy']['ewm_filter']
+    finally:
+        _backends.pop('test_partial')
@@ -0,0 +1,29 @@
+'''
+vector_backtest.run_backtest totals from the fused kernel against the same stats taken from equity_curve and positions.
+'''
+
+import numpy as np
+import pytest
+
+import trade_strat as ts
+
+@pytest.mark.parametrize('long_only', [False, True])
+@pytest.mark.parametrize('with_open', [False, True])
+def test_run_backtest_matches_equity_curve(backend, make_closes, long_only, with_open):
+    close = make_closes(n_bars = 2000)[:, None] * np.linspace(1.0, 2.0, 7)
+    signal = np.random.default_rng(3).choice(np.array([-1, 0, 0, 0, 1], dtype=np.int8), close.shape)
+    open_ = np.roll(close, 1, axis=0) if with_open else None
+    bt = ts.vector_backtest(close = close, signal = signal, open_ = open_, fee = 0.001, slippage = 0.0005, long_only = long_only, chunk_size = 3)
+    stats = bt.run_backtest()
+
+    equity = bt.equity_curve()
+    held = bt.positions()
+    returns = equity[1:] / equity[:-1] - 1.0
+    np.testing.assert_allclose(stats['final_equity'], equity[-1], rtol = 1e-12)
+    np.testing.assert_allclose(stats['max_drawdown'], (equity / np.maximum.accumulate(equity)).min(axis=0) - 1.0, rtol = 1e-12)
+    np.testing.assert_allclose(stats['sharpe'], returns.mean(axis=0) / returns.std(axis=0) * np.sqrt(252), rtol = 1e-9)
+    np.testing.assert_array_equal(stats['exposure'], np.count_nonzero(held, axis=0) / close.shape[0])
+    entries = (held != 0) & (np.diff(held, axis=0, prepend=np.int8(0)) != 0)
+    np.testing.assert_array_equal(stats['trades'], np.count_nonzero(entries, axis=0))
+    if long_only:
+        assert held.min() == 0
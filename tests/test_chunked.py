@@ -0,0 +1,137 @@
+'''
+Chunked indicators, signals and graphs: the concatenated output over any chunking must be exactly the in memory
+result of the whole history, dtype and NaN positions included.
+'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+from trade_strat.strategies.weekly_stoch_rsi import weekly_stoch_rsi
+
+CHUNK_SIZES = [1, 7, 256, 999, 3000]
+
+def run_chunks(state, chunk_size, *columns):
+    '''
+    Feed the columns to state.update chunk_size rows at a time, then finish if it has one, and join the outputs.
+    '''
+    outputs = [state.update(*[column[start:start + chunk_size] for column in columns]) for start in range(0, columns[0].shape[0], chunk_size)]
+    if hasattr(state, 'finish'):
+        outputs.append(state.finish())
+    if isinstance(outputs[0], tuple):
+        return tuple(np.concatenate(parts) for parts in zip(*outputs))
+    return np.concatenate(outputs)
+
+def assert_identical(result, expected):
+    expected = np.asarray(expected)
+    assert result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+
+#name -> (chunked class factory, in memory function), both take the close column
+INDICATORS = {
+    'ema': (lambda: ts.ema_chunked(ema_period = 21), lambda x: ts.exp_moving_average(ema_period = 21, data_col = x)),
+    'sma': (lambda: ts.sma_chunked(sma_period = 50), lambda x: ts.simple_moving_average(sma_period = 50, data_col = x)),
+    'rsi': (lambda: ts.rsi_chunked(length = 14), lambda x: ts.rsi_kernel(data = x, length = 14)),
+    'stoch_rsi': (lambda: ts.stoch_rsi_chunked(length = 14, rsi_length = 14, k = 3, d = 3), lambda x: ts.stoch_rsi_kernel(data = x, length = 14, rsi_length = 14, k = 3, d = 3)),
+    'seeded_ema': (lambda: ts.seeded_ema_chunked(length = 21), lambda x: ts.seeded_ema_kernel(data = x, length = 21)),
+    'pivot_points': (lambda: ts.pivot_points_chunked(order = 5), lambda x: ts.pivot_points(data_col = x, order = 5)),
+    'crossover_fixed': (lambda: ts.crossover_fixed_chunked(threshold_low = 95, threshold_high = 105), lambda x: ts.crossover_fixed(lead_col = x, threshold_low = 95, threshold_high = 105)),
+}
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('name', INDICATORS)
+def test_indicator_chunks_match_in_memory(prices, backend, name, chunk_size):
+    chunked, in_memory = INDICATORS[name]
+    result, expected = run_chunks(chunked(), chunk_size, prices), in_memory(prices)
+    if isinstance(expected, tuple):
+        for r, e in zip(result, expected):
+            assert_identical(r, e)
+    else:
+        assert_identical(result, expected)
+
+@pytest.mark.filterwarnings('error')
+def test_ema_period_one_is_the_input(make_closes, backend):
+    #a period of 1 weights only the latest value, with no log of 0 on the way
+    closes = make_closes()
+    assert_identical(ts.exp_moving_average(ema_period = 1, data_col = closes), closes)
+    assert_identical(run_chunks(ts.ema_chunked(ema_period = 1), 7, closes), closes)
+    assert_identical(ts.ema_stream(ema_period = 1).update_many(closes), closes)
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_signal_chunks_match_in_memory(prices, chunk_size):
+    fast, slow = ts.rsi_kernel(data = prices, length = 2), ts.rsi_kernel(data = prices, length = 14)
+    assert_identical(run_chunks(ts.crossover_chunked(), chunk_size, fast, slow), ts.crossover(lead_col = fast, trailing_col = slow))
+    pivots = np.where(ts.pivot_points(data_col = fast, order = 5)[0], fast, np.nan)
+    assert_identical(run_chunks(ts.pivot_trend_chunked(), chunk_size, pivots), ts.pivot_trend(input_col = pivots))
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('method, period', [('diff', None), ('kbar', 5), ('lsq', 20)])
+def test_grad_check_chunks_match_in_memory(make_closes, chunk_size, method, period):
+    lines = np.column_stack([ts.seeded_ema_kernel(data = make_closes(kind = 'walk', seed = seed), length = 21) for seed in range(3)])
+    assert_identical(run_chunks(ts.grad_check_chunked(method = method, period = period), chunk_size, lines),
+                     ts.grad_check(grad_array = lines, method = method, period = period))
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_stoch_rsi_chunks_after_first_flat_window(make_closes, backend, chunk_size):
+    #pandas_ta offsets every range once any window is flat, chunks can only do so from the first flat window on
+    closes = make_closes(kind = 'flat')
+    expected = ts.stoch_rsi_kernel(data = closes, length = 14, rsi_length = 14, k = 3, d = 3)
+    result = run_chunks(ts.stoch_rsi_chunked(length = 14, rsi_length = 14, k = 3, d = 3), chunk_size, closes)
+    rsi = pd.Series(ts.rsi_kernel(data = closes, length = 14))
+    flat = np.flatnonzero((rsi.rolling(14).max() - rsi.rolling(14).min()).to_numpy() == 0)[0]
+    #from the chunk holding the first flat window, after the K and D windows reaching back before it, only the
+    #last bits the running sums carry can differ
+    first = flat // chunk_size * chunk_size + 3 + 3
+    np.testing.assert_allclose(result[first:], expected[first:], rtol = 0, atol = 1e-9)
+    if chunk_size > flat:
+        assert_identical(result, expected)
+
+def strategy_graphs():
+    return [
+        ts.triple_ema_stoch_rsi(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21,
+                                rsi_len = 14, rsi_upper = 70, stoch_rsi_upper = 80, stoch_rsi_lower = 20).graph(name = 'triple'),
+        ts.double_rsi().graph(name = 'double'),
+        weekly_stoch_rsi(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_len = 21, rsi_len = 14,
+                         stoch_rsi_upper = 80, stoch_rsi_lower = 20).graph(name = 'weekly'),
+    ]
+
+def run_executors(df, chunk_size):
+    graphs = strategy_graphs()
+    expected = ts.graph_executor(graphs = graphs).run(df_scan = df)
+
+    emitted = {}
+    def emit(name, column, start, values):
+        parts = emitted.setdefault((name, column), [])
+        #rows arrive in order with no gaps
+        assert start == sum(part.shape[0] for part in parts)
+        parts.append(np.asarray(values))
+
+    chunks = (df.iloc[start:start + chunk_size] for start in range(0, df.shape[0], chunk_size))
+    ts.chunked_executor(graphs = graphs).run(chunks = chunks, emit = emit)
+    assert sorted(emitted) == sorted((name, column) for name, columns in expected.items() for column in columns)
+    for name, columns in expected.items():
+        for column, values in columns.items():
+            assert_identical(np.concatenate(emitted[(name, column)]), values)
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 999, 3000])
+#flat histories hit the stoch_rsi_chunked offset caveat tested above
+@pytest.mark.parametrize('kind', ['walk', 'rounded', 'leading_nan'])
+def test_chunked_executor_matches_graph_executor(make_closes, make_bars, backend, kind, chunk_size):
+    run_executors(make_bars(make_closes(kind = kind)), chunk_size)
+
+def test_chunked_executor_single_rows(make_closes, make_bars, backend):
+    #every node carries its state across every row, a short history keeps the row by row run quick
+    run_executors(make_bars(make_closes(kind = 'rounded', n_bars = 300)), 1)
+
+def test_run_chunked_stores_in_memory_columns(make_closes, make_bars, tmp_path):
+    df = make_bars(make_closes(kind = 'rounded'))
+    df.index = pd.date_range('2020-01-01', periods = df.shape[0], freq = 'min')
+    store = ts.columnar_store(path = str(tmp_path))
+    store.write(symbol = 'ES', df = df)
+    graph = ts.double_rsi().graph()
+    stored = ts.run_chunked(store = store, symbol = 'ES', graphs = [graph], columns = {graph.name: ['Signal', 'RSI Fast']}, chunk_size = 500)
+    expected = ts.graph_executor(graphs = [graph]).run(df_scan = df)[graph.name]
+    values = store.read_columns('ES', stored)
+    for column in ['Signal', 'RSI Fast']:
+        assert_identical(np.asarray(values[column]), expected[column])
@@ -0,0 +1,34 @@
+'''
+exp_moving_average against the pandas ewm it replaced, bit for bit, and the strategy signals built on it.
+On flat runs pandas returns exactly the price, so strict Close > EMA comparisons must not flip on rounding.
+'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+from trade_strat.indicators import cache
+
+TRIPLE_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+
+def baseline_ema(data, ema_period = None):
+    #exp_moving_average before the first party kernels
+    return pd.Series(data).ewm(span=ema_period, min_periods=ema_period).mean().to_numpy()
+
+@pytest.mark.parametrize('period', [1, 2, 21, 200])
+def test_ema_is_pandas_ewm(prices, backend, period):
+    expected = baseline_ema(prices, ema_period = period)
+    np.testing.assert_array_equal(ts.exp_moving_average(ema_period = period, data_col = prices), expected)
+    np.testing.assert_array_equal(ts.ema_batch(data_col = prices, ema_periods = [period])[:, 0], expected)
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('kind', ['rounded', 'flat'])
+def test_triple_signals_match_baseline_on_flat_segments(make_closes, make_bars, backend, monkeypatch, kind, seed):
+    #the recursive filter flipped Close > EMA on 7 to 61 of these 4000 bars
+    df = make_bars(make_closes(kind = kind, n_bars = 4000, seed = seed))
+    result = ts.triple_ema_stoch_rsi(df_scan = df.copy(), **TRIPLE_PARAMS).run_scan()
+    monkeypatch.setitem(cache._indicators, 'ema', baseline_ema)
+    expected = ts.triple_ema_stoch_rsi(df_scan = df.copy(), **TRIPLE_PARAMS).run_scan()
+    for column in ('EMA SLOW', 'EMA MED', 'EMA FAST', 'Close > EMA', 'Signal'):
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy(), err_msg = column)
@@ -0,0 +1,97 @@
+'''
+scan_pipeline over a mock_feed: the streamed results must equal a sequential fetch then scan, per symbol failures and
+timeouts must be recorded without stopping the others, and a slow or departed consumer must stop the fetching.
+'''
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+
+class slow_scan:
+    '''
+    Strategy stand in whose scan sleeps, the result is the last close.
+    '''
+    def __init__(self, df_scan, delay = 0.0):
+        self.df_scan = df_scan
+        self.delay = delay
+
+    def run_scan(self):
+        time.sleep(self.delay)
+        return self.df_scan[['Close']].iloc[-1:]
+
+@pytest.fixture
+def frames(make_closes, make_bars):
+    return {f'SYM{i:02d}': make_bars(make_closes(kind = 'walk', n_bars = 500, seed = i)) for i in range(12)}
+
+def test_matches_sequential_scan(frames):
+    feed = ts.mock_feed(data = frames, latency = 0.01, jitter = 0.01, seed = 0)
+    results = ts.scan_pipeline(source = feed, strategy = ts.double_rsi, workers = 3, fetch_concurrency = 4).run_scan()
+    assert sorted(results) == sorted(frames)
+    for symbol, df in frames.items():
+        pd.testing.assert_frame_equal(results[symbol], ts.double_rsi(df_scan = df.copy(), output = 'compact').run_scan())
+
+def test_symbols_subset(frames):
+    feed = ts.mock_feed(data = frames)
+    results = ts.scan_pipeline(source = feed, strategy = ts.double_rsi, symbols = ['SYM03', 'SYM07'], workers = 2).run_scan()
+    assert sorted(results) == ['SYM03', 'SYM07']
+    assert sorted(feed.fetched) == ['SYM03', 'SYM07']
+
+def test_failures_are_isolated(frames):
+    #SYM01 fails to fetch, SYM02 fetches but has no Close column to scan
+    frames = dict(frames, SYM02 = frames['SYM02'].drop(columns = 'Close'))
+    feed = ts.mock_feed(data = frames, failures = {'SYM01': ConnectionError('reset')})
+    pipeline = ts.scan_pipeline(source = feed, strategy = ts.double_rsi, workers = 2)
+    results = pipeline.run_scan()
+    assert sorted(pipeline.errors) == ['SYM01', 'SYM02']
+    assert 'ConnectionError: reset' in pipeline.errors['SYM01']
+    assert 'Close' in pipeline.errors['SYM02']
+    assert sorted(results) == sorted(set(frames) - {'SYM01', 'SYM02'})
+
+def test_fetch_and_scan_timeouts(frames):
+    feed = ts.mock_feed(data = frames, latency = {'SYM04': 5.0})
+    pipeline = ts.scan_pipeline(source = feed, strategy = slow_scan, workers = 2, timeout = 0.2)
+    t0 = time.perf_counter()
+    results = pipeline.run_scan()
+    assert time.perf_counter() - t0 < 2.0
+    assert list(pipeline.errors) == ['SYM04']
+    assert 'TimeoutError' in pipeline.errors['SYM04']
+    assert len(results) == len(frames) - 1
+
+    pipeline = ts.scan_pipeline(source = ts.mock_feed(data = frames), strategy = slow_scan, strategy_params = {'delay': 0.5},
+                                symbols = ['SYM00', 'SYM01'], workers = 2, timeout = 0.1)
+    assert pipeline.run_scan() == {}
+    assert sorted(pipeline.errors) == ['SYM00', 'SYM01']
+
+def test_slow_consumer_pauses_fetching(frames):
+    feed = ts.mock_feed(data = frames)
+
+    async def consume():
+        pipeline = ts.scan_pipeline(source = feed, strategy = slow_scan, workers = 1, fetch_concurrency = 1, queue_size = 1)
+        async for _ in pipeline:
+            #the consumer stalls on its first result while the queues fill
+            await asyncio.sleep(0.3)
+            return len(feed.fetched)
+
+    fetched = asyncio.run(consume())
+    #one result held by the consumer, one queued, one scanning, one fetched bars queued and one fetch in flight
+    assert fetched <= 5 < len(frames)
+
+def test_early_break_cancels_outstanding_work(frames):
+    feed = ts.mock_feed(data = frames, latency = 0.05)
+
+    async def first_result():
+        pipeline = ts.scan_pipeline(source = feed, strategy = slow_scan, workers = 1, fetch_concurrency = 2, queue_size = 1)
+        async for symbol, _ in pipeline:
+            break
+        fetched = len(feed.fetched)
+        await asyncio.sleep(0.3)
+        return symbol, fetched
+
+    symbol, fetched = asyncio.run(first_result())
+    assert symbol in frames
+    #nothing more is fetched once the iteration has stopped
+    assert len(feed.fetched) == fetched < len(frames)
@@ -0,0 +1,67 @@
+'''
+The first party rsi, stochrsi and seeded ema kernels against pandas_ta, which they replace by default.
+Values must be bit for bit identical, so crossovers of lines that tie give the same signals with either.
+'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+from trade_strat.strategies.weekly_stoch_rsi import weekly_stoch_rsi
+
+pta = pytest.importorskip('pandas_ta')
+
+STOCH_PARAMS = [dict(length = 14, rsi_length = 14, k = 3, d = 3), dict(length = 14, rsi_length = 3, k = 3, d = 3), dict(length = 5, rsi_length = 7, k = 1, d = 2)]
+TRIPLE_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+WEEKLY_PARAMS = dict(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+
+def assert_identical(result, expected):
+    np.testing.assert_array_equal(result, np.asarray(expected, dtype=float).reshape(result.shape))
+
+@pytest.mark.parametrize('length', [2, 14, 30])
+def test_rsi_kernel_matches_pandas_ta(prices, backend, length):
+    assert_identical(ts.rsi_kernel(data = prices, length = length), pta.rsi(close = pd.Series(prices), length = length))
+
+@pytest.mark.parametrize('params', STOCH_PARAMS)
+def test_stoch_rsi_kernel_matches_pandas_ta(prices, backend, params):
+    assert_identical(ts.stoch_rsi_kernel(data = prices, **params), pta.stochrsi(close = pd.Series(prices), **params))
+
+@pytest.mark.parametrize('length', [2, 21, 200])
+def test_seeded_ema_kernel_matches_pandas_ta(make_closes, backend, length):
+    #pta.ema takes no leading NaN
+    for kind in ('walk', 'rounded', 'flat'):
+        closes = make_closes(kind = kind)
+        assert_identical(ts.seeded_ema_kernel(data = closes, length = length), pta.ema(close = pd.Series(closes), length = length))
+
+def test_short_history_is_all_nan(backend):
+    closes = np.arange(10.0)
+    assert_identical(ts.rsi_kernel(data = closes, length = 14), pta.rsi(close = pd.Series(closes), length = 14))
+    assert np.isnan(ts.stoch_rsi_kernel(data = closes, length = 14, rsi_length = 14, k = 3, d = 3)).all()
+
+def test_batch_kernels_match_pandas_ta(prices, backend):
+    rsi = ts.rsi_batch(data_col = prices, rsi_lens = [2, 14])
+    for j, length in enumerate([2, 14]):
+        assert_identical(rsi[:, j], pta.rsi(close = pd.Series(prices), length = length))
+    stoch_k, stoch_d = ts.stoch_rsi_batch(data_col = prices, stoch_params = [(p['length'], p['rsi_length'], p['k'], p['d']) for p in STOCH_PARAMS])
+    for j, params in enumerate(STOCH_PARAMS):
+        expected = pta.stochrsi(close = pd.Series(prices), **params).to_numpy()
+        assert_identical(stoch_k[:, j], expected[:, 0])
+        assert_identical(stoch_d[:, j], expected[:, 1])
+
+@pytest.mark.parametrize('strategy', ['triple_ema_stoch_rsi', 'weekly_stoch_rsi', 'double_rsi'])
+def test_strategy_signals_do_not_depend_on_pandas_ta(make_closes, make_bars, backend, strategy):
+    scans = {
+        'triple_ema_stoch_rsi': lambda df: ts.triple_ema_stoch_rsi(df_scan = df, **TRIPLE_PARAMS).run_scan(),
+        'weekly_stoch_rsi': lambda df: weekly_stoch_rsi(df_scan = df, **WEEKLY_PARAMS).run_scan(),
+        'double_rsi': lambda df: ts.double_rsi(df_scan = df).run_scan(),
+    }
+    for kind in ('rounded', 'flat'):
+        df = make_bars(make_closes(kind = kind))
+        native = scans[strategy](df.copy())
+        ts.use_pandas_ta()
+        try:
+            reference = scans[strategy](df.copy())
+        finally:
+            ts.use_pandas_ta(enabled = False)
+        pd.testing.assert_frame_equal(native, reference, check_exact = True)
@@ -0,0 +1,63 @@
+'''
+pivot_trend against the row by row state machine it replaced in double_rsi.run_scan.
+'''
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+
+def legacy_loop(x):
+    '''
+    The original iterrows state machine from double_rsi.run_scan over a plain array.
+    '''
+    out = np.zeros(x.shape[0], dtype=bool)
+    ref = False
+    trend = False
+    for i, v in enumerate(x.tolist()):
+        if math.isnan(v) == False:
+            if ref == False:
+                second = v
+                ref = True
+            else:
+                first = second
+                second = v
+                trend = first < second
+        out[i] = trend
+    return out
+
+def sparse_pivots(n, density, rng, tie_grid = None):
+    x = np.full(n, np.nan)
+    idx = np.flatnonzero(rng.random(n) < density)
+    x[idx] = rng.uniform(0, 100, idx.shape[0])
+    if tie_grid is not None:
+        #few distinct levels so consecutive pivots are often equal
+        x[idx] = np.round(x[idx] / tie_grid) * tie_grid
+    return x
+
+@pytest.mark.parametrize('density', [0.0005, 0.05, 0.5, 1.0])
+@pytest.mark.parametrize('tie_grid', [None, 25.0])
+def test_matches_legacy_loop(backend, density, tie_grid):
+    rng = np.random.default_rng(int(density * 1e4))
+    for _ in range(20):
+        x = sparse_pivots(5000, density, rng, tie_grid)
+        np.testing.assert_array_equal(ts.pivot_trend(input_col = x), legacy_loop(x))
+
+@pytest.mark.parametrize('x', [
+    np.array([]),
+    np.full(10, np.nan),
+    np.array([np.nan, np.nan, 3.0, np.nan]),
+    np.array([1.0, 1.0, 1.0]),
+    np.array([np.nan, 1.0, np.nan, 2.0, np.nan, 2.0, 3.0, np.nan]),
+    np.array([5.0, np.nan, 4.0, np.nan, np.nan, 6.0]),
+], ids=['empty', 'all_nan', 'single_pivot', 'all_tied', 'tie_then_rise', 'fall_then_rise'])
+def test_edge_cases(backend, x):
+    np.testing.assert_array_equal(ts.pivot_trend(input_col = x), legacy_loop(x))
+
+def test_accepts_series_and_int_input(backend):
+    x = pd.Series([np.nan, 2.0, np.nan, 3.0, 1.0])
+    np.testing.assert_array_equal(ts.pivot_trend(input_col = x), [False, False, False, True, False])
+    np.testing.assert_array_equal(ts.pivot_trend(input_col = np.array([1, 2, 2, 3])), [False, True, False, True])
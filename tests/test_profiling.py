@@ -0,0 +1,23 @@
+'''
+enable_profiling and disable_profiling with memory profiling, tracemalloc is only stopped if profiling started it.
+'''
+
+import tracemalloc
+
+import trade_strat as ts
+
+def test_caller_tracemalloc_keeps_tracing():
+    tracemalloc.start()
+    try:
+        ts.enable_profiling(memory = True)
+        ts.disable_profiling()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_profiling_stops_its_own_tracemalloc():
+    assert not tracemalloc.is_tracing()
+    ts.enable_profiling(memory = True)
+    assert tracemalloc.is_tracing()
+    ts.disable_profiling()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,35 @@
+'''
+Streaming indicators and strategies fed one bar at a time against their batch versions, on series with flat runs.
+'''
+
+import numpy as np
+import pytest
+
+import trade_strat as ts
+
+def flat_closes(make_closes):
+    #18 flat opening bars, then the flat kind whose prices are held for up to 60 bars
+    return np.concatenate((np.full(18, 100.0), make_closes(kind = 'flat')))
+
+@pytest.mark.parametrize('rsi_len', [2, 14])
+def test_rsi_stream_flat_matches_batch(make_closes, backend, rsi_len):
+    closes = flat_closes(make_closes)
+    expected = ts.rsi_kernel(data = closes, length = rsi_len)
+    stream = ts.rsi_stream(rsi_len = rsi_len)
+    result = np.array([stream.update(bar) for bar in closes])
+    np.testing.assert_array_equal(result, expected)
+    np.testing.assert_array_equal(ts.rsi_stream(rsi_len = rsi_len).update_many(closes), expected)
+
+def test_rsi_stream_flat_seed():
+    assert np.isnan(ts.rsi_stream(rsi_len = 2, seed_data = np.array([5.0, 5.0, 5.0])).update(5.0))
+
+def test_streams_run_over_flat_bars(make_closes, backend):
+    #every stream built on rsi_stream must keep going through a flat opening
+    closes = flat_closes(make_closes)[:400]
+    srsi = ts.stoch_rsi_stream(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3)
+    triple = ts.triple_ema_stoch_rsi_stream(stoch_len = 14, stochrsi_length = 14, stoch_k = 3, stoch_d = 3, ema_slow_len = 200, ema_med_len = 50, ema_fast_len = 21)
+    double = ts.double_rsi_stream()
+    for bar in closes:
+        srsi.update(bar)
+        triple.update(bar)
+        double.update(bar)
@@ -0,0 +1,57 @@
+'''
+timeframe_aggregator against timeframe_bins: streamed bars, and the base bars that finish them, must match the batch
+bars on every index, including timezone aware indexes across clock changes.
+'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+
+def hourly_bars(index):
+    closes = np.arange(len(index), dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes, 'Volume': 1.0}, index=index)
+
+def assert_streamed_matches_batch(df, timeframe):
+    bins = ts.timeframe_bins(index = df.index, timeframe = timeframe)
+    expected = bins.resample(df_scan = df)
+    aggregator = ts.timeframe_aggregator(timeframe = timeframe)
+    finished = aggregator.update_many(df_scan = df)
+    #the last batch bar is still forming
+    pd.testing.assert_frame_equal(aggregator.bars(), expected.iloc[:-1], check_freq = False, check_names = False)
+    np.testing.assert_array_equal(np.flatnonzero(finished), bins.first[1:])
+
+@pytest.mark.parametrize('timeframe', ['D', '4h', '2h', '1h', '15min', 'W'])
+@pytest.mark.parametrize('tz', [None, 'UTC', 'US/Eastern', 'Europe/London', 'Australia/Sydney'])
+@pytest.mark.parametrize('start', ['2020-03-05', '2020-03-26', '2020-04-02', '2020-10-01', '2020-10-22', '2020-10-29'])
+def test_aggregator_matches_bins(start, tz, timeframe):
+    #seven minute bars do not line up with any timeframe, and every window holds a clock change in one of the zones
+    index = pd.date_range(start, periods = 1500, freq = '7min', tz = 'UTC')
+    index = index.tz_localize(None) if tz is None else index.tz_convert(tz)
+    assert_streamed_matches_batch(hourly_bars(index), timeframe)
+
+def test_daily_bars_follow_the_wall_clock_across_dst():
+    index = pd.date_range('2020-03-06', '2020-03-11', freq = 'h', tz = 'US/Eastern', inclusive = 'left')
+    index = index.append(pd.date_range('2020-10-30', '2020-11-04', freq = 'h', tz = 'US/Eastern', inclusive = 'left'))
+    df = hourly_bars(index)
+    daily = ts.resample_ohlc(df_scan = df, timeframe = 'D')
+    hours = pd.Series(1, index = index).groupby(ts.timeframe_bins(index = index, timeframe = 'D').codes).size().to_numpy()
+    counts = dict(zip(daily.index.strftime('%Y-%m-%d'), hours))
+    assert counts['2020-03-08'] == 23 and counts['2020-11-01'] == 25
+    assert set(counts.values()) == {23, 24, 25}
+    assert (daily.index.strftime('%H:%M') == '00:00').all()
+    for timeframe in ['D', '4h', '1h']:
+        assert_streamed_matches_batch(df, timeframe)
+
+def test_repeated_hour_is_binned_by_pass():
+    #the clocks go back at 02:00 EDT, the hourly bars of each pass are kept apart
+    index = pd.date_range('2020-11-01 04:00', periods = 16, freq = '15min', tz = 'UTC').tz_convert('US/Eastern')
+    bars = ts.resample_ohlc(df_scan = hourly_bars(index), timeframe = '1h')
+    assert list(bars.index.strftime('%H:%M%z')) == ['00:00-0400', '01:00-0400', '01:00-0500', '02:00-0500']
+
+def test_skipped_wall_time_starts_at_the_clock_change():
+    #London skips 01:00 to 02:00 GMT, the 01:30 bar of a 90 minute timeframe starts at 02:00 BST
+    index = pd.date_range('2020-03-29 00:00', periods = 20, freq = '10min', tz = 'UTC').tz_convert('Europe/London')
+    bars = ts.resample_ohlc(df_scan = hourly_bars(index), timeframe = '90min')
+    assert list(bars.index.strftime('%H:%M%z')) == ['00:00+0000', '02:00+0100', '03:00+0100']
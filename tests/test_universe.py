@@ -0,0 +1,50 @@
+'''
+universe_scan in the calling process: results, per symbol failures, and errors raised through the shared block cleanup.
+On numpy builds where views of a shared block export its buffer, close raises BufferError while they are alive.
+'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_strat as ts
+
+class stop_scan(BaseException):
+    pass
+
+class sign_strategy:
+    #Signal is the sign of the close change, a symbol whose first close is fail raises, a negative fail aborts the whole scan
+    def __init__(self, df, fail = None):
+        self.df = df
+        self.fail = fail
+
+    def run_scan(self):
+        if self.df['Close'].iloc[0] == self.fail:
+            raise stop_scan() if self.fail < 0 else ValueError('bad symbol')
+        return pd.DataFrame({'Signal': np.sign(self.df['Close'].diff().fillna(0)).astype(np.int8)})
+
+def frames(make_closes, make_bars, first = 1.0):
+    data = {name: make_bars(make_closes(n_bars = 50 + 10 * seed, seed = seed)) for seed, name in enumerate(['a', 'b', 'c'])}
+    data['b'].loc[0, 'Close'] = first
+    return data
+
+def test_scan_in_process(make_closes, make_bars):
+    data = frames(make_closes, make_bars, first = 7.0)
+    scan = ts.universe_scan(data = data, strategy = sign_strategy, strategy_params = {'fail': 7.0}, workers = 1)
+    results = scan.run_scan()
+    assert sorted(results) == ['a', 'c'] and list(scan.errors) == ['b']
+    for name, signal in results.items():
+        expected = np.sign(data[name]['Close'].diff().fillna(0)).astype(np.int8)
+        np.testing.assert_array_equal(signal.to_numpy(), expected.to_numpy())
+
+def test_pack_error_propagates(make_closes, make_bars):
+    #the views of the packed block are alive when the missing column raises, the KeyError must not become a BufferError
+    scan = ts.universe_scan(data = frames(make_closes, make_bars), strategy = sign_strategy, columns = ['Close', 'Volume'], workers = 1)
+    with pytest.raises(KeyError):
+        scan.run_scan()
+
+def test_abort_propagates(make_closes, make_bars):
+    #the traceback holds the strategy frames and their views of the shared block
+    scan = ts.universe_scan(data = frames(make_closes, make_bars, first = -1.0), strategy = sign_strategy, strategy_params = {'fail': -1.0}, workers = 1)
+    with pytest.raises(stop_scan):
+        scan.run_scan()
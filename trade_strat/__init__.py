@@ -1,3 +1,104 @@
-from trade_strat.core import *
+import importlib
 
-__version__ = "0.0.4"
\ No newline at end of file
+__version__ = "0.0.4"
+
+#public name -> subpackage, subpackages are imported on first access so that
+#import trade_strat stays cheap and heavy dependencies only load when used
+_lazy_names = {
+    'simple_moving_average': 'trade_strat.indicators',
+    'exp_moving_average': 'trade_strat.indicators',
+    'grad_check': 'trade_strat.indicators',
+    'ema_stream': 'trade_strat.indicators',
+    'sma_stream': 'trade_strat.indicators',
+    'rsi_stream': 'trade_strat.indicators',
+    'stoch_rsi_stream': 'trade_strat.indicators',
+    'indicator_cache': 'trade_strat.indicators',
+    'cached_indicator': 'trade_strat.indicators',
+    'register_indicator': 'trade_strat.indicators',
+    'default_cache': 'trade_strat.indicators',
+    'ema_batch': 'trade_strat.indicators',
+    'sma_batch': 'trade_strat.indicators',
+    'rsi_batch': 'trade_strat.indicators',
+    'stoch_rsi_batch': 'trade_strat.indicators',
+    'ema_kernel': 'trade_strat.indicators',
+    'sma_kernel': 'trade_strat.indicators',
+    'rsi_kernel': 'trade_strat.indicators',
+    'stoch_rsi_kernel': 'trade_strat.indicators',
+    'seeded_ema_kernel': 'trade_strat.indicators',
+    'use_pandas_ta': 'trade_strat.indicators',
+    'use_backend': 'trade_strat.indicators',
+    'register_backend': 'trade_strat.indicators',
+    'active_backend': 'trade_strat.indicators',
+    'ema_chunked': 'trade_strat.indicators',
+    'sma_chunked': 'trade_strat.indicators',
+    'rsi_chunked': 'trade_strat.indicators',
+    'stoch_rsi_chunked': 'trade_strat.indicators',
+    'seeded_ema_chunked': 'trade_strat.indicators',
+    'grad_check_chunked': 'trade_strat.indicators',
+    'triple_ema_stoch_rsi': 'trade_strat.strategies',
+    'double_rsi': 'trade_strat.strategies',
+    'triple_ema_stoch_rsi_stream': 'trade_strat.strategies',
+    'triple_ema_stoch_rsi_sweep': 'trade_strat.strategies',
+    'double_rsi_stream': 'trade_strat.strategies',
+    'crossover': 'trade_strat.signals',
+    'indicator_threshold': 'trade_strat.signals',
+    'crossover_fixed': 'trade_strat.signals',
+    'higher_trend': 'trade_strat.signals',
+    'pivot_trend': 'trade_strat.signals',
+    'crossover_stream': 'trade_strat.signals',
+    'crossover_fixed_stream': 'trade_strat.signals',
+    'pivot_points': 'trade_strat.signals',
+    'pivot_detector': 'trade_strat.signals',
+    'crossover_chunked': 'trade_strat.signals',
+    'crossover_fixed_chunked': 'trade_strat.signals',
+    'pivot_points_chunked': 'trade_strat.signals',
+    'pivot_trend_chunked': 'trade_strat.signals',
+    'universe_scan': 'trade_strat.universe',
+    'signal_index': 'trade_strat.universe',
+    'directory_source': 'trade_strat.ingest',
+    'mock_feed': 'trade_strat.ingest',
+    'scan_pipeline': 'trade_strat.ingest',
+    'columnar_store': 'trade_strat.store',
+    'stream_update': 'trade_strat.store',
+    'stream_params': 'trade_strat.store',
+    'vector_backtest': 'trade_strat.backtest',
+    'timeframe_bins': 'trade_strat.timeframe',
+    'resample_ohlc': 'trade_strat.timeframe',
+    'align_htf': 'trade_strat.timeframe',
+    'timeframe_aggregator': 'trade_strat.timeframe',
+    'node': 'trade_strat.graph',
+    'scan_graph': 'trade_strat.graph',
+    'register_op': 'trade_strat.graph',
+    'graph_executor': 'trade_strat.graph',
+    'run_graphs': 'trade_strat.graph',
+    'chunked_executor': 'trade_strat.graph',
+    'run_chunked': 'trade_strat.graph',
+    'register_chunk_op': 'trade_strat.graph',
+    'profile_stage': 'trade_strat.profiling',
+    'profile_scan': 'trade_strat.profiling',
+    'enable_profiling': 'trade_strat.profiling',
+    'disable_profiling': 'trade_strat.profiling',
+    'callback_sink': 'trade_strat.profiling',
+    'memory_sink': 'trade_strat.profiling',
+    'jsonl_sink': 'trade_strat.profiling',
+    'profile_summary': 'trade_strat.profiling',
+    'read_profile': 'trade_strat.profiling',
+}
+
+_subpackages = ['indicators', 'signals', 'strategies', 'universe', 'ingest', 'store', 'backtest', 'timeframe', 'graph', 'profiling', 'core']
+
+__all__ = list(_lazy_names)
+
+def __getattr__(name):
+
+    if name in _subpackages:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _lazy_names:
+        value = getattr(importlib.import_module(_lazy_names[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,38 @@
+import importlib
+
+class lazy_module:
+
+    '''
+    Class to stand in for a module that is only imported on first attribute access.
+    Used for heavy third party dependencies (pandas, scipy, pandas_ta) so that importing trade_strat,
+    or a function that never touches them, does not pay their import cost.
+
+    Arguments:
+    name (str): absolute module name e.g. 'scipy.signal'
+
+    Returns:
+    Proxy object, attribute access is forwarded to the real module
+
+    Raises:
+    ModuleNotFoundError on first attribute access if the module is not installed.
+
+    Example:
+    pd = lazy_module('pandas')
+    series = pd.Series(values)
+    '''
+
+    def __init__(self, name):
+
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
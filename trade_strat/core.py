@@ -1,3 +1,9 @@
 from trade_strat.indicators import *
 from trade_strat.strategies import *
-from trade_strat.signals import *
\ No newline at end of file
+from trade_strat.signals import *
+from trade_strat.universe import *
+from trade_strat.ingest import *
+from trade_strat.store import *
+from trade_strat.backtest import *
+from trade_strat.timeframe import *
+from trade_strat.graph import *
\ No newline at end of file
@@ -0,0 +1,3 @@
+from .nodes import node, scan_graph, register_op
+from .executor import graph_executor, run_graphs
+from .chunked import chunked_executor, run_chunked, register_chunk_op
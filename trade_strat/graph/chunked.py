@@ -0,0 +1,265 @@
+import numpy as np
+
+from trade_strat.indicators.chunked import ema_chunked, sma_chunked, rsi_chunked, stoch_rsi_chunked, seeded_ema_chunked, grad_check_chunked
+from trade_strat.profiling import profile_stage
+from trade_strat.signals.chunked import crossover_chunked, crossover_fixed_chunked, pivot_points_chunked, pivot_trend_chunked
+
+from .executor import graph_executor
+from .nodes import _ops
+
+class _source_chunked:
+
+    def __init__(self, column = None):
+
+        self.column = column
+
+    def update(self, chunk):
+
+        return np.asarray(chunk[self.column])
+
+class _previous_chunked:
+
+    '''
+    diff and shift, the last value of each chunk is kept for the first row of the next.
+    '''
+
+    def __init__(self, op = None):
+
+        self.op = op
+        self._last = np.array([np.nan])
+
+    def update(self, data):
+
+        values = np.concatenate((self._last, data))
+        self._last = values[-1:].copy()
+        return np.diff(values) if self.op == 'diff' else values[:-1]
+
+class _grad_check_columns:
+
+    def __init__(self, **params):
+
+        self._grad = grad_check_chunked(**params)
+
+    def update(self, *columns):
+
+        return self._grad.update(np.column_stack(columns))
+
+class _stateless:
+
+    def __init__(self, op = None, **params):
+
+        self.func = _ops[op]
+        self.params = params
+
+    def update(self, *inputs):
+
+        return self.func(*inputs, **self.params)
+
+#ops whose output row i only depends on input row i
+_STATELESS = ['column', 'item', 'above', 'below_value', 'above_value', 'threshold', 'pivot_values', 'where_valid', 'both', 'select']
+
+#op name -> function(**params) returning a fresh state with update(*input chunks) and optionally finish()
+_chunk_ops = {
+    'source': _source_chunked,
+    'ema': ema_chunked,
+    'sma': sma_chunked,
+    'rsi': rsi_chunked,
+    'stochrsi': stoch_rsi_chunked,
+    'pta_ema': seeded_ema_chunked,
+    'diff': lambda: _previous_chunked(op = 'diff'),
+    'shift': lambda: _previous_chunked(op = 'shift'),
+    'crossover': crossover_chunked,
+    'crossover_fixed': crossover_fixed_chunked,
+    'grad_check': _grad_check_columns,
+    'pivot_points': pivot_points_chunked,
+    'pivot_trend': pivot_trend_chunked,
+    **{op: (lambda op: lambda **params: _stateless(op, **params))(op) for op in _STATELESS},
+}
+
+def register_chunk_op(name = None, factory = None):
+    '''
+    Function to make a registered graph op available to chunked_executor.
+
+    Arguments:
+    name (str): op name, as given to register_op
+    factory (function): callable taking the node parameters and returning a new state object per run. The state has
+    update(*input chunks) returning the output rows it has completed, and optionally finish() returning the rest
+    once the history has ended
+
+    Returns:
+    None
+
+    Raises:
+    None
+
+    Example:
+    register_op(name = 'midpoint', func = lambda high, low: (high + low) / 2)
+    register_chunk_op(name = 'midpoint', factory = lambda: types.SimpleNamespace(update = lambda high, low: (high + low) / 2))
+
+    PRECONDITIONS: the outputs of update and finish, concatenated, are the output of the op on the concatenated inputs.
+    KJAGGS OCT 2023
+    '''
+
+    _chunk_ops[name] = factory
+
+def _length(value):
+
+    return (value[0] if isinstance(value, tuple) else value).shape[0]
+
+def _take(value, start, stop):
+
+    return tuple(item[start:stop] for item in value) if isinstance(value, tuple) else value[start:stop]
+
+def _join(first, second):
+
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if isinstance(first, tuple):
+        return tuple(np.concatenate((a, b)) for a, b in zip(first, second))
+    return np.concatenate((first, second))
+
+class chunked_executor:
+
+    '''
+    Class to run strategy graphs over a history supplied in chunks, for tick histories larger than memory.
+    Every node keeps its carried state between chunks - filter values, rolling windows, the previous bar of crossovers
+    and diffs, pivots waiting for the bars after them - so the concatenated output of each column is exactly the
+    in memory graph run on the whole history. Ops that need later bars, such as pivot_points, return their rows late
+    and the rows of every column are emitted once all of their inputs are known, in row order.
+    Only the rows not yet consumed are kept, so memory is bounded by the chunk size, not the history.
+    Indicators are calculated with the first party kernels, see use_pandas_ta.
+
+    Arguments:
+    graphs (list): scan_graph objects, names must be unique
+    columns (dict): graph name -> list of output columns to emit - default None emits every column of every graph
+
+    Returns:
+    run calls emit(graph name, column, start row, values) as rows of each column complete and returns None
+
+    Raises:
+    ValueError if two graphs share a name, a requested column is unknown or an op has no chunked form, see register_chunk_op.
+
+    Example:
+    executor = chunked_executor(graphs = [double_rsi().graph(name = 'double')], columns = {'double': ['Signal']})
+    executor.run(chunks = pd.read_csv('ticks.csv', chunksize = 1_000_000), emit = lambda name, column, start, values: out.write(values))
+
+    PRECONDITIONS: chunks are dataframes or dicts of arrays holding the source columns, supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, graphs = None, columns = None):
+
+        self.plan = graph_executor(graphs = graphs, columns = columns).plan
+        unsupported = sorted({entry[1].op for entry in self.plan if entry[0] == 'compute' and entry[1].op not in _chunk_ops})
+        if unsupported:
+            raise ValueError(f"ops {unsupported} have no chunked form, register one with register_chunk_op")
+
+        #steps reading each node, a node's rows are dropped once every reader has them
+        self.readers = {}
+        for step, entry in enumerate(self.plan):
+            keys = [dependency.key for dependency in entry[1].inputs] if entry[0] == 'compute' else [entry[3]]
+            for key in keys:
+                self.readers.setdefault(key, []).append(step)
+
+    def _advance(self, chunk, emit, final):
+
+        for step, entry in enumerate(self.plan):
+            if entry[0] == 'emit':
+                _, name, column, key = entry
+                start, stop = self.fed[step], self.produced[key]
+                if stop > start:
+                    first = self.buffers[key][0]
+                    emit(name, column, start, _take(self.buffers[key][1], start - first, stop - first))
+                    self.fed[step] = stop
+                continue
+
+            item = entry[1]
+            state = self.states[item.key]
+            with profile_stage(item.op) as st:
+                output = None
+                if item.op == 'source':
+                    if chunk is not None:
+                        output = state.update(chunk)
+                else:
+                    #rows every input has produced and this node has not yet seen
+                    keys = [dependency.key for dependency in item.inputs]
+                    start, stop = self.fed[step], min(self.produced[key] for key in keys)
+                    if stop > start:
+                        output = state.update(*[_take(self.buffers[key][1], start - self.buffers[key][0], stop - self.buffers[key][0]) for key in keys])
+                        self.fed[step] = stop
+                if final and hasattr(state, 'finish'):
+                    output = _join(output, state.finish())
+                st.record(output)
+
+            if output is not None and _length(output):
+                first, held = self.buffers.get(item.key, (self.produced[item.key], None))
+                self.buffers[item.key] = (first, _join(held, output))
+                self.produced[item.key] += _length(output)
+
+        #drop rows every reader has consumed
+        for key, (first, held) in list(self.buffers.items()):
+            consumed = min((self.fed[step] for step in self.readers.get(key, [])), default = first + _length(held))
+            if consumed >= first + _length(held):
+                del self.buffers[key]
+            elif consumed > first:
+                self.buffers[key] = (consumed, _take(held, consumed - first, None))
+
+    def run(self, chunks = None, emit = None):
+
+        self.states = {entry[1].key: _chunk_ops[entry[1].op](**entry[1].params) for entry in self.plan if entry[0] == 'compute'}
+        self.produced = dict.fromkeys(self.states, 0)
+        self.fed = [0] * len(self.plan)
+        self.buffers = {}
+
+        for chunk in chunks:
+            self._advance(chunk, emit, final = False)
+        self._advance(None, emit, final = True)
+
+def run_chunked(store = None, symbol = None, graphs = None, columns = None, chunk_size = 1_000_000):
+    '''
+    Function to run strategy graphs over a symbol of a columnar_store chunk by chunk and store the output columns.
+    Source columns are read from their memory maps chunk_size rows at a time and each output column is appended to the
+    store as its rows complete, so histories of billions of rows run in memory bounded by the chunk size.
+    The stored columns are exactly those of the in memory run.
+
+    Arguments:
+    store (columnar_store): store holding the symbol
+    symbol (str): instrument to scan
+    graphs (list): scan_graph objects with unique names, e.g. from the graph method of each strategy
+    columns (dict): graph name -> list of output columns to store - default None stores every column of every graph
+    chunk_size (int): rows read per chunk - default 1,000,000
+
+    Returns:
+    List of the stored column names, the column name alone for a single graph, otherwise 'graph name column'
+
+    Raises:
+    ValueError if two graphs share a name, a requested column is unknown or an op has no chunked form.
+
+    Example:
+    store = columnar_store(path = 'data/ticks')
+    run_chunked(store = store, symbol = 'ES', graphs = [ts.double_rsi().graph()], columns = {'double_rsi': ['Signal', 'RSI Fast']})
+    signals = store.read_columns('ES', ['Signal'])['Signal']
+
+    PRECONDITIONS: the source columns the graphs read are stored for every row of the symbol.
+    KJAGGS OCT 2023
+    '''
+
+    executor = chunked_executor(graphs = graphs, columns = columns)
+    sources = sorted({entry[1].params['column'] for entry in executor.plan if entry[0] == 'compute' and entry[1].op == 'source'})
+    data = store.read_columns(symbol, sources)
+    rows = store.manifest(symbol)['rows']
+
+    def chunks():
+        for start in range(0, rows, chunk_size):
+            yield {name: values[start:start + chunk_size] for name, values in data.items()}
+
+    stored = {}
+    def emit(name, column, start, values):
+        stored_name = column if len(graphs) == 1 else f'{name} {column}'
+        stored[stored_name] = None
+        store.add_column(symbol, stored_name, values, params = {'graph': name, 'column': column}, start = start)
+
+    executor.run(chunks = chunks(), emit = emit)
+    return list(stored)
@@ -0,0 +1,244 @@
+import atexit
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+from trade_strat.profiling import profile_stage
+
+from .nodes import _ops
+
+pd = lazy_module('pandas')
+
+#worker count -> thread pool shared by every executor, threads are started once per process
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _thread_pool(workers):
+
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trade_strat')
+        return _pools[workers]
+
+@atexit.register
+def _shutdown_pools():
+    '''
+    Stop the shared pools at interpreter exit, queued nodes are cancelled and running ones finish first.
+    '''
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+class graph_executor:
+
+    '''
+    Class to run one or more strategy graphs over the same bars in a single pass.
+    Nodes with the same op, inputs and parameters are merged across every graph and computed once, inputs first.
+    The plan is built once, so one executor can run the same strategies over many symbols. Each node's output is
+    released as soon as its last consumer has run, and nodes only needed for columns that are not requested are skipped.
+    Every node runs inside a profile stage named after its op.
+    With workers set, nodes whose inputs are ready run concurrently on a shared thread pool, e.g. the stochastic RSI,
+    three EMAs and RSI of triple_ema_stoch_rsi. The numpy, scipy and numba kernels release the GIL on their inner loops,
+    so independent indicators overlap on a multi core machine. Each node still sees the same inputs, so results
+    are identical to the serial run, and columns are emitted in the same declared order from the calling thread.
+
+    Arguments:
+    graphs (list): scan_graph objects, names must be unique
+    columns (dict): graph name -> list of output columns to emit - default None emits every column of every graph
+    workers (int): threads computing independent nodes at the same time - default None runs every node in the calling thread
+
+    Returns:
+    run returns a dict of graph name -> {column: numpy array} for the emitted columns,
+    or calls emit(graph name, column, values) for each of them in declared order and returns None
+
+    Raises:
+    ValueError if two graphs share a name or a requested column is not an output of its graph.
+
+    Example:
+    executor = graph_executor(graphs = [triple.graph(name = 'triple'), double.graph(name = 'double')], columns = {'triple': ['Signal'], 'double': ['Signal']})
+    for symbol, df in data.items():
+        results[symbol] = executor.run(df_scan = df)
+    latest = graph_executor(graphs = [triple.graph()], workers = 4).run(df_scan = df_intraday)
+
+    PRECONDITIONS: every graph reads columns present in df_scan, graphs are not modified after the executor is built.
+    Ops registered with register_op are safe to call from several threads at once when workers is set.
+    Memory profiling figures are not reliable with workers, concurrent stages share the tracemalloc peak.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, graphs = None, columns = None, workers = None):
+
+        self.workers = workers
+        names = [graph.name for graph in graphs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"graph names must be unique, got {names}")
+
+        #plan of ('compute', node) and ('emit', graph name, column, node key) steps
+        self.plan = []
+        scheduled = set()
+
+        def schedule(item):
+            if item.key in scheduled:
+                return
+            for dependency in item.inputs:
+                schedule(dependency)
+            scheduled.add(item.key)
+            self.plan.append(('compute', item))
+
+        for graph in graphs:
+            wanted = list(graph.outputs) if columns is None or graph.name not in columns else list(columns[graph.name])
+            unknown = [column for column in wanted if column not in graph.outputs]
+            if unknown:
+                raise ValueError(f"graph {graph.name!r} has no output columns {unknown}, available: {list(graph.outputs)}")
+            for column in graph.outputs:
+                if column in wanted:
+                    schedule(graph.outputs[column])
+                    self.plan.append(('emit', graph.name, column, graph.outputs[column].key))
+
+        #outputs dropped after each step, a node is released once the last step reading it has run
+        last_use = {}
+        for step, entry in enumerate(self.plan):
+            keys = [dependency.key for dependency in entry[1].inputs] if entry[0] == 'compute' else [entry[3]]
+            for key in keys:
+                last_use[key] = step
+        self.release = [[] for _ in self.plan]
+        for key, step in last_use.items():
+            self.release[step].append(key)
+        self.n_nodes = len(scheduled)
+
+        #compute steps each compute step waits for
+        producer = {entry[1].key: step for step, entry in enumerate(self.plan) if entry[0] == 'compute'}
+        self.waits_for = {step: {producer[dependency.key] for dependency in entry[1].inputs} for step, entry in enumerate(self.plan) if entry[0] == 'compute'}
+
+    @staticmethod
+    def _compute(item, values, df_scan):
+
+        with profile_stage(item.op) as st:
+            if item.op == 'source':
+                output = _ops['source'](df_scan = df_scan, **item.params)
+            else:
+                output = _ops[item.op](*[values[dependency.key] for dependency in item.inputs], **item.params)
+            return st.record(output)
+
+    def run(self, df_scan = None, emit = None):
+
+        results = None
+        if emit is None:
+            results = {}
+            def emit(name, column, values):
+                results.setdefault(name, {})[column] = values
+
+        if self.workers is not None and self.workers > 1:
+            self._run_threaded(df_scan, emit)
+            return results
+
+        values = {}
+        for entry, release in zip(self.plan, self.release):
+            if entry[0] == 'compute':
+                item = entry[1]
+                values[item.key] = self._compute(item, values, df_scan)
+            else:
+                _, name, column, key = entry
+                emit(name, column, values[key])
+            for key in release:
+                del values[key]
+
+        return results
+
+    def _run_threaded(self, df_scan, emit):
+
+        '''
+        Run nodes as soon as their inputs are done, the calling thread takes one ready node itself and hands the rest
+        to the pool. Steps are retired in plan order, so columns are emitted and outputs released as in the serial run.
+        '''
+
+        pool = _thread_pool(self.workers)
+        values = {}
+        done = set()
+        waiting = {step: set(steps) for step, steps in self.waits_for.items()}
+        readers = {}
+        for step, steps in self.waits_for.items():
+            for dependency in steps:
+                readers.setdefault(dependency, []).append(step)
+        ready = [step for step, steps in waiting.items() if not steps]
+        running = {}
+        retired = 0
+
+        def finish(step, output):
+            values[self.plan[step][1].key] = output
+            done.add(step)
+            for reader in readers.get(step, []):
+                waiting[reader].discard(step)
+                if not waiting[reader]:
+                    ready.append(reader)
+
+        try:
+            while retired < len(self.plan):
+                #the pool takes every ready node but the first, which runs here while they do
+                while ready:
+                    step = ready.pop(0)
+                    if ready:
+                        #worker threads keep the scan context of the caller for profile records
+                        running[pool.submit(contextvars.copy_context().run, self._compute, self.plan[step][1], values, df_scan)] = step
+                    else:
+                        finish(step, self._compute(self.plan[step][1], values, df_scan))
+
+                while retired < len(self.plan):
+                    entry = self.plan[retired]
+                    if entry[0] == 'compute':
+                        if retired not in done:
+                            break
+                    else:
+                        emit(entry[1], entry[2], values[entry[3]])
+                    for key in self.release[retired]:
+                        del values[key]
+                    retired += 1
+
+                if running and not ready and retired < len(self.plan):
+                    completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        finish(running.pop(future), future.result())
+        finally:
+            #an error in one node leaves nothing running in the background
+            wait(running)
+
+def run_graphs(df_scan = None, graphs = None, workers = None):
+    '''
+    Function to run several strategy graphs over the same bars and collect their Signal columns from one pass.
+    Indicators and signals shared between the graphs are computed once.
+
+    Arguments:
+    df_scan (pandas dataframe): input OHLC dataframe - contains the source columns the graphs read, Close as a minimum
+    graphs (list): scan_graph objects with unique names, e.g. from the graph method of each strategy
+    workers (int): threads computing independent nodes at the same time, see graph_executor - default None
+
+    Returns:
+    Pandas dataframe on the df_scan index with one int8 column per graph that has a Signal output, named after the graph
+
+    Raises:
+    ValueError if two graphs share a name.
+
+    Example:
+    graphs = [ts.triple_ema_stoch_rsi(stoch_len = 14, ...).graph(name = 'triple'), ts.double_rsi().graph(name = 'double')]
+    df_signals = run_graphs(df_scan = df, graphs = graphs)
+
+    PRECONDITIONS: Input dataframe rows exceed the minimum required by the longest indicator of any graph.
+    KJAGGS OCT 2023
+    '''
+
+    with_signal = [graph for graph in graphs if 'Signal' in graph.outputs]
+    names = [graph.name for graph in graphs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"graph names must be unique, got {names}")
+
+    executor = graph_executor(graphs = with_signal, columns = {graph.name: ['Signal'] for graph in with_signal}, workers = workers)
+    signals = {}
+    def emit(name, column, values):
+        signals[name] = np.asarray(values).astype(np.int8)
+    executor.run(df_scan = df_scan, emit = emit)
+    return pd.DataFrame(signals, index=df_scan.index, columns=[graph.name for graph in with_signal])
@@ -0,0 +1,220 @@
+import numpy as np
+import trade_strat as ts
+
+def _source(column = None, df_scan = None):
+    return df_scan[column].to_numpy()
+
+def _indicator(indicator):
+    #indicators go through the shared cache, repeated runs on the same closes reuse earlier results
+    return lambda data, **params: ts.cached_indicator(indicator, data_col = data, **params)
+
+def _column(data, index = None):
+    return data[:, index]
+
+def _item(data, index = None):
+    return data[index]
+
+def _diff(data):
+    return np.concatenate(([np.NaN], np.diff(data)))
+
+def _shift(data):
+    return np.concatenate(([np.NaN], data[:-1]))
+
+def _above(lead, trailing):
+    return (lead > trailing).astype(int)
+
+def _below_value(data, value = None):
+    return data < value
+
+def _above_value(data, value = None):
+    return data > value
+
+def _threshold(data, upper_threshold = None, lower_threshold = None):
+    return ts.indicator_threshold(column = data, upper_threshold = upper_threshold, lower_threshold = lower_threshold)
+
+def _crossover(lead, trailing):
+    return ts.crossover(lead, trailing)
+
+def _crossover_fixed(data, threshold_low = None, threshold_high = None):
+    return ts.crossover_fixed(lead_col = data, threshold_low = threshold_low, threshold_high = threshold_high)
+
+def _grad_check(*columns, method = 'diff', period = None, min_slope = None):
+    return ts.grad_check(grad_array = np.column_stack(columns), method = method, period = period, min_slope = min_slope)
+
+def _pivot_points(data, order = None):
+    return ts.pivot_points(data_col = data, order = order)
+
+def _pivot_values(is_pivot, data, threshold = None, side = None):
+    #pivots on the wrong side of the threshold are dropped
+    values = np.where(is_pivot, data, np.NaN)
+    if side == 'high':
+        values[values < threshold] = np.NaN
+    else:
+        values[values > threshold] = np.NaN
+    return values
+
+def _where_valid(mask, data):
+    return np.where(np.isnan(mask), np.NaN, data)
+
+def _pivot_trend(data):
+    return ts.pivot_trend(input_col = data)
+
+def _both(first, second, first_value = None, second_value = None):
+    return (first == first_value) & (second == second_value)
+
+def _select(long, short):
+    return np.select([long, short], [1, -1], 0)
+
+#op name -> function(*input arrays, **params) returning a numpy array or tuple of arrays
+_ops = {
+    'source': _source,
+    'ema': _indicator('ema'),
+    'sma': _indicator('sma'),
+    'rsi': _indicator('rsi'),
+    'stochrsi': _indicator('stochrsi'),
+    'pta_ema': _indicator('pta_ema'),
+    'column': _column,
+    'item': _item,
+    'diff': _diff,
+    'shift': _shift,
+    'above': _above,
+    'below_value': _below_value,
+    'above_value': _above_value,
+    'threshold': _threshold,
+    'crossover': _crossover,
+    'crossover_fixed': _crossover_fixed,
+    'grad_check': _grad_check,
+    'pivot_points': _pivot_points,
+    'pivot_values': _pivot_values,
+    'where_valid': _where_valid,
+    'pivot_trend': _pivot_trend,
+    'both': _both,
+    'select': _select,
+}
+
+def register_op(name = None, func = None):
+    '''
+    Function to make a new operation available to strategy graph nodes.
+
+    Arguments:
+    name (str): op name used in node(...)
+    func (function): callable taking the input arrays positionally plus keyword parameters, returning a numpy array or tuple of arrays
+
+    Returns:
+    None
+
+    Raises:
+    None
+
+    Example:
+    register_op(name = 'midpoint', func = lambda high, low: (high + low) / 2)
+    mid = node('midpoint', node('source', column = 'High'), node('source', column = 'Low'))
+
+    PRECONDITIONS: func is a pure function of its inputs and parameters, nodes with the same inputs and parameters are computed once.
+    KJAGGS OCT 2023
+    '''
+
+    _ops[name] = func
+
+class node:
+
+    '''
+    Class for one step of a strategy graph - an op applied to the outputs of other nodes with fixed parameters.
+    Nodes are identified by their op, inputs and parameters, so the same calculation declared by several strategies
+    has the same key and the executor computes it once.
+
+    Arguments:
+    op (str): registered op name e.g. 'ema', 'crossover', 'source' reads a column of the input dataframe
+    inputs (node): nodes whose outputs are passed to the op positionally
+    params: keyword parameters passed to the op e.g. ema_period = 200
+
+    Returns:
+    key holds the structural identity of the node
+
+    Raises:
+    KeyError if the op has not been registered.
+
+    Example:
+    close = node('source', column = 'Close')
+    ema_fast = node('ema', close, ema_period = 21)
+    close_above = node('above', close, ema_fast)
+
+    PRECONDITIONS: parameter values are hashable.
+    KJAGGS OCT 2023
+    '''
+
+    __slots__ = ('op', 'inputs', 'params', 'key')
+
+    def __init__(self, op = None, *inputs, **params):
+
+        if op not in _ops:
+            raise KeyError(f"unknown op {op!r}, register it with register_op")
+        self.op = op
+        self.inputs = inputs
+        self.params = params
+        self.key = (op, tuple(item.key for item in inputs), tuple(sorted(params.items())))
+
+    def __getitem__(self, index):
+
+        #one output of a node returning a 2D array or a tuple
+        return node('item', self, index = index)
+
+    def __repr__(self):
+
+        args = [repr(item.op) for item in self.inputs] + [f"{name}={value!r}" for name, value in sorted(self.params.items())]
+        return f"node({self.op!r}, {', '.join(args)})"
+
+class scan_graph:
+
+    '''
+    Class to declare a strategy as a graph of nodes with named output columns.
+    Columns are emitted in the order they are added, a strategy producing trades adds a 'Signal' column.
+
+    Arguments:
+    name (str): strategy label, used as the Signal column name when several graphs run together
+
+    Returns:
+    outputs holds the column name -> node mapping in declared order
+
+    Raises:
+    None
+
+    Example:
+    graph = scan_graph(name = 'fast cross')
+    close = graph.source('Close')
+    graph.add('EMA', node('ema', close, ema_period = 21))
+    graph.add('Signal', node('crossover', close, graph.outputs['EMA']))
+
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, name = None):
+
+        self.name = name
+        self.outputs = {}
+
+    def source(self, column = None):
+
+        return node('source', column = column)
+
+    def add(self, column = None, item = None):
+
+        self.outputs[column] = item
+        return item
+
+    def nodes(self):
+
+        '''
+        Every node the outputs depend on, inputs before the nodes that use them.
+        '''
+
+        ordered = {}
+        def visit(item):
+            if item.key in ordered:
+                return
+            for dependency in item.inputs:
+                visit(dependency)
+            ordered[item.key] = item
+        for item in self.outputs.values():
+            visit(item)
+        return list(ordered.values())
@@ -1,3 +1,9 @@
 from .sma import simple_moving_average
 from .ema import exp_moving_average
-from .gradient import grad_check
\ No newline at end of file
+from .gradient import grad_check
+from .streaming import ema_stream, sma_stream, rsi_stream, stoch_rsi_stream
+from .cache import indicator_cache, cached_indicator, register_indicator, default_cache, use_pandas_ta
+from .batch import ema_batch, sma_batch, rsi_batch, stoch_rsi_batch
+from .kernels import ema_kernel, sma_kernel, rsi_kernel, stoch_rsi_kernel, seeded_ema_kernel
+from .chunked import ema_chunked, sma_chunked, rsi_chunked, stoch_rsi_chunked, seeded_ema_chunked, grad_check_chunked
+from .backend import use_backend, register_backend, active_backend
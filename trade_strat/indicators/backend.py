@@ -0,0 +1,109 @@
+import importlib.util
+import os
+
+from trade_strat._lazy import lazy_module
+
+numba = lazy_module('numba')
+
+#backend name -> {kernel name -> function}, kernels missing from a backend fall back to numpy
+_backends = {'numpy': {}, 'numba': {}}
+
+def _jit(func):
+    '''
+    Kernel compiled with numba on its first call and cached on disk, so later processes skip the compile.
+    The GIL is released while it runs, so graph nodes on worker threads overlap. Division follows numpy, a zero
+    divisor gives inf or NaN rather than raising, which also lets loops with a division compile to vector instructions.
+    '''
+    compiled = []
+    def call(*args):
+        if not compiled:
+            compiled.append(numba.njit(cache=True, nogil=True, error_model='numpy')(func))
+        return compiled[0](*args)
+    call.__wrapped__ = func
+    return call
+
+def _register_kernel(name, reference, loop):
+    '''
+    Add a path dependent kernel: reference is the numpy implementation, loop the same calculation written
+    as a plain loop over arrays that numba can compile.
+    '''
+    _backends['numpy'][name] = reference
+    _backends['numba'][name] = _jit(loop)
+
+def _kernel(name):
+
+    return _backends[_active[0]].get(name) or _backends['numpy'][name]
+
+def register_backend(name = None, kernels = None):
+    '''
+    Function to add a compute backend, or replace kernels of an existing one.
+
+    Arguments:
+    name (str): backend name, as given to use_backend
+    kernels (dict): kernel name -> function with the same arguments and outputs as the numpy kernel, missing kernels use numpy.
+    Kernels are 'ewm_filter' (first order recursive filter), 'ewm_update' (pandas ewm with min_periods, as used by the
+    streaming classes), 'ewm_mean' and 'rolling_mean' (pandas ewm and rolling mean, as used by the pandas_ta
+    indicators), 'ewm_mean_batch' and 'wilder_rsi_batch' (the recursions of ema_batch and rsi_batch for every period
+    at once), 'pivot_trend' and 'backtest' (the per column totals of vector_backtest.run_backtest)
+
+    Returns:
+    None
+
+    Raises:
+    None
+
+    Example:
+    register_backend(name = 'numba_fastmath', kernels = {'ewm_filter': numba.njit(fastmath = True)(my_filter)})
+    use_backend(name = 'numba_fastmath')
+
+    PRECONDITIONS: each kernel gives the same output as the numpy kernel for the same inputs.
+    KJAGGS OCT 2023
+    '''
+
+    _backends.setdefault(name, {}).update(kernels or {})
+
+def use_backend(name = None):
+    '''
+    Function to choose the backend for the path dependent kernels - the Wilder RSI and ema recursions, the
+    stochastic RSI rolling means, the min_periods ewm of the streaming classes and the pivot trend state machine.
+    'numpy' is the reference implementation. 'numba' compiles the same calculations as loops on first use and caches
+    the compiled code on disk, it is chosen automatically when numba is installed. Both give identical outputs, see
+    benchmarks/bench_backends.py. TRADE_STRAT_BACKEND=numpy selects a backend for the whole process.
+
+    Arguments:
+    name (str): 'numpy', 'numba' or a name given to register_backend - default None picks numba when installed, else numpy
+
+    Returns:
+    None
+
+    Raises:
+    ValueError if the backend is unknown.
+    ImportError if name is 'numba' and numba is not installed.
+
+    Example:
+    use_backend(name = 'numpy')
+    df_scan = double_rsi(df_scan = df).run_scan()
+    use_backend()
+
+    KJAGGS OCT 2023
+    '''
+
+    #numba is only imported when a kernel is first compiled
+    installed = importlib.util.find_spec('numba') is not None
+    if name is None:
+        name = 'numba' if installed else 'numpy'
+    if name not in _backends:
+        raise ValueError(f"unknown backend {name!r}, available: {sorted(_backends)}")
+    if name == 'numba' and not installed:
+        raise ImportError("the numba backend needs numba installed, pip install numba")
+    _active[0] = name
+
+def active_backend():
+    '''
+    Function to return the name of the backend in use, see use_backend.
+    '''
+
+    return _active[0]
+
+_active = ['numpy']
+use_backend(name = os.environ.get('TRADE_STRAT_BACKEND') or None)
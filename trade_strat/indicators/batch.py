@@ -0,0 +1,251 @@
+import numpy as np
+
+from .backend import _kernel, _register_kernel
+from .kernels import _ema_com, _ewm_mean_reference, _first_valid, _gain_loss, _pandas_mean, _stoch, _wilder_com, _wilder_rsi, sma_kernel
+
+def _ewm_mean_batch_reference(x, coms, min_periods, out):
+    '''
+    pandas ewm(com, min_periods).mean() of one array for many centres of mass, written into the columns of out.
+    '''
+    for j in range(coms.shape[0]):
+        out[:, j] = _ewm_mean_reference(x, coms[j], True, int(min_periods[j]), np.zeros(0))
+    return out
+
+def _ewm_mean_batch_loop(x, coms, min_periods, out):
+    #the steps of _ewm_mean_loop with adjust for every centre of mass, one bar at a time
+    #observations are shared by every column, so the count and the first row do not depend on the column
+    k = coms.shape[0]
+    factor = np.empty(k)
+    for j in range(k):
+        factor[j] = 1.0 - 1.0 / (1.0 + coms[j])
+    weighted = np.empty(k)
+    old_wt = np.ones(k)
+    nobs = 0.0
+    for i in range(x.shape[0]):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1.0
+        for j in range(k):
+            w = weighted[j]
+            if i == 0:
+                w = cur
+            elif w == w:
+                wt = old_wt[j] * factor[j]
+                if is_observation:
+                    #avoid numerical errors on constant series
+                    if w != cur:
+                        w = wt * w + 1.0 * cur
+                        w /= (wt + 1.0)
+                    wt += 1.0
+                old_wt[j] = wt
+            elif is_observation:
+                w = cur
+            weighted[j] = w
+            out[i, j] = w if nobs >= min_periods[j] else np.nan
+    return out
+
+_register_kernel('ewm_mean_batch', _ewm_mean_batch_reference, _ewm_mean_batch_loop)
+
+def _wilder_rsi_batch_reference(gain, loss, coms, lengths, out):
+    '''
+    _wilder_rsi of the same gains and losses for many lengths, written into the columns of out.
+    '''
+    for j in range(lengths.shape[0]):
+        if gain.shape[0] >= lengths[j]:
+            _wilder_rsi(gain, loss, int(lengths[j]), out[:, j])
+    return out
+
+def _wilder_rsi_batch_loop(gain, loss, coms, lengths, out):
+    #the steps of _ewm_mean_loop with adjust for the gains then the losses of every length, one bar at a time
+    #observations are shared by every length, so the count and the first row do not depend on the column
+    k = coms.shape[0]
+    factor = np.empty(2 * k)
+    for j in range(k):
+        factor[j] = 1.0 - 1.0 / (1.0 + coms[j])
+        factor[k + j] = factor[j]
+    weighted = np.empty(2 * k)
+    old_wt = np.ones(2 * k)
+    nobs = np.zeros(2)
+    for i in range(gain.shape[0]):
+        for s in range(2):
+            cur = gain[i] if s == 0 else loss[i]
+            is_observation = cur == cur
+            if is_observation:
+                nobs[s] += 1.0
+            for j in range(s * k, s * k + k):
+                w = weighted[j]
+                if i == 0:
+                    w = cur
+                elif w == w:
+                    wt = old_wt[j] * factor[j]
+                    if is_observation:
+                        #avoid numerical errors on constant series
+                        if w != cur:
+                            w = wt * w + 1.0 * cur
+                            w /= (wt + 1.0)
+                        wt += 1.0
+                    old_wt[j] = wt
+                elif is_observation:
+                    w = cur
+                weighted[j] = w
+        for j in range(k):
+            g = weighted[j] if nobs[0] >= lengths[j] else np.nan
+            l = weighted[k + j] if nobs[1] >= lengths[j] else np.nan
+            out[i, j] = g * 100 / (g + l)
+    return out
+
+_register_kernel('wilder_rsi_batch', _wilder_rsi_batch_reference, _wilder_rsi_batch_loop)
+
+def ema_batch(data_col = None, ema_periods = None):
+    '''
+    Function to create exponential moving averages of a data series for many periods at once.
+    The pandas ewm recursions of every period run in one pass over the bars on the numba backend, a loop across the
+    periods of each bar; the numpy backend runs pandas one column at a time. Each column is bit for bit
+    exp_moving_average for its period.
+
+    Arguments:
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    ema_periods (list of int): periods over which to calculate moving averages
+
+    Returns:
+    Numpy array of shape (bars, len(ema_periods)), one column per period
+
+    Raises:
+    None
+
+    Example:
+    ema_matrix = ema_batch(data_col=df.Close, ema_periods=[21, 50, 100, 200])
+
+    PRECONDITIONS: data column is one dimensional.
+    KJAGGS OCT 2023
+    '''
+
+    x = np.ascontiguousarray(data_col, dtype=float)
+    out = np.empty((x.shape[0], len(ema_periods)))
+    coms = np.array([_ema_com(period) for period in ema_periods], dtype=float)
+    _kernel('ewm_mean_batch')(x, coms, np.array(ema_periods, dtype=np.int64), out)
+    return out
+
+def sma_batch(data_col = None, sma_periods = None):
+    '''
+    Function to create simple moving averages of a data series for many periods at once.
+    A loop over the periods, each column is calculated by sma_kernel with vectorised numpy passes, O(n) whatever the period.
+
+    Arguments:
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    sma_periods (list of int): periods over which to calculate moving averages
+
+    Returns:
+    Numpy array of shape (bars, len(sma_periods)), one column per period
+
+    Raises:
+    None
+
+    Example:
+    sma_matrix = sma_batch(data_col=df.Close, sma_periods=[10, 20, 50])
+
+    PRECONDITIONS: data column is one dimensional.
+    KJAGGS OCT 2023
+    '''
+
+    x = np.asarray(data_col, dtype=float)
+    out = np.empty((x.shape[0], len(sma_periods)))
+    for j, period in enumerate(sma_periods):
+        sma_kernel(data = x, period = period, out = out[:, j])
+    return out
+
+def rsi_batch(data_col = None, rsi_lens = None):
+    '''
+    Function to create Wilder RSI of a data series for many lengths at once.
+    Price changes are split into gains and losses once and shared by every length. On the numba backend the Wilder
+    averages of every length run in one pass over the bars, the numpy backend averages one length at a time with pandas.
+    Matches pta.rsi for each length bit for bit, see rsi_kernel.
+
+    Arguments:
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    rsi_lens (list of int): rsi lengths
+
+    Returns:
+    Numpy array of shape (bars, len(rsi_lens)), one column per length
+
+    Raises:
+    None
+
+    Example:
+    rsi_matrix = rsi_batch(data_col=df.Close, rsi_lens=[2, 7, 14])
+
+    PRECONDITIONS: data column contains no NaN after the first valid value.
+    KJAGGS OCT 2023
+    '''
+
+    x = np.asarray(data_col, dtype=float)
+    out = np.full((x.shape[0], len(rsi_lens)), np.nan)
+    start = _first_valid(x)
+
+    gain, loss = _gain_loss(x[start:])
+    lengths = np.array([int(length) for length in rsi_lens], dtype=np.int64)
+    coms = np.array([_wilder_com(length) for length in lengths], dtype=float)
+    _kernel('wilder_rsi_batch')(gain, loss, coms, lengths, out[start + 1:])
+
+    return out
+
+def stoch_rsi_batch(data_col = None, stoch_params = None):
+    '''
+    Function to create stochastic RSI K and D of a data series for many parameter sets at once.
+    RSI, rolling min/max and K smoothing are shared between parameter sets that have them in common. The RSI of every
+    length comes from rsi_batch, the rolling windows are then a loop over the distinct parameters, each a numpy pass.
+    Matches pta.stochrsi for each parameter set bit for bit, see stoch_rsi_kernel.
+
+    Arguments:
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    stoch_params (list of tuple): (stoch_len, stochrsi_length, stoch_k, stoch_d) for each parameter set
+
+    Returns:
+    Tuple of two numpy arrays (k, d), each of shape (bars, len(stoch_params))
+
+    Raises:
+    None
+
+    Example:
+    srsik, srsid = stoch_rsi_batch(data_col=df.Close, stoch_params=[(14, 14, 3, 3), (21, 14, 3, 3)])
+
+    PRECONDITIONS: data column contains no NaN after the first valid value.
+    KJAGGS OCT 2023
+    '''
+
+    x = np.asarray(data_col, dtype=float)
+    n = x.shape[0]
+    stoch_params = [tuple(int(v) for v in p) for p in stoch_params]
+    out_k = np.full((n, len(stoch_params)), np.nan)
+    out_d = np.full((n, len(stoch_params)), np.nan)
+
+    rsi_lens = sorted({p[1] for p in stoch_params})
+    rsi_matrix = rsi_batch(data_col = x, rsi_lens = rsi_lens)
+    stoch_cache = {}
+    k_cache = {}
+
+    for j, (stoch_len, rsi_len, stoch_k, stoch_d) in enumerate(stoch_params):
+
+        rsi = rsi_matrix[:, rsi_lens.index(rsi_len)]
+        start = _first_valid(rsi)
+        if n - start < stoch_len:
+            continue
+
+        if (rsi_len, stoch_len) not in stoch_cache:
+            stoch_cache[(rsi_len, stoch_len)] = _stoch(rsi[start:], stoch_len)[0]
+        stoch = stoch_cache[(rsi_len, stoch_len)]
+
+        #stoch is valid from stoch_len - 1 onwards, K from a further stoch_k - 1
+        k_start = start + stoch_len - 1
+        if (rsi_len, stoch_len, stoch_k) not in k_cache:
+            k = np.full(n, np.nan)
+            k[k_start:] = _pandas_mean(stoch[stoch_len - 1:], stoch_k)
+            k_cache[(rsi_len, stoch_len, stoch_k)] = k
+        k = k_cache[(rsi_len, stoch_len, stoch_k)]
+
+        d_start = k_start + stoch_k - 1
+        out_k[:, j] = k
+        out_d[d_start:, j] = _pandas_mean(k[d_start:], stoch_d)
+
+    return out_k, out_d
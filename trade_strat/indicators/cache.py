@@ -0,0 +1,234 @@
+import hashlib
+import importlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+from .ema import exp_moving_average
+from .kernels import rsi_kernel, seeded_ema_kernel, stoch_rsi_kernel
+from .sma import simple_moving_average
+
+pd = lazy_module('pandas')
+pta = lazy_module('pandas_ta')
+
+def _pta_rsi(data, length = None):
+    return pta.rsi(close = pd.Series(data), length = length).to_numpy()
+
+def _pta_stochrsi(data, length = None, rsi_length = None, k = None, d = None):
+    return pta.stochrsi(close = pd.Series(data), length = length, rsi_length = rsi_length, k = k, d = d).to_numpy()
+
+def _pta_ema(data, length = None):
+    return pta.ema(close = pd.Series(data), length = length).to_numpy()
+
+def _rsi(data, length = None):
+    return rsi_kernel(data = data, length = length)
+
+def _stochrsi(data, length = None, rsi_length = None, k = None, d = None):
+    return stoch_rsi_kernel(data = data, length = length, rsi_length = rsi_length, k = k, d = d)
+
+def _seeded_ema(data, length = None):
+    return seeded_ema_kernel(data = data, length = length)
+
+def _ema(data, ema_period = None):
+    return exp_moving_average(ema_period = ema_period, data_col = data)
+
+def _sma(data, sma_period = None):
+    return simple_moving_average(sma_period = sma_period, data_col = data)
+
+#indicators computed by pandas_ta when it is switched on, each matched by a first party kernel
+_native = {'rsi': _rsi, 'stochrsi': _stochrsi, 'pta_ema': _seeded_ema}
+_pandas_ta = {'rsi': _pta_rsi, 'stochrsi': _pta_stochrsi, 'pta_ema': _pta_ema}
+
+#indicator name -> function(numpy array, **params) returning a numpy array
+_indicators = {
+    'ema': _ema,
+    'sma': _sma,
+    **_native,
+}
+
+def use_pandas_ta(enabled = True):
+    '''
+    Function to compute rsi, stochrsi and pta_ema with pandas_ta instead of the first party kernels.
+    The kernels run the same pandas recursions and rolling means as pandas_ta, so their values are bit for bit
+    identical and signals never change between the two. They are the default, pandas_ta is an optional dependency
+    kept as a reference. TRADE_STRAT_PANDAS_TA=1 switches it on for the whole process.
+    Cached results are keyed on the function that made them, so switching never returns the other's values.
+
+    Arguments:
+    enabled (bool): True for pandas_ta, False for the kernels - default True
+
+    Returns:
+    None
+
+    Raises:
+    ImportError if enabled and pandas_ta is not installed.
+
+    Example:
+    use_pandas_ta()
+    df_scan = triple_ema_stoch_rsi(df_scan = df, ...).run_scan()
+    use_pandas_ta(enabled = False)
+
+    KJAGGS OCT 2023
+    '''
+
+    if enabled:
+        importlib.import_module('pandas_ta')
+    _indicators.update(_pandas_ta if enabled else _native)
+
+def register_indicator(name = None, func = None):
+    '''
+    Function to make an indicator available to the cache under a name.
+
+    Arguments:
+    name (str): key used in cached_indicator calls
+    func (function): callable taking a numpy array as the first argument plus keyword parameters, returning a numpy array
+
+    Returns:
+    None
+
+    Raises:
+    None
+
+    Example:
+    register_indicator(name = 'wma', func = my_weighted_average)
+    '''
+
+    _indicators[name] = func
+
+def fingerprint(data = None):
+    '''
+    Function to create a content fingerprint of an input array, used as part of the cache key.
+
+    Arguments:
+    data (numpy array or pandas column): input data
+
+    Returns:
+    Tuple of dtype, shape and a 128 bit blake2b digest of the raw bytes
+
+    Raises:
+    None
+
+    Example:
+    key = fingerprint(df['Close'])
+    '''
+
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(data.view(np.uint8).reshape(-1), digest_size=16).hexdigest()
+    return (data.dtype.str, data.shape, digest)
+
+class indicator_cache:
+
+    '''
+    Class to memoise indicator results across strategies and repeated scans.
+    Entries are keyed on a fingerprint of the input data plus the indicator name and parameters,
+    and evicted least recently used first once the byte budget is exceeded.
+    Cached arrays are returned read only, assigning them to a dataframe column takes a copy.
+
+    Arguments:
+    max_bytes (int): upper bound on the total size of cached arrays - default 256 MB
+    enabled (bool): False computes every indicator directly and stores nothing - default True
+
+    Returns:
+    lookup returns the indicator output as a numpy array
+    stats returns a dict of hits, misses, evictions, entries and bytes
+
+    Raises:
+    KeyError if the indicator name has not been registered.
+
+    Example:
+    cache = indicator_cache(max_bytes = 512 * 2**20)
+    ema_slow = cache.lookup('ema', data_col = df['Close'], ema_period = 200)
+
+    PRECONDITIONS: registered indicators are pure functions of the input data and parameters.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, max_bytes = 256 * 2**20, enabled = True):
+
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, indicator = None, data_col = None, **params):
+
+        func = _indicators[indicator]
+        data = np.asarray(data_col)
+
+        if not self.enabled:
+            return func(data, **params)
+
+        key = (indicator, func, fingerprint(data), tuple(sorted(params.items())))
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = np.asarray(func(data, **params))
+        result.setflags(write=False)
+
+        with self._lock:
+            if key not in self._entries and result.nbytes <= self.max_bytes:
+                self._entries[key] = result
+                self._bytes += result.nbytes
+                #evict least recently used entries until within budget
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+                    self.evictions += 1
+
+        return result
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self._bytes}
+
+if os.environ.get('TRADE_STRAT_PANDAS_TA', '0') == '1':
+    use_pandas_ta()
+
+#shared cache used by the strategies, set TRADE_STRAT_CACHE=0 to opt out for the whole process
+default_cache = indicator_cache(enabled = os.environ.get('TRADE_STRAT_CACHE', '1') != '0')
+
+def cached_indicator(indicator = None, data_col = None, **params):
+    '''
+    Function to look up an indicator in the shared cache, computing and storing it on a miss.
+
+    Arguments:
+    indicator (str): registered indicator name - 'ema', 'sma', 'rsi', 'stochrsi' or 'pta_ema'
+    data_col (float): pandas column or numpy array input - recommended to run on close
+    params: keyword parameters passed to the indicator e.g. ema_period = 200
+
+    Returns:
+    Numpy array (read only) - declare as a new pandas column
+
+    Raises:
+    KeyError if the indicator name has not been registered.
+
+    Example:
+    df['EMA SLOW'] = cached_indicator('ema', data_col = df['Close'], ema_period = 200)
+    df[['srsik','srsid']] = cached_indicator('stochrsi', data_col = df['Close'], length = 14, rsi_length = 14, k = 3, d = 3)
+    '''
+
+    return default_cache.lookup(indicator, data_col = data_col, **params)
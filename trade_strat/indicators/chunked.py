@@ -0,0 +1,402 @@
+import numpy as np
+
+from .gradient import _LSQ_BLOCK, _slope_period, grad_check
+from .backend import _kernel
+from .kernels import _CSUM_BLOCK, _ema_com, _ewm_state, _gain_loss, _rolling_state, _seeded_ema, _stoch, _wilder_rsi, _window_count
+
+class _rolling_mean_chunks:
+
+    '''
+    pandas rolling mean of an array supplied in chunks, as _pandas_mean on the whole array. The compensated sums and
+    the last period values are carried between chunks, so every value is bit for bit the one a single call would give.
+    '''
+
+    def __init__(self, period = None):
+
+        self.period = int(period)
+        self.state = _rolling_state()
+        self.window = np.zeros(0)
+
+    def update(self, x):
+
+        values = np.concatenate((self.window, x))
+        out = _kernel('rolling_mean')(values, self.period, self.window.shape[0], self.state)
+        self.window = values[max(values.shape[0] - self.period, 0):].copy()
+        return out
+
+class ema_chunked:
+
+    '''
+    Class to calculate an exponential moving average over a history supplied in chunks, for histories larger than memory.
+    Only the state of the pandas ewm recursion is kept between chunks, so the concatenated output is exactly
+    exp_moving_average of the concatenated input while memory stays bounded by the chunk size. The recursion is
+    compiled with the numba backend and run as a python loop with numpy, see use_backend.
+
+    Arguments:
+    ema_period (int): number of unit periods over which to calculate moving average
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk, NaN until ema_period values are observed
+
+    Raises:
+    None
+
+    Example:
+    ema = ema_chunked(ema_period = 200)
+    for chunk in pd.read_csv('ticks.csv', usecols = ['Close'], chunksize = 1_000_000):
+        values = ema.update(chunk['Close'])
+
+    PRECONDITIONS: chunks are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, ema_period = None):
+
+        self.ema_period = ema_period
+        self._state = _ewm_state()
+
+    def update(self, data = None):
+
+        x = np.ascontiguousarray(data, dtype=np.float64)
+        return _kernel('ewm_mean')(x, _ema_com(self.ema_period), True, self.ema_period, self._state)
+
+class sma_chunked:
+
+    '''
+    Class to calculate a simple moving average over a history supplied in chunks, for histories larger than memory.
+    The last sma_period - 1 values, the running cumulative sum of the current 65536 row block and the length of the
+    current run of identical values are kept between chunks, so the concatenated output is exactly
+    simple_moving_average of the concatenated input, NaN windows, flat windows and sign corrections included.
+
+    Arguments:
+    sma_period (int): number of unit periods over which to calculate moving average
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk
+
+    Raises:
+    None
+
+    Example:
+    sma = sma_chunked(sma_period = 50)
+    for start in range(0, closes.shape[0], chunk_size):
+        out[start:start + chunk_size] = sma.update(closes[start:start + chunk_size])
+
+    PRECONDITIONS: chunks are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, sma_period = None):
+
+        self.sma_period = int(sma_period)
+        self.count = 0
+        p = self.sma_period
+        self._tail = np.zeros(0)
+        self._tail_nan = np.zeros(0, dtype=bool)
+        self._tail_neg = np.zeros(0, dtype=bool)
+        self._run_len = 0
+        self._last = np.nan
+
+        #block state of the cumulative sums, see sma_kernel
+        self._offset = 0.0
+        self._csum_tail = np.zeros(p)
+
+    def update(self, data = None):
+
+        p = self.sma_period
+        start = self.count
+        nan_mask = np.isnan(np.asarray(data, dtype=np.float64))
+        x = np.where(nan_mask, 0, np.asarray(data, dtype=np.float64))
+        m = x.shape[0]
+        end = start + m
+        out = np.full(m, np.nan)
+        if m == 0:
+            return out
+
+        #history window, base is the row number of its first value
+        window = np.concatenate((self._tail, x))
+        base = start - self._tail.shape[0]
+
+        row = max(start, p - 1)
+        while row < end:
+            block_start = p - 1 + (row - (p - 1)) // _CSUM_BLOCK * _CSUM_BLOCK
+            stop = min(block_start + _CSUM_BLOCK, end)
+            if row == block_start:
+                seg_start = block_start - p + 1
+                self._offset = np.float64(window[seg_start - base])
+                csum = np.concatenate(([0.0], np.cumsum(window[seg_start - base:stop - base] - self._offset, dtype=np.float64)))
+            else:
+                #cumsum carries on from the last sum of the block
+                sums = np.cumsum(np.concatenate((self._csum_tail[-1:], window[row - base:stop - base] - self._offset)), dtype=np.float64)
+                csum = np.concatenate((self._csum_tail, sums[1:]))
+            out[row - start:stop - start] = (csum[p:] - csum[:-p]) / p + self._offset
+            self._csum_tail = csum[-p:]
+            row = stop
+
+        #length of the run of identical values ending at each row
+        changed = np.empty(m, dtype=bool)
+        changed[0] = x[0] != self._last
+        changed[1:] = x[1:] != x[:-1]
+        run_start = np.maximum.accumulate(np.where(changed, np.arange(m), -self._run_len))
+        run_len = np.arange(m) - run_start + 1
+        flat = run_len >= p
+        out[flat] = x[flat]
+
+        first = max(p - 1 - start, 0)
+        mean = out[first:]
+        neg_count = _window_count(np.concatenate((self._tail_neg, np.signbit(x))), p)
+        mean[(neg_count == 0) & (mean < 0)] = 0
+        mean[(neg_count == p) & (mean > 0)] = 0
+        mean[_window_count(np.concatenate((self._tail_nan, nan_mask)), p) > 0] = np.nan
+
+        keep = window.shape[0] - (p - 1)
+        self._tail = window[max(keep, 0):].copy()
+        self._tail_nan = np.concatenate((self._tail_nan, nan_mask))[max(keep, 0):]
+        self._tail_neg = np.concatenate((self._tail_neg, np.signbit(x)))[max(keep, 0):]
+        self._run_len = int(run_len[-1])
+        self._last = x[-1]
+        self.count = end
+        return out
+
+class rsi_chunked:
+
+    '''
+    Class to calculate a Wilder RSI over a history supplied in chunks, for histories larger than memory.
+    The previous close and the state of the gain and loss averages are kept between chunks, so the concatenated output
+    is exactly rsi_kernel of the concatenated input. The averages are a recursion, compiled with the numba backend
+    and run as a python loop with numpy, see use_backend.
+
+    Arguments:
+    length (int): rsi length
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk, NaN until length price changes are observed
+
+    Raises:
+    None
+
+    Example:
+    rsi = rsi_chunked(length = 14)
+    for chunk in pd.read_csv('ticks.csv', usecols = ['Close'], chunksize = 1_000_000):
+        values = rsi.update(chunk['Close'])
+
+    PRECONDITIONS: chunks are supplied oldest to newest, no NaN after the first valid close.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, length = None):
+
+        self.length = int(length)
+        self.changes = 0
+        self._prev = None
+        self._states = (_ewm_state(), _ewm_state())
+
+    def update(self, data = None):
+
+        x = np.asarray(data, dtype=np.float64)
+        out = np.full(x.shape[0], np.nan)
+        first = 0
+        if self._prev is None:
+            #nothing happens until the first valid close
+            valid = np.flatnonzero(~np.isnan(x))
+            if valid.shape[0] == 0:
+                return out
+            first = valid[0] + 1
+            self._prev = x[valid[0]]
+        if first >= x.shape[0]:
+            return out
+
+        gain, loss = _gain_loss(np.concatenate(([self._prev], x[first:])))
+        self._prev = x[-1]
+        #the averages count their own observations, so the warm up rows are NaN as in rsi_kernel
+        _wilder_rsi(gain, loss, self.length, out[first:], self._states)
+        self.changes += gain.shape[0]
+        return out
+
+class stoch_rsi_chunked:
+
+    '''
+    Class to calculate stochastic RSI K and D over a history supplied in chunks, for histories larger than memory.
+    Combines rsi_chunked, the last length - 1 RSI values for the rolling range and the carried K and D rolling means,
+    so the concatenated output is exactly stoch_rsi_kernel of the concatenated input. The one exception is the
+    pandas_ta offset of flat ranges: a single call offsets every range once any window of the column is flat, the
+    chunks can only do so from the chunk holding the first flat window, so if that is not the first chunk with a
+    valid stochastic the earlier rows can differ where the RSI range is within a few units in the last place of zero,
+    such as an RSI pinned at 100 on a rising flat stretch, and the K and D running sums carry that difference into
+    later rows in the last bits. The recursions are compiled with the numba
+    backend and run as python loops with numpy, see use_backend.
+
+    Arguments:
+    length (int): length of stochastic -  typically 14
+    rsi_length (int): length of rsi within stochastic -  typically 14
+    k (int): length of stochastic k smoothing -  typically 3
+    d (int): length of stochastic d smoothing -  typically 3
+
+    Returns:
+    update returns a numpy array of shape (rows, 2) for the chunk, column 0 is K, column 1 is D
+
+    Raises:
+    None
+
+    Example:
+    stoch_rsi = stoch_rsi_chunked(length = 14, rsi_length = 14, k = 3, d = 3)
+    for chunk in pd.read_csv('ticks.csv', usecols = ['Close'], chunksize = 1_000_000):
+        values = stoch_rsi.update(chunk['Close'])
+
+    PRECONDITIONS: chunks are supplied oldest to newest, no NaN after the first valid close.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, length = None, rsi_length = None, k = None, d = None):
+
+        self.length = int(length)
+        self.rsi_length = int(rsi_length)
+        self.k = int(k)
+        self.d = int(d)
+        self._rsi = rsi_chunked(length = rsi_length)
+        self._rsi_tail = None
+        self._flat = False
+        self._k_mean = _rolling_mean_chunks(period = self.k)
+        self._d_mean = _rolling_mean_chunks(period = self.d)
+        #rows of stochastic and K seen so far
+        self._stoch_rows = 0
+        self._k_rows = 0
+
+    def update(self, data = None):
+
+        rsi = self._rsi.update(data)
+        out = np.full((rsi.shape[0], 2), np.nan)
+        first = 0
+        if self._rsi_tail is None:
+            valid = np.flatnonzero(~np.isnan(rsi))
+            if valid.shape[0] == 0:
+                return out
+            first = valid[0]
+            self._rsi_tail = np.zeros(0)
+
+        #stochastic of the new rows, windows reach back into the kept rsi values
+        window = np.concatenate((self._rsi_tail, rsi[first:]))
+        stoch, self._flat = _stoch(window, self.length, flat = self._flat)
+        stoch = stoch[self._rsi_tail.shape[0]:]
+        self._rsi_tail = window[max(window.shape[0] - (self.length - 1), 0):].copy()
+
+        #K starts on the first full stochastic window, D on the first full K window
+        skip = max(self.length - 1 - self._stoch_rows, 0)
+        self._stoch_rows += stoch.shape[0]
+        if skip >= stoch.shape[0]:
+            return out
+        k_first = first + skip
+        out[k_first:, 0] = self._k_mean.update(stoch[skip:])
+
+        skip = max(self.k - 1 - self._k_rows, 0)
+        self._k_rows += out.shape[0] - k_first
+        if k_first + skip < out.shape[0]:
+            out[k_first + skip:, 1] = self._d_mean.update(out[k_first + skip:, 0])
+        return out
+
+class seeded_ema_chunked:
+
+    '''
+    Class to calculate the SMA seeded exponential moving average of seeded_ema_kernel over a history supplied in chunks.
+    The first length values are kept until the seed is known, after that only the state of the recursion, so the
+    concatenated output is exactly seeded_ema_kernel of the concatenated input.
+
+    Arguments:
+    length (int): number of unit periods over which to calculate moving average
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk, NaN for the first length - 1 rows of the history
+
+    Raises:
+    None
+
+    Example:
+    ema = seeded_ema_chunked(length = 21)
+    for chunk in pd.read_csv('ticks.csv', usecols = ['Close'], chunksize = 1_000_000):
+        values = ema.update(chunk['Close'])
+
+    PRECONDITIONS: chunks are supplied oldest to newest and contain no NaN.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, length = None):
+
+        self.length = int(length)
+        self.count = 0
+        self._seed_values = []
+        self._state = None
+
+    def update(self, data = None):
+
+        x = np.asarray(data, dtype=np.float64)
+        out = np.full(x.shape[0], np.nan)
+        if self._state is None:
+            self._seed_values.append(x)
+            needed = self.length - self.count
+            self.count += x.shape[0]
+            if x.shape[0] < needed:
+                return out
+            #seed is the mean of the first length values, as a contiguous array like the kernel
+            seed = np.concatenate(self._seed_values)[:self.length].mean()
+            self._seed_values = []
+            self._state = _ewm_state()
+            out[needed - 1:] = _seeded_ema(np.concatenate(([seed], x[needed:])), self.length, self._state)
+        else:
+            self.count += x.shape[0]
+            out[:] = _seeded_ema(x, self.length, self._state)
+        return out
+
+class grad_check_chunked:
+
+    '''
+    Class to apply grad_check to a history supplied in chunks. The rows each slope needs are kept for the next chunk:
+    the last period rows for 'diff' and 'kbar', and for 'lsq' the rows since the start of the current cumulative sum
+    block, at most 4096 + period. The concatenated output is exactly grad_check of the concatenated input.
+
+    Arguments:
+    method (str): 'diff', 'kbar' or 'lsq' - default 'diff'
+    period (int): bars per slope for 'kbar' and 'lsq', ignored for 'diff'
+    min_slope (float): dead-band, slopes between -min_slope and min_slope count as neither up nor down - default None
+
+    Returns:
+    update returns an int8 numpy array with one value per row of the chunk, 1 where every gradient is positive, -1 where every gradient is negative
+
+    Raises:
+    ValueError if method is unknown or period is missing or too short for the method.
+
+    Example:
+    grad = grad_check_chunked(method = 'lsq', period = 20)
+    values = grad.update(np.column_stack((ema_slow, ema_med, ema_fast)))
+
+    PRECONDITIONS: chunks are 2D arrays with one column per series, supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, method = 'diff', period = None, min_slope = None):
+
+        self.period = _slope_period(method, period)
+        self.params = {'method': method, 'period': period, 'min_slope': min_slope}
+        self.count = 0
+        self._tail = None
+        self._tail_start = 0
+
+    def update(self, grad_array = None):
+
+        values = np.asarray(grad_array, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.shape[0] == 0:
+            return np.zeros(0, dtype=np.int8)
+        if self._tail is not None:
+            values = np.concatenate((self._tail, values))
+        out = grad_check(grad_array = values, **self.params)[self.count - self._tail_start:]
+        self.count = self._tail_start + values.shape[0]
+
+        #least squares sums restart on fixed blocks, the tail starts where the block of the next row does
+        if self.params['method'] == 'lsq':
+            keep_from = max(self.count - self.period + 1, 0) // _LSQ_BLOCK * _LSQ_BLOCK
+        else:
+            keep_from = max(self.count - self.period, 0)
+        self._tail = values[keep_from - self._tail_start:].copy()
+        self._tail_start = keep_from
+        return out
@@ -1,12 +1,14 @@
-import pandas as pd
+from .kernels import ema_kernel
 
-def exp_moving_average(ema_period = None,data_col= None):
+def exp_moving_average(ema_period = None,data_col= None,out = None,dtype = None):
     '''
     Function to create exponential moving average of a data series
 
     Arguments:
     ema_period (int): number of unit periods over which to calculate moving average
-    data_col (float): pandas column input -  recommended to run on close
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): optional working precision e.g. np.float32 - default float64
     sma_period = number of integer units to perform the rolling calculation. 
     
     Returns:
@@ -22,7 +24,4 @@ def exp_moving_average(ema_period = None,data_col= None):
     KJAGGS SEP 2022
     '''
 
-    ema_col_numpy = data_col.to_numpy()
-    ema_series = pd.Series(ema_col_numpy) 
-
-    return ema_series.ewm(span=ema_period, min_periods=ema_period).mean().to_numpy()
\ No newline at end of file
+    return ema_kernel(data = data_col, period = ema_period, out = out, dtype = dtype)
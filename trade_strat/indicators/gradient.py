@@ -1,42 +1,136 @@
-import pandas as pd
 import numpy as np
 
-def grad_check(grad_array=None):
+#rows per cumulative sum block of the least squares slope, bounds rounding of the index weighted sums
+_LSQ_BLOCK = 2**12
+
+_METHODS = ('diff', 'kbar', 'lsq')
+
+def _window_nan(nan_mask, period):
+    '''
+    True where a trailing window along the last axis contains a NaN, from position period - 1 onwards.
+    '''
+    count = np.cumsum(nan_mask, axis=-1, dtype=np.int64)
+    count[..., period:] -= count[..., :-period].copy()
+    return count[..., period - 1:] > 0
+
+def _slope_period(method, period):
+    '''
+    Bars per slope for a grad_check method, 1 for 'diff'.
+    '''
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}, got {method!r}")
+    if method == 'diff':
+        return 1
+    if period is None or period < (2 if method == 'lsq' else 1):
+        raise ValueError(f"method {method!r} needs period >= {2 if method == 'lsq' else 1}, got {period!r}")
+    return int(period)
+
+def _kbar_slope(y, period):
+    '''
+    (y[t] - y[t-period]) / period along the last axis, NaN for the first period values.
+    '''
+    slope = np.full(y.shape, np.nan)
+    if period < y.shape[-1]:
+        np.subtract(y[..., period:], y[..., :-period], out=slope[..., period:])
+        if period != 1:
+            slope[..., period:] /= period
+    return slope
+
+def _lsq_slope(y, period):
+    '''
+    Least squares slope of each trailing window along the last axis in O(n), NaN for the first period - 1 values
+    and any window containing a NaN. Sums restart every 4096 values and are offset by the first value of the window
+    block, which the slope does not depend on, so rounding error stays bounded on long histories.
+    '''
+    n = y.shape[-1]
+    slope = np.full(y.shape, np.nan)
+    if period > n:
+        return slope
+
+    nan_mask = np.isnan(y)
+    has_nan = nan_mask.any()
+    if has_nan:
+        y = np.where(nan_mask, 0, y)
+
+    #sum of squared offsets of the window positions from their mean
+    centre = (period - 1) / 2.0
+    denominator = period * (period * period - 1) / 12.0
+    positions = np.arange(_LSQ_BLOCK + period - 1, dtype=np.float64)
+    window_starts = positions[:_LSQ_BLOCK] + centre
+    for block_start in range(period - 1, n, _LSQ_BLOCK):
+        block_end = min(block_start + _LSQ_BLOCK, n)
+        seg_start = block_start - period + 1
+        d = y[..., seg_start:block_end] - y[..., seg_start:seg_start + 1]
+        zero = np.zeros(d.shape[:-1] + (1,))
+        total = np.concatenate((zero, np.cumsum(d, axis=-1)), axis=-1)
+        weighted = np.concatenate((zero, np.cumsum(d * positions[:d.shape[-1]], axis=-1)), axis=-1)
+        total = total[..., period:] - total[..., :-period]
+        weighted = weighted[..., period:] - weighted[..., :-period]
+
+        #sum over the window of (position - centre) * value, positions counted from the window start
+        weighted -= window_starts[:total.shape[-1]] * total
+        slope[..., block_start:block_end] = weighted / denominator
+
+    if has_nan:
+        slope[..., period - 1:][_window_nan(nan_mask, period)] = np.nan
+    return slope
+
+def grad_check(grad_array = None, method = 'diff', period = None, min_slope = None):
 
     '''
-    Function to determine if time series gradients for any number of signals are positive or negative.
-    Delta Y is considered 1 in all cases.
-    (X2-X1)/1
+    Function to determine if time series gradients for any number of signals are all positive or all negative.
+    Each series is reduced to its slope and folded into the running consensus before the next is read, so no
+    gradient frame is kept and memory is one slope array plus the two boolean masks.
+    method 'diff' is the one bar change (X2-X1)/1, 'kbar' the change over period bars divided by period and 'lsq' the
+    least squares slope of the last period bars from cumulative sums in O(n), far less noisy on minute bars.
+    A 3D array of (symbols, bars, series) checks EMA alignment for a whole universe in one call.
 
     Arguments:
-    grad_array (float): selecte dcolumnds from input pandas dataframe
+    grad_array (float): selected columns from input pandas dataframe, or a numpy array with one column per series,
+    2D (bars, series) or 3D (symbols, bars, series)
+    method (str): 'diff', 'kbar' or 'lsq' - default 'diff'
+    period (int): bars per slope for 'kbar' (>= 1) and 'lsq' (>= 2), ignored for 'diff'
+    min_slope (float): dead-band, slopes between -min_slope and min_slope count as neither up nor down - default None,
+    where a flat bar counts as up as it always has
 
     Returns:
-    Numpy array - declare as a new pandas column
-    1 = All gradients are positive
-    -1 = All gradients are negative
+    Numpy array (int8) - declare as a new pandas column, shape (bars,) or (symbols, bars) for 3D input
+    1 = All gradients are positive (>= min_slope)
+    -1 = All gradients are negative (< -min_slope)
+    0 otherwise, and where any slope is not yet defined or NaN
 
     Raises:
-    AttributeError if grad_array is not declared and defaults to None.
+    ValueError if method is unknown or period is missing or too short for the method.
+    None - returns None if grad_array is not declared and defaults to None.
 
     Example:
     df['Grad Check'] = grad_check(df[['EMA Slow','EMA Mid','EMA Fast']])
+    df['Grad Check'] = grad_check(df[['EMA Slow','EMA Mid','EMA Fast']], method = 'lsq', period = 20, min_slope = 0.01)
+    aligned = grad_check(np.stack([ema_slow, ema_med, ema_fast], axis = -1), method = 'kbar', period = 5)
 
     PRECONDITIONS: data columns are idenitcal dimensions. Column slice is valid data input data.
     KJAGGS SEP 2023
     '''
 
-    try:
-        grad_array_numpy = grad_array.diff().to_numpy()
-        
-    except AttributeError as err:
+    if grad_array is None:
         print("grad_array is None")
         return None
 
-    all_pos = np.zeros(grad_array.shape[0], dtype=int)
-    all_pos = np.where(np.all(np.sign(grad_array_numpy) >= 0, axis = 1),1,0)
-    all_neg = np.zeros(grad_array.shape[0], dtype=int)
-    all_neg = np.where(np.all(np.sign(grad_array_numpy) < 0, axis = 1),-1,0)
+    period = _slope_period(method, period)
+    x = np.asarray(grad_array, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    threshold = 0.0 if min_slope is None else float(min_slope)
+    slope = _lsq_slope if method == 'lsq' else _kbar_slope
 
-    return all_pos+all_neg 
+    #every series must agree, NaN compares False both ways
+    all_pos = np.ones(x.shape[:-1], dtype=bool)
+    all_neg = np.ones(x.shape[:-1], dtype=bool)
+    for j in range(x.shape[-1]):
+        gradient = slope(x[..., j], period)
+        all_pos &= gradient >= threshold
+        all_neg &= gradient < -threshold
+    if x.shape[-1] == 0:
+        return np.zeros(x.shape[:-1], dtype=np.int8)
 
+    return all_pos.view(np.int8) - all_neg.view(np.int8)
@@ -0,0 +1,545 @@
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+from .backend import _kernel, _register_kernel
+
+pd = lazy_module('pandas')
+signal = lazy_module('scipy.signal')
+ndimage = lazy_module('scipy.ndimage')
+
+#rows per cumulative sum block, bounds rounding drift on long histories
+_CSUM_BLOCK = 2**16
+
+def _as_input(data, dtype = None):
+    '''
+    Contiguous ndarray view of a pandas column or array in the working dtype.
+    No copy is made when the input is already contiguous in that dtype.
+    '''
+    return np.ascontiguousarray(data, dtype=np.float64 if dtype is None else dtype)
+
+def _as_output(out, n, dtype):
+    '''
+    Preallocated output buffer, or a new one when out is None.
+    '''
+    if out is None:
+        return np.empty(n, dtype=dtype)
+    if out.shape != (n,):
+        raise ValueError(f"out has shape {out.shape}, expected ({n},)")
+    return out
+
+def _first_valid(x):
+    '''
+    Index of the first non NaN value, len(x) if there is none.
+    '''
+    valid = np.flatnonzero(~np.isnan(x))
+    return valid[0] if valid.shape[0] else x.shape[0]
+
+def _ewm_filter_reference(x, coeffs, zi):
+    '''
+    First order recursive filter y[t] = coeffs[0] * x[t] - coeffs[1] * y[t-1], started from zi.
+    Returns the filtered array and the final state, as lfilter.
+    '''
+    return signal.lfilter(coeffs[:1], np.array([1, coeffs[1]], dtype=coeffs.dtype), x, zi=zi)
+
+def _ewm_filter_loop(x, coeffs, zi):
+    #the direct form II transposed steps of lfilter, so both backends round identically
+    y = np.empty_like(x)
+    b0 = coeffs[0]
+    a1 = coeffs[1]
+    zero = b0 * 0
+    z = zi[0]
+    for i in range(x.shape[0]):
+        y[i] = z + b0 * x[i]
+        z = zero * x[i] - a1 * y[i]
+    zf = np.empty(1, dtype=x.dtype)
+    zf[0] = z
+    return y, zf
+
+_register_kernel('ewm_filter', _ewm_filter_reference, _ewm_filter_loop)
+
+def _ewm_filter(x, b0, beta, zi = None):
+    '''
+    y[t] = b0 * x[t] + beta * y[t-1] in the dtype of x through the active backend, returns (y, final state).
+    '''
+    coeffs = np.array([b0, -beta], dtype=x.dtype)
+    zi = np.zeros(1, dtype=x.dtype) if zi is None else np.asarray(zi, dtype=x.dtype)
+    return _kernel('ewm_filter')(x, coeffs, zi)
+
+def _ewm_mean_loop(x, com, adjust, min_periods, state):
+    #pandas ewm(com, adjust, min_periods).mean() step for step, state is (weighted, old_wt, nobs, started)
+    if state.shape[0] == 0:
+        state = np.array([np.nan, 1.0, 0.0, 0.0])
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    weighted, old_wt, nobs, started = state[0], state[1], state[2], state[3]
+    out = np.empty(x.shape[0])
+    for i in range(x.shape[0]):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1.0
+        if started == 0.0:
+            weighted = cur
+            started = 1.0
+        elif weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                #avoid numerical errors on constant series
+                if weighted != cur:
+                    weighted = old_wt * weighted + new_wt * cur
+                    weighted /= (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    state[0], state[1], state[2], state[3] = weighted, old_wt, nobs, started
+    return out
+
+def _ewm_mean_reference(x, com, adjust, min_periods, state):
+    '''
+    Exponentially weighted mean computed as pandas ewm(...).mean() with ignore_na=False, bit for bit.
+    An empty state starts from the first row and is pandas itself, a state of four values is continued and updated
+    in place by _ewm_mean_loop run uncompiled.
+    '''
+    if state.shape[0] == 0:
+        return pd.Series(x, copy=False).ewm(com=com, adjust=adjust, min_periods=min_periods).mean().to_numpy()
+    return _ewm_mean_loop(x, com, adjust, min_periods, state)
+
+_register_kernel('ewm_mean', _ewm_mean_reference, _ewm_mean_loop)
+
+def _ewm_state():
+    '''
+    State of an ewm_mean continued across calls, before the first row.
+    '''
+    return np.array([np.nan, 1.0, 0.0, 0.0])
+
+def _rolling_mean_loop(x, period, skip, state):
+    #pandas rolling(period).mean() step for step, x[:skip] is the previous window and only x[skip:] is returned
+    #state is (sum, add compensation, remove compensation, nobs, negative count, same value count, previous value)
+    if state.shape[0] == 0:
+        state = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, np.nan])
+    sum_x, comp_add, comp_remove = state[0], state[1], state[2]
+    nobs, neg_ct, same_ct, prev_value = state[3], state[4], state[5], state[6]
+    out = np.empty(x.shape[0] - skip)
+    for j in range(skip, x.shape[0]):
+        if j >= period:
+            val = x[j - period]
+            if val == val:
+                nobs -= 1.0
+                y = - val - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1.0
+        val = x[j]
+        if val == val:
+            nobs += 1.0
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1.0
+            if val == prev_value:
+                same_ct += 1.0
+            else:
+                same_ct = 1.0
+            prev_value = val
+        if nobs >= period and nobs > 0:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+        else:
+            result = np.nan
+        out[j - skip] = result
+    state[0], state[1], state[2] = sum_x, comp_add, comp_remove
+    state[3], state[4], state[5], state[6] = nobs, neg_ct, same_ct, prev_value
+    return out
+
+def _rolling_mean_reference(x, period, skip, state):
+    '''
+    Rolling mean computed as pandas rolling(period).mean(), bit for bit. An empty state starts from the first row and
+    is pandas itself, a state of seven values is continued and updated in place by _rolling_mean_loop run uncompiled.
+    '''
+    if state.shape[0] == 0:
+        return pd.Series(x, copy=False).rolling(period).mean().to_numpy()
+    return _rolling_mean_loop(x, period, skip, state)
+
+_register_kernel('rolling_mean', _rolling_mean_reference, _rolling_mean_loop)
+
+def _rolling_state():
+    '''
+    State of a rolling_mean continued across calls, before the first row.
+    '''
+    return np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, np.nan])
+
+def _pandas_mean(x, period):
+    '''
+    pandas rolling(period).mean() of a float64 array through the active backend.
+    '''
+    return _kernel('rolling_mean')(x, int(period), 0, np.zeros(0))
+
+def _ewm_weight_total(alpha, rows):
+    '''
+    Sum of the weights (1 - alpha) ** k for k below each row number, in the dtype of rows.
+    An alpha of 1 (a period of 1) weights only the latest value, its total is 1 without taking the log of 0.
+    '''
+    beta = 1.0 - alpha
+    if beta == 0:
+        return np.ones_like(rows)
+    return -np.expm1(np.log(beta) * rows) / rows.dtype.type(alpha)
+
+def _ewm_adjusted(x, alpha, out = None):
+    '''
+    Adjusted exponentially weighted mean of a NaN free array, pandas ewm(adjust=True).mean() as a recursive filter.
+    The weighted sum runs through a recursive filter, the sum of weights has a closed form.
+    '''
+    beta = 1.0 - alpha
+    weighted_sum = _ewm_filter(x, 1.0, beta)[0]
+    weight_total = _ewm_weight_total(alpha, np.arange(1, x.shape[0] + 1, dtype=x.dtype))
+    return np.divide(weighted_sum, weight_total, out=out)
+
+def _ewm_adjusted_nan(x, alpha, valid, out = None):
+    '''
+    As _ewm_adjusted for an array containing NaN, with ignore_na=False semantics.
+    Missing values add nothing to the weighted sum or the weight total but both still decay.
+    '''
+    beta = 1.0 - alpha
+    weighted_sum = _ewm_filter(np.where(valid, x, 0), 1.0, beta)[0]
+    weight_total = _ewm_filter(valid.astype(x.dtype), 1.0, beta)[0]
+    with np.errstate(invalid='ignore'):
+        out = np.divide(weighted_sum, weight_total, out=out)
+
+    #a missing value repeats the previous mean exactly, as pandas does
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(x.shape[0]), 0))
+    missing = ~valid
+    out[missing] = out[last_valid[missing]]
+    return out
+
+def _ema_com(period):
+    #centre of mass of pandas ewm(span=period)
+    return (period - 1) / 2.0
+
+def _window_count(mask, period):
+    '''
+    Number of True values in each trailing window of a boolean array, from row period - 1 onwards.
+    '''
+    count = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return count[period:] - count[:-period]
+
+def ema_kernel(data = None, period = None, out = None, dtype = None):
+    '''
+    Function to create an exponential moving average of an array.
+    In float64 it runs the recursion of pandas ewm - pandas itself on the numpy backend, a compiled copy on the numba
+    backend - so the result is bit for bit pandas ewm(span=period, min_periods=period).mean() and a flat run returns
+    exactly its price, as pandas does. float32 uses a recursive filter with a closed form weight total and matches
+    pandas to float32 tolerance.
+
+    Arguments:
+    data (float): numpy array or pandas column input -  recommended to run on close
+    period (int): number of unit periods over which to calculate moving average
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): working precision, np.float32 or np.float64 - default np.float64
+
+    Returns:
+    Numpy array - out if supplied
+
+    Raises:
+    ValueError if out does not match the input length.
+
+    Example:
+    ema = ema_kernel(data=df['Close'].to_numpy(), period=21)
+    ema_kernel(data=closes, period=21, out=buffer, dtype=np.float32)
+
+    PRECONDITIONS: data is one dimensional.
+    KJAGGS OCT 2023
+    '''
+
+    x = _as_input(data, dtype)
+    out = _as_output(out, x.shape[0], x.dtype)
+    if x.shape[0] == 0:
+        return out
+
+    #pandas' own recursion in float64, the filter below drifts from it on flat runs and flips strict comparisons
+    if x.dtype == np.float64:
+        out[:] = _kernel('ewm_mean')(x, _ema_com(period), True, period, np.zeros(0))
+        return out
+
+    #same span to alpha conversion as pandas
+    alpha = 1.0 / (1.0 + (period - 1) / 2.0)
+    valid = ~np.isnan(x)
+
+    if valid.all():
+        _ewm_adjusted(x, alpha, out=out)
+        out[:period - 1] = np.nan
+    else:
+        _ewm_adjusted_nan(x, alpha, valid, out=out)
+        out[np.cumsum(valid) < max(period, 1)] = np.nan
+
+    return out
+
+def sma_kernel(data = None, period = None, out = None, dtype = None):
+    '''
+    Function to create a simple moving average of an array from cumulative sums in O(n).
+    Sums restart every 65536 rows and are offset by the first value of the block, so rounding error stays bounded
+    on long histories. As pandas rolling mean a window containing NaN is NaN, a window of identical values returns
+    that value exactly and the result never takes a sign that no value in the window has.
+
+    Arguments:
+    data (float): numpy array or pandas column input -  recommended to run on close
+    period (int): number of unit periods over which to calculate moving average
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): working precision, np.float32 or np.float64 - default np.float64
+
+    Returns:
+    Numpy array - out if supplied
+
+    Raises:
+    ValueError if out does not match the input length.
+
+    Example:
+    sma = sma_kernel(data=df['Close'].to_numpy(), period=21)
+    sma_kernel(data=closes, period=21, out=buffer, dtype=np.float32)
+
+    PRECONDITIONS: data is one dimensional.
+    KJAGGS OCT 2023
+    '''
+
+    x = _as_input(data, dtype)
+    n = x.shape[0]
+    out = _as_output(out, n, x.dtype)
+    out[:min(period - 1, n)] = np.nan
+    if period > n:
+        return out
+
+    nan_mask = np.isnan(x)
+    has_nan = nan_mask.any()
+    if has_nan:
+        x = np.where(nan_mask, 0, x)
+
+    #sums accumulate in float64 whatever the working dtype
+    for block_start in range(period - 1, n, _CSUM_BLOCK):
+        block_end = min(block_start + _CSUM_BLOCK, n)
+        seg_start = block_start - period + 1
+        offset = np.float64(x[seg_start])
+        csum = np.concatenate(([0.0], np.cumsum(x[seg_start:block_end] - offset, dtype=np.float64)))
+        out[block_start:block_end] = (csum[period:] - csum[:-period]) / period + offset
+
+    mean = out[period - 1:]
+
+    #a run of identical values at least one window long returns the value exactly
+    run_start = np.arange(n)
+    run_start[1:][x[1:] == x[:-1]] = 0
+    run_start = np.maximum.accumulate(run_start)
+    flat = (np.arange(n) - run_start + 1)[period - 1:] >= period
+    mean[flat] = x[period - 1:][flat]
+
+    #the mean cannot be negative if no value is negative, or positive if every value is
+    neg_count = _window_count(np.signbit(x), period)
+    mean[(neg_count == 0) & (mean < 0)] = 0
+    mean[(neg_count == period) & (mean > 0)] = 0
+
+    if has_nan:
+        mean[_window_count(nan_mask, period) > 0] = np.nan
+
+    return out
+
+def _wilder_com(length):
+    #centre of mass of pandas_ta rma, ewm(alpha=1/length)
+    return 1.0 / (1.0 / length) - 1.0
+
+def _wilder_average(values, length, state = None):
+    '''
+    pandas_ta rma of float64 gains or losses through the active backend, the recursion pandas ewm runs.
+    '''
+    state = np.zeros(0) if state is None else state
+    return _kernel('ewm_mean')(values, _wilder_com(length), True, length, state)
+
+def _wilder_rsi(gain, loss, length, out, states = (None, None)):
+    '''
+    Wilder RSI of the gains and losses after the first valid value, one value per change written to out with the
+    warm up rows NaN. Same arithmetic as pandas_ta rsi, so values are bit for bit pta.rsi. The loss average is
+    overwritten, so the only temporaries are the two averages. states continues the two averages from an earlier call.
+    '''
+    gain_avg = _wilder_average(np.asarray(gain, dtype=np.float64), length, states[0])
+    loss_avg = _wilder_average(np.asarray(loss, dtype=np.float64), length, states[1])
+    np.add(gain_avg, loss_avg, out=loss_avg)
+    np.multiply(gain_avg, 100, out=gain_avg)
+    with np.errstate(invalid='ignore'):
+        np.divide(gain_avg, loss_avg, out=out)
+    return out
+
+def _gain_loss(x):
+    '''
+    Bar to bar rises and falls of a NaN free array, both as positive values.
+    '''
+    change = np.diff(x)
+    gain = np.where(change > 0, change, 0)
+    np.negative(change, out=change)
+    np.maximum(change, 0, out=change)
+    return gain, change
+
+def rsi_kernel(data = None, length = None, out = None, dtype = None):
+    '''
+    Function to create a Wilder RSI of an array without pandas_ta.
+    Gains and losses are averaged by the recursion of pandas ewm that pandas_ta rma runs - pandas itself on the numpy
+    backend, a compiled copy on the numba backend - so in float64 the result is bit for bit pta.rsi(close, length),
+    including the first length rows being NaN. The averages are always computed in float64.
+
+    Arguments:
+    data (float): numpy array or pandas column input -  recommended to run on close
+    length (int): rsi length
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): working precision, np.float32 or np.float64 - default np.float64
+
+    Returns:
+    Numpy array - out if supplied
+
+    Raises:
+    ValueError if out does not match the input length.
+
+    Example:
+    rsi = rsi_kernel(data=df['Close'].to_numpy(), length=14)
+
+    PRECONDITIONS: data is one dimensional, contains no NaN after the first valid value.
+    KJAGGS OCT 2023
+    '''
+
+    x = _as_input(data, dtype)
+    out = _as_output(out, x.shape[0], x.dtype)
+    out[:] = np.nan
+    start = _first_valid(x)
+    length = int(length)
+    if x.shape[0] - start - 1 < length:
+        return out
+
+    gain, loss = _gain_loss(x[start:])
+    _wilder_rsi(gain, loss, length, out[start + 1:])
+    return out
+
+def _stoch(rsi_valid, stoch_len, flat = False):
+    '''
+    Stochastic of an RSI from its first valid value, NaN until a full window, and whether any window is flat.
+    As pandas_ta, once any window is flat every range is offset by machine epsilon, so the stochastic is finite.
+    flat carries that from earlier rows of the same column, see stoch_rsi_chunked.
+    '''
+    origin = (stoch_len - 1) // 2
+    lowest = ndimage.minimum_filter1d(rsi_valid, stoch_len, origin=origin, mode='nearest')
+    rsi_range = ndimage.maximum_filter1d(rsi_valid, stoch_len, origin=origin, mode='nearest')
+    np.subtract(rsi_range, lowest, out=rsi_range)
+    rsi_range[:stoch_len - 1] = np.nan
+    flat = bool(flat or (rsi_range == 0).any())
+    if flat:
+        rsi_range += np.finfo(rsi_range.dtype).eps
+
+    #lowest becomes the stochastic in place
+    np.subtract(rsi_valid, lowest, out=lowest)
+    lowest *= 100
+    lowest /= rsi_range
+    return lowest, flat
+
+def stoch_rsi_kernel(data = None, length = None, rsi_length = None, k = None, d = None, out = None, dtype = None):
+    '''
+    Function to create stochastic RSI K and D of an array without pandas_ta.
+    The RSI, the flat range offset and the K and D rolling means follow pandas_ta step for step, so in float64 the
+    result is bit for bit pta.stochrsi(close, length, rsi_length, k, d) and crossovers of K and D agree at ties.
+
+    Arguments:
+    data (float): numpy array or pandas column input -  recommended to run on close
+    length (int): length of stochastic -  typically 14
+    rsi_length (int): length of rsi within stochastic -  typically 14
+    k (int): length of stochastic k smoothing -  typically 3
+    d (int): length of stochastic d smoothing -  typically 3
+    out (numpy array): optional preallocated (bars, 2) output buffer
+    dtype (numpy dtype): working precision, np.float32 or np.float64 - default np.float64
+
+    Returns:
+    Numpy array of shape (bars, 2) - column 0 is K, column 1 is D, as pta.stochrsi(...).to_numpy()
+
+    Raises:
+    ValueError if out does not have shape (bars, 2).
+
+    Example:
+    stoch_rsi = stoch_rsi_kernel(data=df['Close'].to_numpy(), length=14, rsi_length=14, k=3, d=3)
+    df['srsik'], df['srsid'] = stoch_rsi[:, 0], stoch_rsi[:, 1]
+
+    PRECONDITIONS: data is one dimensional, contains no NaN after the first valid value.
+    KJAGGS OCT 2023
+    '''
+
+    x = _as_input(data, dtype)
+    n = x.shape[0]
+    if out is None:
+        out = np.empty((n, 2), dtype=x.dtype)
+    elif out.shape != (n, 2):
+        raise ValueError(f"out has shape {out.shape}, expected ({n}, 2)")
+    out[:] = np.nan
+    length, k, d = int(length), int(k), int(d)
+
+    rsi = rsi_kernel(data = x, length = rsi_length)
+    start = _first_valid(rsi)
+    if n - start < length:
+        return out
+    stoch, _ = _stoch(rsi[start:], length)
+    del rsi
+
+    #stoch is valid from length - 1 onwards, K from a further k - 1 and D from a further d - 1
+    k_start = start + length - 1
+    out[k_start:, 0] = _pandas_mean(stoch[length - 1:], k)
+    d_start = k_start + k - 1
+    if d_start < n:
+        out[d_start:, 1] = _pandas_mean(np.ascontiguousarray(out[d_start:, 0], dtype=np.float64), d)
+    return out
+
+def _seeded_ema(values, length, state):
+    '''
+    pandas ewm(span=length, adjust=False).mean() of the seed followed by the later values, through the active backend.
+    '''
+    return _kernel('ewm_mean')(np.asarray(values, dtype=np.float64), (length - 1) / 2.0, False, 1, state)
+
+def seeded_ema_kernel(data = None, length = None, out = None, dtype = None):
+    '''
+    Function to create an exponential moving average seeded with the simple average of the first length values.
+    This is the pandas_ta ema - pandas ewm(span=length, adjust=False) started from the SMA - run by the recursion of
+    pandas ewm, so in float64 it is bit for bit pta.ema(close, length), flat stretches included. ema_kernel matches
+    the adjusted pandas ewm instead. The recursion is always computed in float64.
+
+    Arguments:
+    data (float): numpy array or pandas column input -  recommended to run on close
+    length (int): number of unit periods over which to calculate moving average
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): working precision, np.float32 or np.float64 - default np.float64
+
+    Returns:
+    Numpy array - out if supplied, NaN for the first length - 1 rows
+
+    Raises:
+    ValueError if out does not match the input length.
+
+    Example:
+    ema = seeded_ema_kernel(data=df['Close'].to_numpy(), length=21)
+
+    PRECONDITIONS: data is one dimensional and contains no NaN.
+    KJAGGS OCT 2023
+    '''
+
+    x = _as_input(data, dtype)
+    n = x.shape[0]
+    out = _as_output(out, n, x.dtype)
+    length = int(length)
+    out[:min(length - 1, n)] = np.nan
+    if n < length:
+        return out
+
+    out[length - 1:] = _seeded_ema(np.concatenate(([x[:length].mean()], x[length:])), length, np.zeros(0))
+    return out
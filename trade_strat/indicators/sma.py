@@ -1,13 +1,14 @@
-import pandas as pd
-import numpy as np
+from .kernels import sma_kernel
 
-def simple_moving_average(sma_period = None,data_col= None):
+def simple_moving_average(sma_period = None,data_col= None,out = None,dtype = None):
     '''
     Function to create simplemoving average of a data series
 
     Arguments:
     sma_period (int): number of unit periods over which to calculate moving average
-    data_col (float): pandas column input -  recommended to run on close
+    data_col (float): pandas column or numpy array input -  recommended to run on close
+    out (numpy array): optional preallocated output buffer of the same length
+    dtype (numpy dtype): optional working precision e.g. np.float32 - default float64
     sma_period = number of integer units to perform the rolling calculation. 
     
     Returns:
@@ -23,7 +24,4 @@ def simple_moving_average(sma_period = None,data_col= None):
     KJAGGS SEP 2022
     '''
 
-    ma_col_numpy = data_col.to_numpy()
-    ma_series = pd.Series(ma_col_numpy) 
-
-    return ma_series.rolling(sma_period).mean().to_numpy()
+    return sma_kernel(data = data_col, period = sma_period, out = out, dtype = dtype)
@@ -0,0 +1,455 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from .backend import _kernel, _register_kernel
+
+def _ewm_update_reference(values, state, old_wt_factor, min_periods):
+    '''
+    _ewm_state.update over an array, state holds (weighted, old_wt, nobs, started) and is updated in place.
+    '''
+    weighted, old_wt, nobs, started = state.tolist()
+    out = np.empty(values.shape[0])
+    for i, value in enumerate(values.tolist()):
+        is_observation = value == value
+        nobs += is_observation
+        if not started:
+            weighted = value
+            started = 1.0
+        elif weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != value:
+                    weighted = old_wt * weighted + value
+                    weighted /= (old_wt + 1.0)
+                old_wt += 1.0
+        elif is_observation:
+            weighted = value
+        out[i] = weighted if nobs >= min_periods else math.nan
+    state[:] = (weighted, old_wt, nobs, started)
+    return out
+
+def _ewm_update_loop(values, state, old_wt_factor, min_periods):
+    weighted, old_wt, nobs, started = state[0], state[1], state[2], state[3]
+    out = np.empty(values.shape[0])
+    for i in range(values.shape[0]):
+        value = values[i]
+        is_observation = value == value
+        if is_observation:
+            nobs += 1.0
+        if started == 0.0:
+            weighted = value
+            started = 1.0
+        elif weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != value:
+                    weighted = old_wt * weighted + value
+                    weighted /= (old_wt + 1.0)
+                old_wt += 1.0
+        elif is_observation:
+            weighted = value
+        out[i] = weighted if nobs >= min_periods else np.nan
+    state[0], state[1], state[2], state[3] = weighted, old_wt, nobs, started
+    return out
+
+_register_kernel('ewm_update', _ewm_update_reference, _ewm_update_loop)
+
+class _ewm_state:
+
+    '''
+    Incremental form of pandas ewm(...).mean() with adjust=True and ignore_na=False.
+    The recursion and centre of mass conversion follow pandas step for step so streamed values
+    are bit for bit identical to the batch calculation.
+    '''
+
+    def __init__(self, span = None, alpha = None, min_periods = 0):
+
+        if span is not None:
+            com = (span - 1) / 2.0
+        else:
+            com = 1.0 / alpha - 1.0
+
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.min_periods = max(int(min_periods), 1)
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def update(self, value):
+
+        is_observation = value == value
+        self.nobs += is_observation
+
+        if not self.started:
+            self.weighted = value
+            self.started = True
+        elif self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                #avoid numerical errors on constant series
+                if self.weighted != value:
+                    self.weighted = self.old_wt * self.weighted + value
+                    self.weighted /= (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_observation:
+            self.weighted = value
+
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+    def update_many(self, values):
+
+        #the same recursion as update through the active backend, state is passed in and out as floats
+        state = np.array([self.weighted, self.old_wt, self.nobs, self.started], dtype=np.float64)
+        out = _kernel('ewm_update')(np.ascontiguousarray(values, dtype=np.float64), state, self.old_wt_factor, self.min_periods)
+        self.weighted, self.old_wt = float(state[0]), float(state[1])
+        self.nobs, self.started = int(state[2]), bool(state[3])
+        return out
+
+class _rolling_extreme_state:
+
+    '''
+    Incremental rolling min or max using a monotonic deque, amortised O(1) per value.
+    NaN values occupy a slot in the window but are not observations, as in pandas rolling.
+    '''
+
+    def __init__(self, window = None, find_max = False):
+
+        self.window = int(window)
+        self.find_max = find_max
+        self.candidates = deque()
+        self.nan_positions = deque()
+        self.count = 0
+
+    def update(self, value):
+
+        i = self.count
+        self.count += 1
+        expired = i - self.window
+
+        #drop values that have left the window
+        while self.candidates and self.candidates[0][0] <= expired:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] <= expired:
+            self.nan_positions.popleft()
+
+        if value != value:
+            self.nan_positions.append(i)
+        else:
+            if self.find_max:
+                while self.candidates and self.candidates[-1][1] <= value:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] >= value:
+                    self.candidates.pop()
+            self.candidates.append((i, value))
+
+        nobs = min(self.count, self.window) - len(self.nan_positions)
+        if nobs < self.window:
+            return math.nan
+        return self.candidates[0][1]
+
+class ema_stream:
+
+    '''
+    Class to calculate an exponential moving average one bar at a time.
+    Both run the pandas ewm recursion, so values match exp_moving_average on the same history exactly, each update is O(1).
+
+    Arguments:
+    ema_period (int): number of unit periods over which to calculate moving average
+    seed_data (float): optional historical array or pandas column used to prime the calculation
+
+    Returns:
+    update returns the latest average as a float, NaN until ema_period values are observed
+    update_many returns a numpy array, one value per input bar
+
+    Raises:
+    None
+
+    Example:
+    ema = ema_stream(ema_period=21, seed_data=df.Close)
+    latest = ema.update(new_close)
+
+    PRECONDITIONS: seed data is ordered oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, ema_period = None, seed_data = None):
+
+        self.ema_period = ema_period
+        self.value = math.nan
+        self._ewm = _ewm_state(span=ema_period, min_periods=ema_period)
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def update(self, bar):
+
+        self.value = self._ewm.update(float(bar))
+        return self.value
+
+    def update_many(self, data):
+
+        out = self._ewm.update_many(data)
+        if out.shape[0]:
+            self.value = float(out[-1])
+        return out
+
+class sma_stream:
+
+    '''
+    Class to calculate a simple moving average one bar at a time from a fixed size ring buffer.
+    Uses the same compensated running sum as pandas rolling mean so values match simple_moving_average exactly.
+
+    Arguments:
+    sma_period (int): number of unit periods over which to calculate moving average
+    seed_data (float): optional historical array or pandas column used to prime the calculation
+
+    Returns:
+    update returns the latest average as a float, NaN until the window holds sma_period valid values
+    update_many returns a numpy array, one value per input bar
+
+    Raises:
+    None
+
+    Example:
+    sma = sma_stream(sma_period=21, seed_data=df.Close)
+    latest = sma.update(new_close)
+
+    PRECONDITIONS: seed data is ordered oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, sma_period = None, seed_data = None):
+
+        self.sma_period = int(sma_period)
+        self.value = math.nan
+
+        #ring buffer of the current window
+        self._buffer = [math.nan] * self.sma_period
+        self._head = 0
+        self._count = 0
+
+        #running sum state, see pandas roll_mean
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_ct = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_ct = 0
+        self._prev_value = math.nan
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def _add(self, val):
+
+        if val == val:
+            self._nobs += 1
+            y = val - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_ct += 1
+            if val == self._prev_value:
+                self._same_ct += 1
+            else:
+                self._same_ct = 1
+            self._prev_value = val
+
+    def _remove(self, val):
+
+        if val == val:
+            self._nobs -= 1
+            y = - val - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_ct -= 1
+
+    def update(self, bar):
+
+        bar = float(bar)
+
+        if self._count == 0:
+            self._prev_value = bar
+        if self._count >= self.sma_period:
+            self._remove(self._buffer[self._head])
+
+        self._add(bar)
+        self._buffer[self._head] = bar
+        self._head = (self._head + 1) % self.sma_period
+        self._count += 1
+
+        if self._nobs >= self.sma_period and self._nobs > 0:
+            result = self._sum / self._nobs
+            if self._same_ct >= self._nobs:
+                result = self._prev_value
+            elif self._neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self._neg_ct == self._nobs and result > 0:
+                result = 0.0
+        else:
+            result = math.nan
+
+        self.value = result
+        return self.value
+
+    def update_many(self, data):
+
+        data = np.asarray(data, dtype=float)
+        out = np.empty(data.shape[0])
+        for i, bar in enumerate(data.tolist()):
+            out[i] = self.update(bar)
+        return out
+
+class rsi_stream:
+
+    '''
+    Class to calculate a Wilder RSI one bar at a time.
+    Gains and losses are smoothed with the same recursion as pandas_ta rsi, so values match pta.rsi exactly.
+
+    Arguments:
+    rsi_len (int): length of rsi -  typically 14
+    seed_data (float): optional historical array or pandas column of closes used to prime the calculation
+
+    Returns:
+    update returns the latest rsi as a float, NaN until rsi_len price changes are observed
+    update_many returns a numpy array, one value per input bar
+
+    Raises:
+    None
+
+    Example:
+    rsi = rsi_stream(rsi_len=14, seed_data=df.Close)
+    latest = rsi.update(new_close)
+
+    PRECONDITIONS: seed data is ordered oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, rsi_len = None, seed_data = None):
+
+        self.rsi_len = rsi_len
+        self.value = math.nan
+        self._prev_close = math.nan
+        self._gain = _ewm_state(alpha=1.0 / rsi_len, min_periods=rsi_len)
+        self._loss = _ewm_state(alpha=1.0 / rsi_len, min_periods=rsi_len)
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def update(self, bar):
+
+        bar = float(bar)
+        change = bar - self._prev_close
+        self._prev_close = bar
+
+        #split the change into gain and loss, NaN is carried through both
+        gain = 0.0 if change < 0 else change
+        loss = 0.0 if change > 0 else change
+
+        gain_avg = self._gain.update(gain)
+        loss_avg = self._loss.update(loss)
+
+        #no gain or loss over the whole window is NaN, as 0 / 0 in update_many and pandas_ta
+        total = gain_avg + abs(loss_avg)
+        self.value = 100 * gain_avg / total if total != 0 else math.nan
+        return self.value
+
+    def update_many(self, data):
+
+        data = np.asarray(data, dtype=float)
+        if data.shape[0] == 0:
+            return np.empty(0)
+        change = data - np.concatenate(([self._prev_close], data[:-1]))
+        self._prev_close = float(data[-1])
+
+        #as update, NaN is carried through both
+        gain_avg = self._gain.update_many(np.where(change < 0, 0.0, change))
+        loss_avg = self._loss.update_many(np.where(change > 0, 0.0, change))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = 100 * gain_avg / (gain_avg + np.abs(loss_avg))
+        self.value = float(out[-1])
+        return out
+
+class stoch_rsi_stream:
+
+    '''
+    Class to calculate stochastic RSI K and D one bar at a time.
+    Combines rsi_stream, rolling min/max deques and two sma_stream smoothers, O(1) amortised per bar.
+    Values match pta.stochrsi to floating point tolerance. Ranges are offset by machine epsilon from the first flat
+    rsi range on, pandas_ta also offsets the ranges before it once the whole column is known.
+
+    Arguments:
+    stoch_len (int): length of stochastic -  typically 14
+    stochrsi_length (int): length of rsi within stochastic -  typically 14
+    stoch_k (int): length of stochatsic k parameter -  typically 3
+    stoch_d (int): length of stochatsic d parameter -  typically 3
+    seed_data (float): optional historical array or pandas column of closes used to prime the calculation
+
+    Returns:
+    update returns a tuple of (k, d) floats, NaN until enough history is observed
+    update_many returns a numpy array of shape (bars, 2), columns k and d
+
+    Raises:
+    None
+
+    Example:
+    srsi = stoch_rsi_stream(stoch_len=14, stochrsi_length=14, stoch_k=3, stoch_d=3, seed_data=df.Close)
+    k, d = srsi.update(new_close)
+
+    PRECONDITIONS: seed data is ordered oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, stoch_len = None, stochrsi_length = None, stoch_k = None, stoch_d = None, seed_data = None):
+
+        self.stoch_len = stoch_len
+        self.stochrsi_length = stochrsi_length
+        self.stoch_k = stoch_k
+        self.stoch_d = stoch_d
+        self.k = math.nan
+        self.d = math.nan
+
+        self._rsi = rsi_stream(rsi_len=stochrsi_length)
+        self._lowest = _rolling_extreme_state(window=stoch_len, find_max=False)
+        self._highest = _rolling_extreme_state(window=stoch_len, find_max=True)
+        self._k_sma = sma_stream(sma_period=stoch_k)
+        self._d_sma = sma_stream(sma_period=stoch_d)
+        self._flat = False
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def update(self, bar):
+
+        rsi = self._rsi.update(bar)
+        lowest = self._lowest.update(rsi)
+        highest = self._highest.update(rsi)
+
+        rsi_range = highest - lowest
+        self._flat = self._flat or rsi_range == 0
+        if self._flat:
+            rsi_range += np.finfo(float).eps
+
+        stoch = 100 * (rsi - lowest)
+        stoch /= rsi_range
+
+        self.k = self._k_sma.update(stoch)
+        self.d = self._d_sma.update(self.k)
+        return self.k, self.d
+
+    def update_many(self, data):
+
+        data = np.asarray(data, dtype=float)
+        out = np.empty((data.shape[0], 2))
+        for i, bar in enumerate(data.tolist()):
+            out[i] = self.update(bar)
+        return out
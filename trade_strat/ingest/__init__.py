@@ -0,0 +1,2 @@
+from .sources import directory_source, mock_feed
+from .pipeline import scan_pipeline
\ No newline at end of file
@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from trade_strat.profiling import profile_scan
+
+def _scan(strategy, strategy_params, symbol, df):
+    '''
+    Run the strategy over one symbol, module level so process pool executors can pickle it.
+    '''
+    with profile_scan(symbol = symbol):
+        return strategy(df, **strategy_params).run_scan()
+
+def _error_text():
+
+    return traceback.format_exc()
+
+class scan_pipeline:
+
+    '''
+    Class to fetch bars and scan them concurrently, streaming each symbol's result as soon as it is ready.
+    Bars are fetched by fetch_concurrency asyncio tasks and scanned by workers tasks, each handing its scan to an
+    executor, so waiting on the source overlaps with computing signals and the first results arrive before the
+    universe is loaded. Fetched bars and finished results wait in bounded queues: when the scans fall behind the
+    fetches pause, and when the consumer stops reading the scans pause, so memory holds at most about
+    2 * queue_size symbols whatever the size of the universe. Failures and timeouts are isolated per symbol.
+
+    Arguments:
+    source (object): bar source with symbols() and an async fetch(symbol) returning a dataframe e.g. directory_source, mock_feed
+    strategy (class): strategy class with a run_scan method e.g. ts.double_rsi
+    strategy_params (dict): keyword arguments passed to the strategy after the dataframe, output defaults to 'compact' where the strategy supports it
+    symbols (list): symbols to scan - default None scans every symbol of the source
+    fetch_concurrency (int): fetches in flight at once - default 8
+    workers (int): scans in flight at once - default os.cpu_count()
+    queue_size (int): capacity of the fetched bars queue and of the results queue - default 2 * workers
+    timeout (float): seconds allowed for fetching a symbol, and again for scanning it - default None waits indefinitely
+    executor (concurrent.futures executor): runs the scans - default None uses a thread pool of workers threads,
+    a ProcessPoolExecutor suits strategies that hold the GIL
+
+    Returns:
+    Async iterator of (symbol, scan result dataframe) tuples in the order the scans complete
+    run_scan returns a dict of symbol -> scan result dataframe for the whole universe
+    Symbols that failed or timed out are left out and recorded in self.errors as symbol -> traceback text
+
+    Raises:
+    None, errors of a symbol's fetch or scan are recorded in self.errors.
+
+    Example:
+    pipeline = scan_pipeline(source = directory_source(path = 'data/intraday'), strategy = ts.double_rsi, timeout = 5.0)
+    async for symbol, df_signals in pipeline:
+        if df_signals['Signal'].iloc[-1] != 0:
+            alert(symbol)
+
+    A scan that times out is abandoned, not interrupted - its thread finishes in the background and the result is dropped.
+
+    PRECONDITIONS: iterated inside a running event loop, or use run_scan from synchronous code.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, source = None, strategy = None, strategy_params = None, symbols = None, fetch_concurrency = 8, workers = None, queue_size = None, timeout = None, executor = None):
+
+        self.source = source
+        self.strategy = strategy
+        self.strategy_params = dict(strategy_params or {})
+        #only the scan result is streamed, strategies that support it skip building the indicator columns
+        if 'output' in inspect.signature(strategy).parameters:
+            self.strategy_params.setdefault('output', 'compact')
+        self.symbols = list(symbols) if symbols is not None else None
+        self.fetch_concurrency = fetch_concurrency
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.workers
+        self.timeout = timeout
+        self.executor = executor
+        self.errors = {}
+
+    def __aiter__(self):
+
+        return self._results()
+
+    async def _results(self):
+
+        loop = asyncio.get_running_loop()
+        self.errors = {}
+
+        symbols = self.symbols
+        if symbols is None:
+            symbols = self.source.symbols()
+            if inspect.isawaitable(symbols):
+                symbols = await symbols
+        pending = asyncio.Queue()
+        for symbol in symbols:
+            pending.put_nowait(symbol)
+
+        #bounded queues give the backpressure, a full queue suspends the tasks feeding it
+        frames = asyncio.Queue(maxsize=self.queue_size)
+        results = asyncio.Queue(maxsize=self.queue_size)
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='trade_strat_scan')
+
+        async def fetcher():
+            while not pending.empty():
+                symbol = pending.get_nowait()
+                try:
+                    df = await asyncio.wait_for(self.source.fetch(symbol), self.timeout)
+                except Exception:
+                    await results.put((symbol, None, _error_text()))
+                    continue
+                await frames.put((symbol, df))
+
+        async def scanner():
+            while True:
+                item = await frames.get()
+                if item is None:
+                    return
+                symbol, df = item
+                try:
+                    scan = loop.run_in_executor(executor, _scan, self.strategy, self.strategy_params, symbol, df)
+                    result = await asyncio.wait_for(scan, self.timeout)
+                except Exception:
+                    await results.put((symbol, None, _error_text()))
+                    continue
+                await results.put((symbol, result, None))
+
+        async def close():
+            #scanners stop once every fetch is queued, then the results queue is closed
+            await asyncio.gather(*fetchers)
+            for _ in scanners:
+                await frames.put(None)
+            await asyncio.gather(*scanners)
+            await results.put(None)
+
+        fetchers = [asyncio.create_task(fetcher()) for _ in range(max(1, self.fetch_concurrency))]
+        scanners = [asyncio.create_task(scanner()) for _ in range(self.workers)]
+        tasks = fetchers + scanners + [asyncio.create_task(close())]
+
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                symbol, result, error = item
+                if error is not None:
+                    self.errors[symbol] = error
+                else:
+                    yield symbol, result
+        finally:
+            #a consumer that stops early cancels the fetches and scans still queued
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _collect(self):
+
+        return {symbol: result async for symbol, result in self}
+
+    def run_scan(self):
+
+        return asyncio.run(self._collect())
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import random
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+#file extension -> format read by directory_source
+_EXTENSIONS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+class directory_source:
+
+    '''
+    Class to serve OHLC bars from a local directory, one CSV or Parquet file per symbol named after it, e.g. data/AAPL.csv.
+    Files are read on a worker thread, so the event loop keeps fetching other symbols and handing bars to the scans
+    while the disk is busy. Any object with symbols() and an async fetch(symbol) returning a dataframe can be used
+    as a source of scan_pipeline in the same way.
+
+    Arguments:
+    path (str): directory holding the files
+    file_format (str): 'csv' or 'parquet' to read only that format - default None reads .csv, .parquet and .pq files
+    columns (list): columns to keep, e.g. ['Close'] - default None keeps every column
+    index_col (int or str): CSV column used as the index - default 0
+    parse_dates (bool): parse the CSV index as dates - default True
+
+    Returns:
+    symbols returns the sorted list of symbols found in the directory
+    fetch returns the bars of one symbol as a pandas dataframe
+
+    Raises:
+    ValueError if file_format is not 'csv' or 'parquet'.
+    KeyError from fetch if the directory has no file for the symbol.
+    ImportError from fetch for Parquet files if pyarrow is not installed.
+
+    Example:
+    source = directory_source(path = 'data/daily', columns = ['Close'])
+    df = await source.fetch('AAPL')
+
+    PRECONDITIONS: file names are the symbol followed by the extension, one file per symbol.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, path = None, file_format = None, columns = None, index_col = 0, parse_dates = True):
+
+        if file_format not in (None, 'csv', 'parquet'):
+            raise ValueError(f"file_format must be 'csv' or 'parquet', got {file_format!r}")
+
+        self.path = path
+        self.file_format = file_format
+        self.columns = list(columns) if columns is not None else None
+        self.index_col = index_col
+        self.parse_dates = parse_dates
+        self._files = None
+
+    def _scan_directory(self):
+
+        #symbol -> (file path, format)
+        files = {}
+        for name in sorted(os.listdir(self.path)):
+            stem, extension = os.path.splitext(name)
+            file_format = _EXTENSIONS.get(extension.lower())
+            if file_format is not None and self.file_format in (None, file_format):
+                files[stem] = (os.path.join(self.path, name), file_format)
+        return files
+
+    def symbols(self):
+
+        self._files = self._scan_directory()
+        return list(self._files)
+
+    def _read(self, symbol):
+
+        if self._files is None or symbol not in self._files:
+            self._files = self._scan_directory()
+        path, file_format = self._files[symbol]
+        if file_format == 'parquet':
+            return pd.read_parquet(path, columns=self.columns)
+        df = pd.read_csv(path, index_col=self.index_col, parse_dates=self.parse_dates)
+        return df[self.columns] if self.columns is not None else df
+
+    async def fetch(self, symbol = None):
+
+        return await asyncio.to_thread(self._read, symbol)
+
+class mock_feed:
+
+    '''
+    Class to serve bars from memory with simulated network latency, an in process stand in for a market data feed.
+    Used to test pipelines and measure how well they overlap waiting with scanning, without a network or files.
+
+    Arguments:
+    data (dict): symbol -> OHLC dataframe
+    latency (float or dict): seconds each fetch waits, or symbol -> seconds - default 0.0
+    jitter (float): up to this many extra seconds added to each wait at random - default 0.0
+    failures (dict): symbol -> exception raised by its fetch, e.g. {'XYZ': ConnectionError('reset')} - default None
+    seed (int): seed of the jitter - default None
+
+    Returns:
+    symbols returns the symbols of data in order
+    fetch returns the dataframe of one symbol after its latency
+    fetched lists the symbols in the order their fetches completed
+
+    Raises:
+    KeyError from fetch if the symbol is not in data.
+
+    Example:
+    feed = mock_feed(data = frames, latency = 0.05, failures = {'BAD': ConnectionError('reset')})
+    async for symbol, df_signals in scan_pipeline(source = feed, strategy = ts.double_rsi):
+        print(symbol, df_signals['Signal'].iloc[-1])
+
+    PRECONDITIONS: None
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, data = None, latency = 0.0, jitter = 0.0, failures = None, seed = None):
+
+        self.data = data
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = dict(failures or {})
+        self.fetched = []
+        self._random = random.Random(seed)
+
+    def symbols(self):
+
+        return list(self.data)
+
+    async def fetch(self, symbol = None):
+
+        delay = self.latency.get(symbol, 0.0) if isinstance(self.latency, dict) else self.latency
+        delay += self._random.uniform(0.0, self.jitter) if self.jitter else 0.0
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if symbol in self.failures:
+            raise self.failures[symbol]
+        df = self.data[symbol]
+        self.fetched.append(symbol)
+        return df
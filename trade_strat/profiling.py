@@ -0,0 +1,383 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+#active sink and options, None while profiling is off, tracemalloc is True when enable_profiling started tracing
+_state = {'sink': None, 'memory': False, 'tracemalloc': False}
+
+#strategy and symbol of the scan currently running in this thread or task
+_scan_context = contextvars.ContextVar('trade_strat_scan', default={})
+
+def _output_size(value):
+    '''
+    Bytes and rows of a stage output, numpy arrays and pandas objects are measured, anything else counts as zero.
+    '''
+    if isinstance(value, np.ndarray):
+        return value.nbytes, value.shape[0] if value.ndim else 1
+    if hasattr(value, 'memory_usage') and hasattr(value, 'shape'):
+        usage = value.memory_usage(index=False, deep=False)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage), value.shape[0]
+    if isinstance(value, tuple):
+        sizes = [_output_size(v) for v in value]
+        return sum(size[0] for size in sizes), max((size[1] for size in sizes), default=0)
+    return 0, 0
+
+class _null_stage:
+
+    '''
+    Stage used while profiling is off, does nothing.
+    '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, value):
+        return value
+
+_NULL_STAGE = _null_stage()
+
+class _active_stage:
+
+    '''
+    Stage used while profiling is on, emits one record to the sink on exit.
+    '''
+
+    def __init__(self, name, sink, memory):
+
+        self.name = name
+        self.sink = sink
+        self.memory = memory
+        self.output_bytes = 0
+        self.output_rows = 0
+
+    def __enter__(self):
+
+        if self.memory:
+            tracemalloc.reset_peak()
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+
+        seconds = time.perf_counter() - self.t0
+        record = dict(_scan_context.get())
+        record.update({'stage': self.name, 'seconds': seconds, 'output_bytes': self.output_bytes, 'output_rows': self.output_rows, 'pid': os.getpid(), 'time': time.time()})
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record['alloc_bytes'] = current - self.mem_start
+            record['peak_bytes'] = peak - self.mem_start
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.sink.emit(record)
+        return False
+
+    def record(self, value):
+
+        self.output_bytes, self.output_rows = _output_size(value)
+        return value
+
+def profile_stage(name = None):
+    '''
+    Function to time one step of a scan, used as a context manager.
+    While profiling is off a shared no-op stage is returned, the cost is one dictionary lookup.
+    While on, wall time, output size and optionally allocations are sent to the sink as one record on exit.
+
+    Arguments:
+    name (str): stage name e.g. 'stochrsi', records with the same name are aggregated in the summary
+
+    Returns:
+    Context manager, record(value) notes the output size of the stage and returns value unchanged
+
+    Raises:
+    None
+
+    Example:
+    with profile_stage('rsi') as st:
+        rsi = st.record(ts.cached_indicator('rsi', data_col = df['Close'], length = 14))
+
+    PRECONDITIONS: stages are not nested when memory profiling is on, each stage resets the tracemalloc peak.
+    KJAGGS OCT 2023
+    '''
+
+    sink = _state['sink']
+    if sink is None:
+        return _NULL_STAGE
+    return _active_stage(name, sink, _state['memory'])
+
+class profile_scan:
+
+    '''
+    Class to label the profile records of a scan with a strategy and symbol, used as a context manager.
+    Labels nest, an inner scan keeps any label it does not set from the outer one.
+
+    Arguments:
+    strategy (str): strategy name - default None, keeps the outer label
+    symbol (str): instrument being scanned - default None, keeps the outer label
+
+    Example:
+    with profile_scan(symbol = 'AAPL'):
+        ts.double_rsi(df_scan = df).run_scan()
+
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, strategy = None, symbol = None):
+
+        self.labels = {key: value for key, value in (('strategy', strategy), ('symbol', symbol)) if value is not None}
+
+    def __enter__(self):
+
+        self.token = _scan_context.set({**_scan_context.get(), **self.labels})
+        return self
+
+    def __exit__(self, *exc):
+
+        _scan_context.reset(self.token)
+        return False
+
+def profiled_scan(run_scan):
+    '''
+    Decorator for strategy run_scan methods, labels the records with the class name and adds a 'total' stage.
+    Calls straight through while profiling is off.
+    '''
+
+    @functools.wraps(run_scan)
+    def wrapper(self, *args, **kwargs):
+        if _state['sink'] is None:
+            return run_scan(self, *args, **kwargs)
+        with profile_scan(strategy = type(self).__name__):
+            with _active_stage('total', _state['sink'], False) as st:
+                return st.record(run_scan(self, *args, **kwargs))
+
+    return wrapper
+
+class callback_sink:
+
+    '''
+    Class to pass every profile record to a function.
+
+    Arguments:
+    func (function): called with each record dict
+
+    Example:
+    enable_profiling(sink = callback_sink(func = print))
+    '''
+
+    def __init__(self, func = None):
+
+        self.func = func
+
+    def emit(self, record):
+
+        self.func(record)
+
+class memory_sink:
+
+    '''
+    Class to keep profile records in memory for a summary report.
+
+    Example:
+    sink = enable_profiling()
+    ...
+    print(sink.summary())
+
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self):
+
+        self.records = []
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+
+        with self._lock:
+            self.records = []
+
+    def summary(self, by = None):
+
+        return profile_summary(records = self.records, by = by)
+
+class jsonl_sink:
+
+    '''
+    Class to append profile records to a JSON lines file, one record per line.
+    The file is opened once per process, so a sink passed to pool workers appends from every worker.
+
+    Arguments:
+    path (str): output file, created if missing
+
+    Example:
+    enable_profiling(sink = jsonl_sink(path = 'scan_profile.jsonl'))
+    report = profile_summary(records = read_profile(path = 'scan_profile.jsonl'))
+
+    KJAGGS OCT 2023
+    '''
+
+    #records written by pool workers reach the parent through the file
+    forward_to_workers = True
+
+    def __init__(self, path = None):
+
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            if self._file is None or self._pid != os.getpid():
+                self._file = open(self.path, 'a')
+                self._pid = os.getpid()
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __getstate__(self):
+
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+
+        self.__init__(path = state['path'])
+
+def enable_profiling(sink = None, memory = False):
+    '''
+    Function to switch profiling on for the whole process.
+
+    Arguments:
+    sink (object or function): object with an emit(record) method, or a function taking the record - default a new memory_sink
+    memory (bool): also record allocations per stage with tracemalloc, slows scans noticeably - default False
+
+    Returns:
+    The active sink
+
+    Raises:
+    None
+
+    Example:
+    sink = enable_profiling()
+    enable_profiling(sink = jsonl_sink(path = 'profile.jsonl'), memory = True)
+    '''
+
+    if sink is None:
+        sink = memory_sink()
+    elif not hasattr(sink, 'emit'):
+        sink = callback_sink(func = sink)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state['tracemalloc'] = True
+    _state['sink'] = sink
+    _state['memory'] = memory
+    return sink
+
+def disable_profiling():
+    '''
+    Function to switch profiling off, stops tracemalloc if enable_profiling started it.
+
+    Returns:
+    The sink that was active, None if profiling was off
+    '''
+
+    sink = _state['sink']
+    #a tracemalloc session the caller started is left running
+    if _state['tracemalloc'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state['tracemalloc'] = False
+    _state['sink'] = None
+    _state['memory'] = False
+    return sink
+
+def active_sink():
+    '''
+    Function to get the active sink, None while profiling is off.
+    '''
+
+    return _state['sink']
+
+def read_profile(path = None):
+    '''
+    Function to load the records written by a jsonl_sink.
+
+    Arguments:
+    path (str): JSON lines file
+
+    Returns:
+    List of record dicts
+    '''
+
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def profile_summary(records = None, by = None):
+    '''
+    Function to aggregate profile records into a report, e.g. across every symbol of a universe scan.
+
+    Arguments:
+    records (list): record dicts from a memory_sink or read_profile
+    by (list): grouping columns - default ['strategy','stage']
+
+    Returns:
+    Pandas dataframe with one row per group - calls, symbols, total/mean/max seconds, share of the strategy total,
+    output bytes and, when memory profiling was on, allocated and peak bytes. Sorted by total seconds.
+
+    Raises:
+    None
+
+    Example:
+    print(profile_summary(records = sink.records).to_string())
+
+    KJAGGS OCT 2023
+    '''
+
+    by = list(by or ['strategy', 'stage'])
+    df = pd.DataFrame.from_records(records)
+    if df.empty:
+        return df
+    for col in ['strategy', 'symbol', 'stage'] + by:
+        if col not in df:
+            df[col] = None
+    df[by] = df[by].fillna('')
+
+    grouped = df.groupby(by, sort=False)
+    summary = grouped['seconds'].agg(calls='count', total_seconds='sum', mean_seconds='mean', max_seconds='max')
+    summary['symbols'] = grouped['symbol'].nunique()
+    summary['output_bytes'] = grouped['output_bytes'].sum()
+    for col in ['alloc_bytes', 'peak_bytes']:
+        if col in df:
+            summary[col] = grouped[col].sum() if col == 'alloc_bytes' else grouped[col].max()
+
+    #share of the time spent in the whole scan of the same strategy
+    if 'strategy' in by and 'stage' in by:
+        totals = df[df['stage'] == 'total'].groupby('strategy')['seconds'].sum()
+        strategy_total = summary.index.get_level_values(by.index('strategy')).map(totals)
+        summary['share'] = summary['total_seconds'] / np.asarray(strategy_total, dtype=float)
+
+    return summary.sort_values('total_seconds', ascending=False)
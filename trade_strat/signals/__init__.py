@@ -1,4 +1,8 @@
 from .crossover import crossover
 from .threshold import indicator_threshold
 from .crossover_fixed import crossover_fixed
-from .higher_trend import higher_trend
\ No newline at end of file
+from .higher_trend import higher_trend
+from .pivot_trend import pivot_trend
+from .streaming import crossover_stream, crossover_fixed_stream
+from .pivots import pivot_points, pivot_detector
+from .chunked import crossover_chunked, crossover_fixed_chunked, pivot_points_chunked, pivot_trend_chunked
@@ -0,0 +1,198 @@
+import numpy as np
+
+from .crossover import crossover
+from .crossover_fixed import crossover_fixed
+from .pivots import pivot_points
+
+class crossover_chunked:
+
+    '''
+    Class to determine where two signals cross each other over a history supplied in chunks.
+    The last pair of values is kept for the first comparison of the next chunk, so the concatenated output is
+    exactly crossover of the concatenated input.
+
+    Arguments:
+    None
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk
+    Where lead crosses above trailing = 1
+    Where trailing crosses above lead = -1
+
+    Raises:
+    None
+
+    Example:
+    cross = crossover_chunked()
+    values = cross.update(k_chunk, d_chunk)
+
+    Preconditions:
+    Chunks are numeric, the same length and supplied oldest to newest
+    '''
+
+    def __init__(self):
+
+        self._last = None
+
+    def update(self, lead_col = None, trailing_col = None):
+
+        lead_col = np.asarray(lead_col)
+        trailing_col = np.asarray(trailing_col)
+        if lead_col.shape[0] == 0:
+            return np.zeros(0, dtype=int)
+        if self._last is None:
+            out = crossover(lead_col, trailing_col)
+        else:
+            out = crossover(np.concatenate((self._last[0], lead_col)), np.concatenate((self._last[1], trailing_col)))[1:]
+        self._last = (lead_col[-1:].copy(), trailing_col[-1:].copy())
+        return out
+
+class crossover_fixed_chunked:
+
+    '''
+    Class to determine when a signal crosses above a lower bound or below a higher bound over a history supplied in chunks.
+    The last value is kept for the first comparison of the next chunk, so the concatenated output is exactly
+    crossover_fixed of the concatenated input.
+
+    Arguments:
+    threshold_low (float) - fixed reference value, signal crosses above value from below
+    threshold_high (float) - fixed reference value, signal crosses below value from above
+
+    Returns:
+    update returns a numpy array with one value per row of the chunk
+    Where value crosses above low threshold from below = 1
+    Where value crosses down from above high threshold = -1
+
+    Raises:
+    None
+
+    Example:
+    cross = crossover_fixed_chunked(threshold_low = 20, threshold_high = 80)
+    values = cross.update(rsi_chunk)
+
+    Preconditions:
+    Chunks are numeric with no inf values and supplied oldest to newest
+    '''
+
+    def __init__(self, threshold_low = None, threshold_high = None):
+
+        self.threshold_low = threshold_low
+        self.threshold_high = threshold_high
+        self._last = None
+
+    def update(self, lead_col = None):
+
+        lead_col = np.asarray(lead_col)
+        if lead_col.shape[0] == 0:
+            return np.zeros(0, dtype=int)
+        values = lead_col if self._last is None else np.concatenate((self._last, lead_col))
+        out = crossover_fixed(lead_col = values, threshold_low = self.threshold_low, threshold_high = self.threshold_high)
+        if self._last is not None:
+            out = out[1:]
+        self._last = lead_col[-1:].copy()
+        return out
+
+class pivot_points_chunked:
+
+    '''
+    Class to find local highs and lows over a history supplied in chunks, for histories larger than memory.
+    A pivot needs the order values after it, so each update returns the rows that are complete, which lag the input
+    by order rows, and keeps the last 2 * order values. finish returns the pending rows once the history has ended,
+    compared with the last value as pivot_points does. Together they are exactly pivot_points of the concatenated input.
+
+    Arguments:
+    order (int): number of values either side a pivot must exceed
+
+    Returns:
+    update returns a tuple of two boolean numpy arrays (is_high, is_low) for the rows completed by the chunk
+    finish returns the same for the last order rows of the history
+    done holds the number of rows returned so far
+
+    Raises:
+    None
+
+    Example:
+    pivots = pivot_points_chunked(order = 5)
+    for chunk in rsi_chunks:
+        is_high, is_low = pivots.update(chunk)
+    is_high, is_low = pivots.finish()
+
+    PRECONDITIONS: order >= 1, chunks are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, order = None):
+
+        self.order = order
+        self.count = 0
+        self.done = 0
+        self._tail = np.zeros(0)
+
+    def _rows(self, values, base, stop):
+
+        #pivots of the rows from done to stop, values starts at row base
+        is_high, is_low = pivot_points(data_col = values, order = self.order)
+        rows = slice(self.done - base, stop - base)
+        self.done = max(stop, self.done)
+        return is_high[rows], is_low[rows]
+
+    def update(self, data_col = None):
+
+        values = np.concatenate((self._tail, np.asarray(data_col, dtype=float)))
+        base = self.count - self._tail.shape[0]
+        self.count += values.shape[0] - self._tail.shape[0]
+        out = self._rows(values, base, max(self.count - self.order, self.done))
+        self._tail = values[max(values.shape[0] - 2 * self.order, 0):].copy()
+        return out
+
+    def finish(self):
+
+        return self._rows(self._tail, self.count - self._tail.shape[0], self.count)
+
+class pivot_trend_chunked:
+
+    '''
+    Class to apply pivot_trend to a history supplied in chunks.
+    The last pivot and the current trend are kept between chunks, so the concatenated output is exactly pivot_trend
+    of the concatenated input.
+
+    Arguments:
+    None
+
+    Returns:
+    update returns a boolean numpy array with one value per row of the chunk
+    True where the most recent pivot is higher than the pivot before it
+
+    Raises:
+    None
+
+    Example:
+    trend = pivot_trend_chunked()
+    values = trend.update(rsi_trend_min_chunk)
+
+    Preconditions:
+    Chunks are numeric, NaN marks rows without a pivot
+    '''
+
+    def __init__(self):
+
+        self._last_pivot = np.nan
+        self._trend = False
+
+    def update(self, input_col = None):
+
+        x = np.asarray(input_col, dtype=float)
+        out = np.full(x.shape[0], self._trend)
+        pivot_idx = np.flatnonzero(~np.isnan(x))
+        if pivot_idx.shape[0] == 0:
+            return out
+
+        #the first pivot ever is compared with NaN, which is False as before a second pivot
+        pivots = x[pivot_idx]
+        pivot_higher = np.concatenate(([self._last_pivot], pivots[:-1])) < pivots
+        fill_len = np.diff(np.append(pivot_idx, x.shape[0]))
+        out[pivot_idx[0]:] = np.repeat(pivot_higher, fill_len)
+
+        self._last_pivot = pivots[-1]
+        self._trend = bool(pivot_higher[-1])
+        return out
@@ -6,8 +6,8 @@ def crossover(lead_col = None, trailing_col = None):
     Function to determine where two signals cross each other.
 
     Arguments:
-    lead col - pandas column for lead signal
-    trailing col - pandas column for trailing signal
+    lead col - pandas column or numpy array for lead signal
+    trailing col - pandas column or numpy array for trailing signal
 
     Returns:
     Numpy array - declare as a new pandas column
@@ -25,8 +25,8 @@ def crossover(lead_col = None, trailing_col = None):
     '''
 
     #convert to mupy arrays
-    lead_col_numpy = lead_col.to_numpy()
-    trailing_col_numpy = trailing_col.to_numpy()
+    lead_col_numpy = np.asarray(lead_col)
+    trailing_col_numpy = np.asarray(trailing_col)
 
     array_crossover = np.zeros(lead_col.shape[0], dtype=int)
     array_crossover[1:lead_col.shape[0]] = np.diff((lead_col_numpy >trailing_col_numpy).astype(int)) 
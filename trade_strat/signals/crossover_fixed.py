@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 
 def crossover_fixed(lead_col = None, threshold_low = None, threshold_high = None):
     
@@ -7,7 +6,7 @@ def crossover_fixed(lead_col = None, threshold_low = None, threshold_high = None
     Function to determine when a signal cross above a lower bound and below a higher bound.
 
     Arguments:
-    lead col (pandas col, float) - pandas column for lead signal
+    lead col (pandas col or numpy array, float) - pandas column for lead signal
     threshold_low (float) - fixed reference value, signal crosses above value from below
     threshold_high (float(- fixed reference value, signal crosses below value from above
 
@@ -28,7 +27,7 @@ def crossover_fixed(lead_col = None, threshold_low = None, threshold_high = None
     '''
 
     #convert input to numpy arrays
-    lead_col_numpy = lead_col.to_numpy()
+    lead_col_numpy = np.asarray(lead_col)
 
     #define arrays
     array_crossover_low = np.zeros(lead_col.shape[0], dtype=int)
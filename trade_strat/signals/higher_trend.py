@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 
 def higher_trend(input_col = None):
     '''
@@ -7,7 +6,7 @@ def higher_trend(input_col = None):
     Used to determine higher highs or higher lows in trading startegy
 
     Arguments:
-    input_col (pandas col, float) - input pandas column
+    input_col (pandas col or numpy array, float) - input pandas column
 
     Returns:
     Boolean - True is last value is higher than second to last value
@@ -22,6 +21,13 @@ def higher_trend(input_col = None):
     test_boolean = higher_trend(input_col = df['Test'])
     '''
 
-    x = input_col.to_numpy()
-    x = x[~np.isnan(x)]
-    return x[-1] > x[-2]
\ No newline at end of file
+    x = np.asarray(input_col, dtype=float)
+
+    #search back from the end in growing blocks, sparse pivot columns rarely need more than the first block
+    stop, block = x.shape[0], 64
+    found = np.zeros(0, dtype=np.int64)
+    while found.shape[0] < 2 and stop > 0:
+        start = max(stop - block, 0)
+        found = np.concatenate((start + np.flatnonzero(~np.isnan(x[start:stop])), found))
+        stop, block = start, block * 4
+    return x[found[-1]] > x[found[-2]]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import numpy as np
+
+from trade_strat.indicators.backend import _kernel, _register_kernel
+
+def _pivot_trend_reference(x):
+
+    array_trend = np.zeros(x.shape[0], dtype=bool)
+
+    #locate pivots, at least two are required before a comparison is possible
+    pivot_idx = np.flatnonzero(~np.isnan(x))
+    if pivot_idx.shape[0] < 2:
+        return array_trend
+
+    #compare each pivot with its predecessor
+    pivot_higher = x[pivot_idx[:-1]] < x[pivot_idx[1:]]
+
+    #forward fill each comparison until the next pivot or the end of the series
+    fill_len = np.diff(np.append(pivot_idx[1:], x.shape[0]))
+    array_trend[pivot_idx[1]:] = np.repeat(pivot_higher, fill_len)
+
+    return array_trend
+
+def _pivot_trend_loop(x):
+    array_trend = np.zeros(x.shape[0], dtype=np.bool_)
+    last_pivot = np.nan
+    trend = False
+    for i in range(x.shape[0]):
+        if x[i] == x[i]:
+            #the first pivot is compared with NaN, which is False
+            trend = last_pivot < x[i]
+            last_pivot = x[i]
+        array_trend[i] = trend
+    return array_trend
+
+_register_kernel('pivot_trend', _pivot_trend_reference, _pivot_trend_loop)
+
+def pivot_trend(input_col = None):
+    '''
+    Function to determine if each pivot in a sparse series is higher than the pivot before it.
+    Used to track higher highs or higher lows across local extrema in a trading strategy.
+    Each non NaN value is compared with the previous non NaN value and the result is carried forward
+    until the next pivot is reached.
+
+    Arguments:
+    input_col (pandas col or numpy array, float) - sparse input column, NaN everywhere except at pivots
+
+    Returns:
+    Numpy array (bool) - declare as a new pandas column
+    True where the most recent pivot is higher than the pivot before it
+    False before the second pivot is observed
+
+    Raises:
+    None
+
+    Preconditions:
+    Supplied column is numeric, NaN is used to mark rows without a pivot
+
+    Example:
+    df['Higher Low'] = pivot_trend(input_col = df['RSI Trend Min'])
+    '''
+
+    x = np.ascontiguousarray(input_col, dtype=float)
+    return _kernel('pivot_trend')(x)
@@ -0,0 +1,144 @@
+from collections import deque
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+ndimage = lazy_module('scipy.ndimage')
+
+def pivot_points(data_col = None, order = None):
+    '''
+    Function to find local highs and lows, each value compared with the order values either side of it.
+    Gives the same pivots as scipy.signal.argrelextrema(data, np.greater / np.less, order=order) in its default clip mode:
+    near either end, missing neighbours are replaced by the first or last value. A value next to a NaN is never a pivot.
+    Sliding window maxima/minima make the cost independent of order.
+
+    Arguments:
+    data_col (float): pandas column or numpy array input e.g. RSI
+    order (int): number of values either side a pivot must exceed
+
+    Returns:
+    Tuple of two boolean numpy arrays (is_high, is_low) - declare as new pandas columns
+
+    Raises:
+    None
+
+    Example:
+    is_high, is_low = pivot_points(data_col = df['RSI Fast'], order = 5)
+    df['Local Max'] = np.where(is_high, df['RSI Fast'], np.NaN)
+
+    PRECONDITIONS: order >= 1, data is one dimensional.
+    KJAGGS OCT 2023
+    '''
+
+    x = np.asarray(data_col, dtype=float)
+    n = x.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+
+    nan_mask = np.isnan(x)
+    pivots = []
+    for fill, extreme_filter, compare in ((np.inf, ndimage.maximum_filter1d, np.greater), (-np.inf, ndimage.minimum_filter1d, np.less)):
+        #a NaN neighbour fails every comparison, so it counts as the most extreme value
+        y = np.where(nan_mask, fill, x)
+        #trailing window [j-order+1, j] and leading window [j, j+order-1], edges padded with the end values as clip mode
+        trailing = extreme_filter(y, size=order, mode='nearest', origin=(order - 1) // 2)
+        leading = extreme_filter(y, size=order, mode='nearest', origin=-(order // 2))
+        left = np.concatenate((y[:1], trailing[:-1]))
+        right = np.concatenate((leading[1:], y[-1:]))
+        pivots.append(compare(x, left) & compare(x, right))
+
+    return pivots[0], pivots[1]
+
+class pivot_detector:
+
+    '''
+    Class to confirm local highs and lows one value at a time, for live feeds.
+    Keeps a ring buffer of the last 2 * order + 1 values. A pivot is confirmed order values after it happens,
+    once every neighbour on both sides is known, so no future data is used.
+    The pivots confirmed over a history, plus those from flush at the end, are the same as pivot_points and argrelextrema.
+
+    Arguments:
+    order (int): number of values either side a pivot must exceed
+
+    Returns:
+    update returns 1 if the value order updates ago is confirmed as a high, -1 for a low, 0 otherwise
+    pivot_index and pivot_value hold the position (count of values before it) and value of that candidate
+    update_many returns a numpy int8 array, entry i refers to the value at i - order
+    flush returns a list of (index, value, 1 or -1) for the last order values, as a batch scan ending here would mark them
+
+    Raises:
+    None
+
+    Example:
+    detector = pivot_detector(order = 5)
+    if detector.update(rsi) == 1:
+        print('high at', detector.pivot_index, detector.pivot_value)
+
+    PRECONDITIONS: order >= 1, values are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, order = None):
+
+        self.order = order
+        self._buffer = deque(maxlen=2 * order + 1)
+        self.count = 0
+        self.pivot_index = None
+        self.pivot_value = None
+
+    @staticmethod
+    def _classify(value, neighbours):
+
+        #comparisons with NaN are False, so a NaN value or neighbour is never a pivot
+        if not neighbours:
+            return 0
+        if all(value > other for other in neighbours):
+            return 1
+        if all(value < other for other in neighbours):
+            return -1
+        return 0
+
+    def update(self, value = None):
+
+        self._buffer.append(float(value))
+        self.count += 1
+
+        candidate = self.count - 1 - self.order
+        if candidate < 0:
+            self.pivot_index = None
+            self.pivot_value = None
+            return 0
+
+        #candidate sits order places from the newest value, fewer values precede it early in the history
+        values = list(self._buffer)
+        pos = len(values) - 1 - self.order
+        self.pivot_index = candidate
+        self.pivot_value = values[pos]
+        if candidate == 0:
+            #clip mode compares the first value with itself
+            return 0
+        return self._classify(values[pos], values[:pos] + values[pos + 1:])
+
+    def update_many(self, data = None):
+
+        data = np.asarray(data, dtype=float)
+        out = np.zeros(data.shape[0], dtype=np.int8)
+        for i, value in enumerate(data.tolist()):
+            out[i] = self.update(value)
+        return out
+
+    def flush(self):
+
+        values = list(self._buffer)
+        pivots = []
+        for pos in range(max(0, len(values) - self.order), len(values)):
+            index = self.count - len(values) + pos
+            #the newest value and the first value are compared with themselves in clip mode
+            if index == self.count - 1 or index == 0:
+                continue
+            left = values[max(0, pos - self.order):pos]
+            kind = self._classify(values[pos], left + values[pos + 1:])
+            if kind != 0:
+                pivots.append((index, values[pos], kind))
+        return pivots
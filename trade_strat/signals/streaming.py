@@ -0,0 +1,108 @@
+import numpy as np
+
+class crossover_stream:
+
+    '''
+    Class to determine where two signals cross each other, one bar at a time.
+    Values match crossover on the same history exactly.
+
+    Arguments:
+    None
+
+    Returns:
+    update returns an int for the latest bar
+    Where lead value crosses above trailing value = 1
+    Where trailing value crosses above lead value = -1
+    update_many returns a numpy array, one value per input bar
+
+    Raises:
+    None
+
+    Example:
+    cross = crossover_stream()
+    latest = cross.update(k, d)
+
+    Preconditions:
+    Supplied values are numeric
+    '''
+
+    def __init__(self):
+
+        self._prev_above = None
+        self.value = 0
+
+    def update(self, lead = None, trailing = None):
+
+        above = int(lead > trailing)
+        self.value = 0 if self._prev_above is None else above - self._prev_above
+        self._prev_above = above
+        return self.value
+
+    def update_many(self, lead_col = None, trailing_col = None):
+
+        lead_col = np.asarray(lead_col, dtype=float)
+        trailing_col = np.asarray(trailing_col, dtype=float)
+        out = np.zeros(lead_col.shape[0], dtype=int)
+        for i, (lead, trailing) in enumerate(zip(lead_col.tolist(), trailing_col.tolist())):
+            out[i] = self.update(lead, trailing)
+        return out
+
+class crossover_fixed_stream:
+
+    '''
+    Class to determine when a signal crosses above a lower bound or below a higher bound, one bar at a time.
+    Values match crossover_fixed on the same history exactly, including the integer truncation of thresholds.
+
+    Arguments:
+    threshold_low (float) - fixed reference value, signal crosses above value from below
+    threshold_high (float) - fixed reference value, signal crosses below value from above
+
+    Returns:
+    update returns an int for the latest bar
+    Where value crosses above low threshold from below = 1
+    Where value crosses down from above high threshold = -1
+    update_many returns a numpy array, one value per input bar
+
+    Raises:
+    None
+
+    Example:
+    cross = crossover_fixed_stream(threshold_low = 20, threshold_high = 80)
+    latest = cross.update(rsi)
+
+    Preconditions:
+    Supplied values are numeric with no inf values
+    '''
+
+    def __init__(self, threshold_low = None, threshold_high = None):
+
+        #crossover_fixed holds its thresholds in integer arrays
+        self.threshold_low = int(threshold_low)
+        self.threshold_high = int(threshold_high)
+        self._prev_above_low = None
+        self._prev_below_high = None
+        self.value = 0
+
+    def update(self, lead = None):
+
+        above_low = int(lead > self.threshold_low)
+        below_high = int(lead < self.threshold_high)
+
+        if self._prev_above_low is None:
+            self.value = 0
+        else:
+            cross_low = above_low - self._prev_above_low
+            cross_high = self._prev_below_high - below_high
+            self.value = (cross_low if cross_low == 1 else 0) + (cross_high if cross_high == -1 else 0)
+
+        self._prev_above_low = above_low
+        self._prev_below_high = below_high
+        return self.value
+
+    def update_many(self, lead_col = None):
+
+        lead_col = np.asarray(lead_col, dtype=float)
+        out = np.zeros(lead_col.shape[0], dtype=int)
+        for i, lead in enumerate(lead_col.tolist()):
+            out[i] = self.update(lead)
+        return out
@@ -1,9 +1,11 @@
+import numpy as np
+
 def indicator_threshold(column = None, upper_threshold = None, lower_threshold = None):
     '''
     Function to determine where a signal is above or below predefined thresholds.
 
     Arguments:
-    column (pandas)- pandas column for input signal
+    column (pandas)- pandas column or numpy array for input signal
     upper threshold (float/int) - limit above which a signal is returned
     lower threshold (float/int) - limit below which a signal is returned
     
@@ -21,8 +23,9 @@ def indicator_threshold(column = None, upper_threshold = None, lower_threshold =
     Example:
     df['threshold'] = indicator_threshold(column = df['signal'], upper_threshold = 80, lower_threshold = 20)
     '''
-    array_upper = (column.to_numpy() > upper_threshold).astype(int)
-    array_lower = (column.to_numpy() < lower_threshold).astype(int) *-1
+    column_numpy = np.asarray(column)
+    array_upper = (column_numpy > upper_threshold).astype(int)
+    array_lower = (column_numpy < lower_threshold).astype(int) *-1
 
     return array_upper + array_lower
 
@@ -0,0 +1 @@
+from .columnar import columnar_store, stream_update, stream_params
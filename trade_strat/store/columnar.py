@@ -0,0 +1,334 @@
+import inspect
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+MANIFEST = 'manifest.json'
+INDEX_FILE = 'index.bin'
+
+def _column_file(name):
+    '''
+    File name of a column, names may contain spaces and symbols such as 'Close > EMA'.
+    '''
+    return 'col_' + name.encode('utf-8').hex() + '.bin'
+
+def _state_file(key):
+
+    return 'state_' + key.encode('utf-8').hex() + '.pkl'
+
+class columnar_store:
+
+    '''
+    Class to keep per symbol OHLC history and derived columns on disk for memory mapped reads.
+    Each symbol is a directory holding one raw little endian binary file per column plus the index, and a manifest.json
+    recording row counts, dtypes and the parameters each derived column was calculated with.
+    Rows are only ever appended. Reads map the files read only, so a scan touches just the columns it needs
+    and nothing is copied until pandas or the caller needs to.
+    Streaming indicator/strategy state can be saved next to the columns, see stream_update, so a nightly run only
+    calculates the new bars.
+
+    Arguments:
+    path (str): root directory of the store, created if missing
+
+    Returns:
+    read returns a pandas dataframe backed by read only memory maps
+    read_columns returns a dict of column name -> read only numpy memmap
+
+    Raises:
+    KeyError if a symbol or column is not in the store.
+    ValueError if appended rows do not start after the stored index, or columns and dtypes do not match.
+
+    Example:
+    store = columnar_store(path = 'data/daily')
+    store.write('AAPL', df[['Open','High','Low','Close']])
+    store.append('AAPL', new_bars)
+    closes = store.read_columns('AAPL', ['Close'])['Close']
+
+    PRECONDITIONS: one writer per symbol at a time, index is increasing.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, path = None):
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _dir(self, symbol):
+
+        if not symbol or os.sep in symbol or symbol in ('.', '..') or (os.altsep and os.altsep in symbol):
+            raise ValueError(f"invalid symbol name {symbol!r}")
+        return os.path.join(self.path, symbol)
+
+    def symbols(self):
+
+        return sorted(name for name in os.listdir(self.path) if os.path.isfile(os.path.join(self.path, name, MANIFEST)))
+
+    def manifest(self, symbol):
+
+        try:
+            with open(os.path.join(self._dir(symbol), MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(symbol) from None
+
+    def _save_manifest(self, symbol, manifest):
+
+        #write then rename so a crash never leaves a partial manifest
+        path = os.path.join(self._dir(symbol), MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def _append_file(self, symbol, file_name, values, rows):
+        '''
+        Append values to a binary file after cutting it back to the rows the manifest knows about.
+        '''
+        path = os.path.join(self._dir(symbol), file_name)
+        with open(path, 'ab') as f:
+            f.truncate(rows * values.dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+
+    @staticmethod
+    def _index_values(index):
+        '''
+        Index as a little endian int64/float64 array plus the manifest description needed to rebuild it.
+        '''
+        if isinstance(index, pd.DatetimeIndex):
+            tz = str(index.tz) if index.tz is not None else None
+            values = index.tz_convert('UTC').tz_localize(None) if tz else index
+            return np.ascontiguousarray(values.to_numpy(dtype='datetime64[ns]').view('<i8')), {'kind': 'datetime', 'tz': tz, 'name': index.name}
+        values = np.asarray(index)
+        if values.dtype.kind not in 'iuf':
+            raise ValueError(f"index must be datetime or numeric, got {values.dtype}")
+        values = values.astype('<i8' if values.dtype.kind in 'iu' else '<f8')
+        return values, {'kind': values.dtype.str, 'tz': None, 'name': index.name}
+
+    def _build_index(self, raw, meta):
+
+        if meta['kind'] == 'datetime':
+            index = pd.DatetimeIndex(raw.view('datetime64[ns]'), name=meta['name'])
+            return index.tz_localize('UTC').tz_convert(meta['tz']) if meta['tz'] else index
+        return pd.Index(raw, name=meta['name'])
+
+    def write(self, symbol = None, df = None, params = None):
+        '''
+        Create or replace a symbol from a dataframe. params maps column name -> dict of calculation parameters.
+        '''
+        directory = self._dir(symbol)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+
+        index_values, index_meta = self._index_values(df.index)
+        if index_values.shape[0] > 1 and not (np.diff(index_values) > 0).all():
+            raise ValueError("index must be strictly increasing")
+        manifest = {'version': 1, 'rows': 0, 'index': dict(index_meta, dtype=index_values.dtype.str), 'columns': {}, 'states': {}}
+        self._save_manifest(symbol, manifest)
+
+        self._append_file(symbol, INDEX_FILE, index_values, 0)
+        for name in df.columns:
+            values = np.ascontiguousarray(df[name].to_numpy())
+            if values.dtype.kind not in 'biuf':
+                raise ValueError(f"column {name!r} has dtype {values.dtype}, only bool and numeric columns can be stored")
+            values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+            self._append_file(symbol, _column_file(name), values, 0)
+            manifest['columns'][name] = {'dtype': values.dtype.str, 'rows': values.shape[0], 'params': (params or {}).get(name)}
+
+        manifest['rows'] = index_values.shape[0]
+        self._save_manifest(symbol, manifest)
+
+    def append(self, symbol = None, df = None):
+        '''
+        Append new bars. df must have every stored base column, the index must start after the last stored row.
+        Derived columns are extended separately with add_column or stream_update.
+        '''
+        manifest = self.manifest(symbol)
+        rows = manifest['rows']
+        if df.shape[0] == 0:
+            return rows
+
+        index_values, _ = self._index_values(df.index)
+        if index_values.dtype.str != manifest['index']['dtype']:
+            raise ValueError(f"index dtype {index_values.dtype.str} does not match stored {manifest['index']['dtype']}")
+        if (index_values.shape[0] > 1 and not (np.diff(index_values) > 0).all()) or (rows and index_values[0] <= self._last_index(symbol, manifest)):
+            raise ValueError("appended rows must be in increasing index order after the last stored row")
+
+        base = [name for name, meta in manifest['columns'].items() if meta['rows'] == rows and meta['params'] is None]
+        missing = [name for name in base if name not in df.columns]
+        if missing:
+            raise ValueError(f"appended rows are missing stored columns {missing}")
+
+        for name in base:
+            meta = manifest['columns'][name]
+            values = np.ascontiguousarray(df[name].to_numpy()).astype(meta['dtype'], copy=False)
+            self._append_file(symbol, _column_file(name), values, meta['rows'])
+            meta['rows'] += values.shape[0]
+        self._append_file(symbol, INDEX_FILE, index_values, rows)
+
+        manifest['rows'] = rows + index_values.shape[0]
+        self._save_manifest(symbol, manifest)
+        return manifest['rows']
+
+    def _last_index(self, symbol, manifest):
+
+        raw = np.memmap(os.path.join(self._dir(symbol), INDEX_FILE), dtype=manifest['index']['dtype'], mode='r', shape=(manifest['rows'],))
+        return raw[-1]
+
+    def add_column(self, symbol = None, name = None, values = None, params = None, dtype = None, start = None):
+        '''
+        Create a derived column, or extend it by values appended after its current last row, or after row start when given.
+        params records how it was calculated, an existing column must have been calculated with the same params.
+        '''
+        manifest = self.manifest(symbol)
+        values = np.ascontiguousarray(values, dtype=dtype)
+        meta = manifest['columns'].get(name)
+        if meta is None:
+            meta = {'dtype': values.dtype.newbyteorder('<').str, 'rows': 0, 'params': params}
+            manifest['columns'][name] = meta
+        elif meta['params'] != params:
+            raise ValueError(f"column {name!r} was calculated with {meta['params']}, not {params}")
+        if start is not None:
+            #rows past start are replaced, e.g. written before an interrupted update saved its state
+            meta['rows'] = min(meta['rows'], start)
+
+        if meta['rows'] + values.shape[0] > manifest['rows']:
+            raise ValueError(f"column {name!r} would have {meta['rows'] + values.shape[0]} rows, the index has {manifest['rows']}")
+
+        self._append_file(symbol, _column_file(name), values.astype(meta['dtype'], copy=False), meta['rows'])
+        meta['rows'] += values.shape[0]
+        self._save_manifest(symbol, manifest)
+        return meta['rows']
+
+    def read_columns(self, symbol = None, columns = None, start = 0):
+        '''
+        Dict of column name -> read only memmap from row start to the end of the column, no data is loaded.
+        '''
+        manifest = self.manifest(symbol)
+        columns = list(manifest['columns']) if columns is None else columns
+        out = {}
+        for name in columns:
+            meta = manifest['columns'][name]
+            if meta['rows'] <= start:
+                out[name] = np.zeros(0, dtype=meta['dtype'])
+                continue
+            out[name] = np.memmap(os.path.join(self._dir(symbol), _column_file(name)), dtype=meta['dtype'], mode='r',
+                                  offset=start * np.dtype(meta['dtype']).itemsize, shape=(meta['rows'] - start,))
+        return out
+
+    def read(self, symbol = None, columns = None, start = 0):
+        '''
+        Dataframe of the requested columns from row start, columns stay memory mapped.
+        '''
+        manifest = self.manifest(symbol)
+        columns = list(manifest['columns']) if columns is None else columns
+        stale = [name for name in columns if manifest['columns'][name]['rows'] != manifest['rows']]
+        if stale:
+            raise ValueError(f"columns {stale} are shorter than the index, update them before reading")
+
+        rows = manifest['rows'] - start
+        raw = np.memmap(os.path.join(self._dir(symbol), INDEX_FILE), dtype=manifest['index']['dtype'], mode='r',
+                        offset=start * 8, shape=(rows,)) if rows > 0 else np.zeros(0, dtype=manifest['index']['dtype'])
+        index = self._build_index(raw, manifest['index'])
+        return pd.DataFrame(self.read_columns(symbol, columns, start), index=index, copy=False)
+
+    def save_state(self, symbol = None, key = None, state = None, rows = None, params = None):
+        '''
+        Pickle a streaming object that has consumed the first rows bars of the symbol.
+        '''
+        manifest = self.manifest(symbol)
+        path = os.path.join(self._dir(symbol), _state_file(key))
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        manifest['states'][key] = {'rows': rows, 'params': params, 'class': type(state).__name__}
+        self._save_manifest(symbol, manifest)
+
+    def load_state(self, symbol = None, key = None):
+        '''
+        Streaming object and the number of bars it has consumed, (None, 0) if nothing has been saved.
+        '''
+        meta = self.manifest(symbol)['states'].get(key)
+        if meta is None:
+            return None, 0
+        with open(os.path.join(self._dir(symbol), _state_file(key)), 'rb') as f:
+            return pickle.load(f), meta['rows']
+
+    def delete(self, symbol = None):
+
+        shutil.rmtree(self._dir(symbol))
+
+def stream_params(stream = None):
+    '''
+    Function to read the constructor parameters of a streaming indicator or strategy, used to label stored columns.
+
+    Arguments:
+    stream (object): streaming class instance e.g. ts.ema_stream(ema_period = 21)
+
+    Returns:
+    Dict of the class name and every constructor argument except seed_data
+
+    Example:
+    stream_params(ts.rsi_stream(rsi_len = 14)) -> {'class': 'rsi_stream', 'rsi_len': 14}
+    '''
+
+    params = {'class': type(stream).__name__}
+    for name in inspect.signature(type(stream)).parameters:
+        if name != 'seed_data' and hasattr(stream, name):
+            params[name] = getattr(stream, name)
+    return params
+
+def stream_update(store = None, symbol = None, stream = None, columns = None, input_column = 'Close', key = None, dtype = None):
+    '''
+    Function to bring stored derived columns up to date by feeding only the bars not yet seen to a streaming object.
+    The object's state is saved in the store after each update, the first call runs it over the full history.
+
+    Arguments:
+    store (columnar_store): store holding the symbol
+    symbol (str): instrument to update
+    stream (object): fresh streaming instance with update_many e.g. ts.triple_ema_stoch_rsi_stream(...), used when no state is stored
+    columns (str or list): output column name, or one name per output column e.g. ['srsik','srsid']
+    input_column (str): stored column fed to the stream - default 'Close'
+    key (str): name of the saved state - default the first output column
+    dtype (numpy dtype): dtype of new output columns e.g. np.int8 for Signal - default the stream output dtype
+
+    Returns:
+    Numpy array of the newly calculated values, one row per new bar
+
+    Raises:
+    ValueError if the stored state was created with different parameters than stream.
+
+    Example:
+    store.append('AAPL', todays_bars)
+    stream_update(store = store, symbol = 'AAPL', stream = ts.triple_ema_stoch_rsi_stream(stoch_len = 14,stochrsi_length=14,stoch_k = 3,stoch_d = 3,ema_slow_len = 200,ema_med_len = 50,ema_fast_len = 21), columns = 'Signal', dtype = np.int8)
+
+    PRECONDITIONS: the stream constructor arguments are kept as attributes of the same name, as the package streams do.
+    KJAGGS OCT 2023
+    '''
+
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    key = key or columns[0]
+    params = stream_params(stream)
+
+    state, rows = store.load_state(symbol, key)
+    if state is None:
+        state = stream
+    elif store.manifest(symbol)['states'][key]['params'] != params:
+        raise ValueError(f"state {key!r} for {symbol} was created with different parameters, delete the columns and state to recalculate")
+
+    new_bars = store.read_columns(symbol, [input_column], start = rows)[input_column]
+    out = np.asarray(state.update_many(new_bars))
+    out_2d = out.reshape(out.shape[0], -1)
+
+    for j, name in enumerate(columns):
+        store.add_column(symbol, name, out_2d[:, j], params = dict(params, output = j) if len(columns) > 1 else params, dtype = dtype, start = rows)
+    store.save_state(symbol, key, state, rows + new_bars.shape[0], params)
+
+    return out
@@ -1,2 +1,5 @@
 from .triple_ema_stoch_rsi import triple_ema_stoch_rsi
-from .double_rsi import double_rsi
\ No newline at end of file
+from .double_rsi import double_rsi
+from .triple_ema_stoch_rsi_stream import triple_ema_stoch_rsi_stream
+from .sweep import triple_ema_stoch_rsi_sweep
+from .double_rsi_stream import double_rsi_stream
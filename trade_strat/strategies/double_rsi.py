@@ -1,9 +1,9 @@
 import numpy as np
-import pandas as pd
-import trade_strat as ts
-import pandas_ta as pta
-import math
-from scipy.signal import argrelextrema
+
+from trade_strat.graph.nodes import node, scan_graph
+from trade_strat.profiling import profiled_scan
+
+from .output import scan_output, scan_bars
 
 class double_rsi:
 
@@ -23,24 +23,38 @@ class double_rsi:
     slow_rsi_len (int): length of slow rsi -  default = 14
     rsi_threshold_low (float): value of low value crossover for long signal -  default = 15.0
     rsi_threshold_high (float): value of high value crossunder for short signal -  default = 85.0
-    local_hl_period(int): scanning period for argrelextrema, used to detect local highs/lows default = 5
+    local_hl_period(int): bars either side of a local high/low, as argrelextrema order - default = 5
+    output (str): 'full' adds every indicator to df_scan, 'compact' leaves df_scan untouched - default 'full'
+    diagnostics (list): indicator columns returned alongside Signal in compact mode e.g. ['Higher Low','Higher High'] - default None
+    timeframe (str): higher timeframe to scan on e.g. 'W' for daily df_scan, results are broadcast back onto the df_scan index without lookahead - default None
+    workers (int): threads computing independent indicators at the same time, lowers the latency of one scan on a multi core machine - default None
 
     Returns:
     Pandas dataframe - updated OHLC with the indicators generated from Arguments
     Signal column is a trade flag, 1 for long, -1 for short
+    In compact mode a new dataframe on the input index with Signal (int8) and the diagnostics in their narrowest dtypes
 
     Raises:
-    None
+    ValueError if output is not 'full' or 'compact', or a diagnostic column is unknown.
 
     Example:
     df = double_rsi(df_scan = df,fast_rsi_len= 2,slow_rsi_len= 14,rsi_threshold_low=15.0,rsi_threshold_high = 85.0,local_hl_period=5)
+    df_signals = double_rsi(df_scan = df, output = 'compact', diagnostics = ['RSI Fast']).run_scan()
     
 
     PRECONDITIONS: Input dataframe contains 'Close' column and number of rows exceeds minimum required for calculationns either triple emas, stochastic rsi or rsi.
     KJAGGS OCT 2023
     '''
 
-    def __init__(self,df_scan = None,fast_rsi_len= 2,slow_rsi_len= 14,rsi_threshold_low=15.0,rsi_threshold_high = 85.0,local_hl_period=5):
+    #column -> narrowest dtype used in compact output
+    diagnostic_dtypes = {
+        'RSI Slow': np.float32, 'RSI Fast': np.float32, 'RSI Threshold': np.int8,
+        'RSI Low Limit': bool, 'RSI High Limit': bool, 'RSI Fast Signal': np.int8,
+        'Local Max': np.float32, 'Local Min': np.float32, 'RSI Trend Min': np.float32, 'RSI Trend Max': np.float32,
+        'Higher High': bool, 'Higher Low': bool, 'Signal': np.int8,
+    }
+
+    def __init__(self,df_scan = None,fast_rsi_len= 2,slow_rsi_len= 14,rsi_threshold_low=15.0,rsi_threshold_high = 85.0,local_hl_period=5, output = 'full', diagnostics = None, timeframe = None, workers = None):
         
         self.df_scan = df_scan
         self.fast_rsi_len = fast_rsi_len
@@ -48,72 +62,50 @@ class double_rsi:
         self.rsi_threshold_low = rsi_threshold_low
         self.rsi_threshold_high = rsi_threshold_high
         self.local_hl_period = local_hl_period
+        self.output = output
+        self.diagnostics = diagnostics
+        self.timeframe = timeframe
+        self.workers = workers
 
-    def run_scan(self):
-         
-        #create indicators 
-        self.df_scan['RSI Slow'] = pta.rsi(close =  self.df_scan['Close'],length = self.slow_rsi_len)
-        self.df_scan['RSI Fast'] = pta.rsi(close =  self.df_scan['Close'],length = self.fast_rsi_len)
+    def graph(self, name = None):
+
+        '''
+        Scan as a strategy graph, nodes shared with other strategies are computed once when run together with run_graphs.
+        '''
+
+        graph = scan_graph(name = name or type(self).__name__)
+        close = graph.source('Close')
+
+        rsi_slow = graph.add('RSI Slow', node('rsi', close, length = self.slow_rsi_len))
+        rsi_fast = graph.add('RSI Fast', node('rsi', close, length = self.fast_rsi_len))
 
         #determine if RSI is above/below or crossing thresholds
-        self.df_scan['RSI Threshold'] = ts.indicator_threshold(column = self.df_scan['RSI Fast'], upper_threshold = self.rsi_threshold_low, lower_threshold = self.rsi_threshold_high)
-        self.df_scan['RSI Low Limit'] = self.df_scan['RSI Fast'].shift(1) < self.rsi_threshold_low
-        self.df_scan['RSI High Limit'] = self.df_scan['RSI Fast'].shift(1) > self.rsi_threshold_high
+        graph.add('RSI Threshold', node('threshold', rsi_fast, upper_threshold = self.rsi_threshold_low, lower_threshold = self.rsi_threshold_high))
+        rsi_fast_prev = node('shift', rsi_fast)
+        graph.add('RSI Low Limit', node('below_value', rsi_fast_prev, value = self.rsi_threshold_low))
+        graph.add('RSI High Limit', node('above_value', rsi_fast_prev, value = self.rsi_threshold_high))
+        rsi_fast_signal = graph.add('RSI Fast Signal', node('crossover_fixed', rsi_fast, threshold_low = self.rsi_threshold_low, threshold_high = self.rsi_threshold_high))
+
+        #pivots beyond the thresholds, then the RSI slow values at those pivots
+        pivots = node('pivot_points', rsi_fast, order = self.local_hl_period)
+        local_max = graph.add('Local Max', node('pivot_values', pivots[0], rsi_fast, threshold = self.rsi_threshold_high, side = 'high'))
+        local_min = graph.add('Local Min', node('pivot_values', pivots[1], rsi_fast, threshold = self.rsi_threshold_low, side = 'low'))
+        rsi_trend_min = graph.add('RSI Trend Min', node('where_valid', local_min, rsi_slow))
+        rsi_trend_max = graph.add('RSI Trend Max', node('where_valid', local_max, rsi_slow))
+
+        #higher low or higher high compared pivot to pivot and carried forward
+        higher_high = graph.add('Higher High', node('pivot_trend', rsi_trend_max))
+        higher_low = graph.add('Higher Low', node('pivot_trend', rsi_trend_min))
+
+        long = node('both', rsi_fast_signal, higher_low, first_value = 1, second_value = True)
+        short = node('both', rsi_fast_signal, higher_high, first_value = -1, second_value = False)
+        graph.add('Signal', node('select', long, short))
+        return graph
+
+    @profiled_scan
+    def run_scan(self):
 
-        #genrate signals
-        self.df_scan['RSI Fast Signal'] = ts.crossover_fixed(lead_col = self.df_scan['RSI Fast'], threshold_low = self.rsi_threshold_low, threshold_high = self.rsi_threshold_high)
-        
-        self.df_scan['Local Max'] = self.df_scan.iloc[argrelextrema(self.df_scan['RSI Fast'].values, np.greater, order=self.local_hl_period)[0]]['RSI Fast']
-        self.df_scan['Local Min'] = self.df_scan.iloc[argrelextrema(self.df_scan['RSI Fast'].values, np.less, order=self.local_hl_period)[0]]['RSI Fast']
-
-        self.df_scan['Local Max'] = np.where((self.df_scan['Local Max'] < self.rsi_threshold_high) & (self.df_scan['Local Max'].notna()) ,np.NaN,self.df_scan['Local Max'])
-        self.df_scan['Local Min'] = np.where((self.df_scan['Local Min'] > self.rsi_threshold_low) & (self.df_scan['Local Min'].notna()) ,np.NaN,self.df_scan['Local Min'])
-
-        #extract RSI slow values where the RSI Fast shows a crossover
-        self.df_scan['RSI Trend Min'] = np.where((self.df_scan['Local Min'].isna()) ,np.NaN,self.df_scan['RSI Slow'])
-        self.df_scan['RSI Trend Max'] = np.where((self.df_scan['Local Max'].isna()) ,np.NaN,self.df_scan['RSI Slow'])
-
-        #determine if higher low or higher high is true
-        self.df_scan['Higher High'] = False
-        self.df_scan['Higher Low'] = False
-
-        #iterative placeholders
-        rsi_low_ref = False
-        rsi_high_ref = False
-        rsi_high_first = None
-        rsi_high_second = None
-        higher_high = False
-        higher_low = False
-
-        for i, row in self.df_scan.iterrows():
-
-            if math.isnan(self.df_scan.at[i,'RSI Trend Max']) == False:
-                if rsi_high_ref == False:
-                  rsi_high_second = self.df_scan.at[i,'RSI Trend Max']
-                  rsi_high_ref = True
-                else:
-                  rsi_high_first = rsi_high_second
-                  rsi_high_second = self.df_scan.at[i,'RSI Trend Max']
-                  higher_high = rsi_high_first < rsi_high_second
-
-            if math.isnan(self.df_scan.at[i,'RSI Trend Min']) == False:
-                if rsi_low_ref == False:
-                  rsi_low_second = self.df_scan.at[i,'RSI Trend Min']
-                  rsi_low_ref = True
-                else:
-                  rsi_low_first = rsi_low_second
-                  rsi_low_second = self.df_scan.at[i,'RSI Trend Min']
-                  higher_low = rsi_low_first < rsi_low_second
-            
-            #update dataframe with current high/low status
-            self.df_scan.at[i,'Higher Low'] = higher_low            
-            self.df_scan.at[i,'Higher High'] = higher_high
-
-        #signal conditions
-        self.df_scan['Signal'] = 0
-        conditions = [(self.df_scan['RSI Fast Signal'] == 1) & (self.df_scan['Higher Low'] == True), (self.df_scan['RSI Fast Signal'] == -1)&  (self.df_scan['Higher High'] == False)]
-        values = [1, -1]
-
-        self.df_scan['Signal'] = np.select(conditions, values, 0)
-        
-        return self.df_scan
\ No newline at end of file
+        #on a higher timeframe the scan runs on resampled bars and out broadcasts each column back
+        df, bins = scan_bars(df = self.df_scan, timeframe = self.timeframe)
+        out = scan_output(df = self.df_scan, output = self.output, diagnostics = self.diagnostics, dtypes = self.diagnostic_dtypes, bins = bins, workers = self.workers)
+        return out.run(graph = self.graph(), df_scan = df)
@@ -0,0 +1,109 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from trade_strat.indicators.streaming import rsi_stream
+from trade_strat.signals.pivots import pivot_detector
+from trade_strat.signals.streaming import crossover_fixed_stream
+
+class double_rsi_stream:
+
+    '''
+    Class to run the double_rsi scan one bar at a time for live and tick driven feeds.
+    Each new close updates both RSIs and the fast RSI threshold crossover in O(1). Local highs/lows of the fast RSI are
+    confirmed by a pivot_detector local_hl_period bars after they happen, so the higher high / higher low state only
+    uses data available at that bar. The batch run_scan marks a pivot on the bar it happens, its Higher High and
+    Higher Low columns equal this state shifted back by local_hl_period bars.
+    Long signal = RSI Fast crossing up above low threshold - higher low observed on RSI Slow between last 2 confirmed RSI Fast local minima
+    Short signal = RSI Fast crossing down below high threshold - lower high observed on RSI Slow between last 2 confirmed RSI Fast local maxima
+
+    Arguments:
+    fast_rsi_len (int): length of fast rsi -  default = 2
+    slow_rsi_len (int): length of slow rsi -  default = 14
+    rsi_threshold_low (float): value of low value crossover for long signal -  default = 15.0
+    rsi_threshold_high (float): value of high value crossunder for short signal -  default = 85.0
+    local_hl_period(int): bars either side of a local high/low, as argrelextrema order - default = 5
+    seed_data (float): optional historical array or pandas column of closes used to prime the indicators
+
+    Returns:
+    update returns the Signal for the latest bar, 1 for long, -1 for short, 0 otherwise
+    update_many returns a numpy array of signals, one per input bar
+    higher_high, higher_low and rsi_fast_signal hold the state after the latest bar
+
+    Raises:
+    None
+
+    Example:
+    scan = double_rsi_stream(fast_rsi_len= 2,slow_rsi_len= 14,rsi_threshold_low=15.0,rsi_threshold_high = 85.0,local_hl_period=5, seed_data = df['Close'])
+    signal = scan.update(new_close)
+
+    PRECONDITIONS: closes are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self,fast_rsi_len= 2,slow_rsi_len= 14,rsi_threshold_low=15.0,rsi_threshold_high = 85.0,local_hl_period=5, seed_data = None):
+
+        self.fast_rsi_len = fast_rsi_len
+        self.slow_rsi_len = slow_rsi_len
+        self.rsi_threshold_low = rsi_threshold_low
+        self.rsi_threshold_high = rsi_threshold_high
+        self.local_hl_period = local_hl_period
+
+        self.rsi_slow = rsi_stream(rsi_len=slow_rsi_len)
+        self.rsi_fast = rsi_stream(rsi_len=fast_rsi_len)
+        self.crossover = crossover_fixed_stream(threshold_low=rsi_threshold_low, threshold_high=rsi_threshold_high)
+        self.pivots = pivot_detector(order=local_hl_period)
+
+        #slow rsi back to the bar a pivot is confirmed for
+        self._slow_history = deque(maxlen=local_hl_period + 1)
+        self._last_trend_max = None
+        self._last_trend_min = None
+
+        self.higher_high = False
+        self.higher_low = False
+        self.rsi_fast_signal = 0
+        self.signal = 0
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def update(self, bar):
+
+        rsi_slow = self.rsi_slow.update(bar)
+        rsi_fast = self.rsi_fast.update(bar)
+        self._slow_history.append(rsi_slow)
+
+        self.rsi_fast_signal = self.crossover.update(rsi_fast)
+
+        #only pivots beyond the thresholds count, compared pivot to pivot on the slow rsi
+        pivot = self.pivots.update(rsi_fast)
+        if pivot == 1 and self.pivots.pivot_value >= self.rsi_threshold_high:
+            trend_max = self._slow_history[0]
+            if not math.isnan(trend_max):
+                if self._last_trend_max is not None:
+                    self.higher_high = self._last_trend_max < trend_max
+                self._last_trend_max = trend_max
+        elif pivot == -1 and self.pivots.pivot_value <= self.rsi_threshold_low:
+            trend_min = self._slow_history[0]
+            if not math.isnan(trend_min):
+                if self._last_trend_min is not None:
+                    self.higher_low = self._last_trend_min < trend_min
+                self._last_trend_min = trend_min
+
+        if self.rsi_fast_signal == 1 and self.higher_low:
+            self.signal = 1
+        elif self.rsi_fast_signal == -1 and not self.higher_high:
+            self.signal = -1
+        else:
+            self.signal = 0
+
+        return self.signal
+
+    def update_many(self, data):
+
+        data = np.asarray(data, dtype=float)
+        out = np.zeros(data.shape[0], dtype=int)
+        for i, bar in enumerate(data.tolist()):
+            out[i] = self.update(bar)
+        return out
@@ -0,0 +1,112 @@
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+from trade_strat.graph.executor import graph_executor
+from trade_strat.profiling import profile_stage
+from trade_strat.timeframe.resample import timeframe_bins
+
+pd = lazy_module('pandas')
+
+class scan_output:
+
+    '''
+    Class to collect the columns produced by a strategy scan.
+    In full mode each column is written into the input dataframe as it is produced, as the strategies always have.
+    In compact mode the input dataframe is left untouched. Only the Signal column (int8) and the requested diagnostic
+    columns are kept, each cast to its narrowest dtype as it is added so the float64 original can be released.
+
+    Arguments:
+    df (pandas dataframe): input dataframe of the scan, updated in full mode, only its index is used in compact mode
+    output (str): 'full' or 'compact' - default 'full'
+    diagnostics (list): column names kept alongside Signal in compact mode - default None, Signal only
+    dtypes (dict): column name -> compact dtype for every column the strategy can produce
+    bins (timeframe_bins): set when the scan runs on higher timeframe bars, each column is broadcast back onto the
+    input index without lookahead and Signal fires once, on the first base bar after the higher timeframe bar completes - default None
+    workers (int): threads computing independent indicators of the scan at the same time, see graph_executor - default None
+
+    Returns:
+    result returns the updated input dataframe in full mode
+    or a new dataframe on the input index with Signal followed by the diagnostics in compact mode
+
+    Raises:
+    ValueError if output is not 'full' or 'compact', or a diagnostic column is not produced by the strategy.
+
+    Example:
+    out = scan_output(df = df, output = 'compact', diagnostics = ['EMA GRAD'], dtypes = {'EMA GRAD': np.int8, 'Signal': np.int8})
+    out.add('EMA GRAD', ema_grad)
+    df_signals = out.result()
+
+    PRECONDITIONS: every array added has one value per row of the input dataframe.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, df = None, output = 'full', diagnostics = None, dtypes = None, bins = None, workers = None):
+
+        if output not in ('full', 'compact'):
+            raise ValueError(f"output must be 'full' or 'compact', got {output!r}")
+
+        diagnostics = list(diagnostics or [])
+        unknown = [name for name in diagnostics if name not in dtypes]
+        if unknown:
+            raise ValueError(f"unknown diagnostic columns {unknown}, available: {sorted(dtypes)}")
+
+        self.df = df
+        self.output = output
+        self.diagnostics = diagnostics
+        self.dtypes = dtypes
+        self.bins = bins
+        self.workers = workers
+        self.columns = {}
+
+    def add(self, name, values):
+
+        with profile_stage('assign'):
+            if self.output == 'compact' and name != 'Signal' and name not in self.diagnostics:
+                return
+            if self.bins is not None:
+                values = self.bins.broadcast(values = values, event = name == 'Signal')
+            if self.output == 'full':
+                self.df[name] = values
+            else:
+                self.columns[name] = np.asarray(values).astype(self.dtypes[name], copy=False)
+
+    def keep(self, columns = None):
+
+        '''
+        Columns of a strategy that are stored, every column in full mode, Signal and the diagnostics in compact mode.
+        '''
+
+        return [name for name in columns if self.output == 'full' or name == 'Signal' or name in self.diagnostics]
+
+    def run(self, graph = None, df_scan = None):
+
+        '''
+        Execute a strategy graph on df_scan, adding its columns in declared order, and return the result.
+        Nodes that only feed columns which are not stored are never computed.
+        '''
+
+        def emit(name, column, values):
+            self.add(column, values)
+
+        graph_executor(graphs = [graph], columns = {graph.name: self.keep(graph.outputs)}, workers = self.workers).run(df_scan = df_scan, emit = emit)
+        return self.result()
+
+    def result(self):
+
+        if self.output == 'full':
+            return self.df
+
+        with profile_stage('assign') as st:
+            names = [name for name in dict.fromkeys(['Signal'] + self.diagnostics) if name in self.columns]
+            return st.record(pd.DataFrame({name: self.columns.pop(name) for name in names}, index=self.df.index, copy=False))
+
+def scan_bars(df = None, timeframe = None):
+    '''
+    Bars a strategy scans and the timeframe_bins that map its results back onto df.
+    Without a timeframe df is scanned as it is and no bins are returned.
+    '''
+    if timeframe is None:
+        return df, None
+    with profile_stage('resample') as st:
+        bins = timeframe_bins(index = df.index, timeframe = timeframe)
+        return st.record(bins.resample(df_scan = df)), bins
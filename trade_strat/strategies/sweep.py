@@ -0,0 +1,105 @@
+from itertools import product
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+from trade_strat.indicators.batch import ema_batch, stoch_rsi_batch
+from trade_strat.profiling import profile_stage, profiled_scan
+
+pd = lazy_module('pandas')
+
+class triple_ema_stoch_rsi_sweep:
+
+    '''
+    Class to evaluate the triple_ema_stoch_rsi Signal for every combination of a parameter grid in one pass.
+    Each distinct EMA period and stochastic RSI parameter set is calculated once with the batched kernels,
+    signals for every combination are then combined from boolean matrices without building a dataframe per combination.
+    Indicators match the per combination scan to floating point tolerance, a crossover where K and D are equal
+    to within rounding can resolve differently to run_scan.
+    Long signal = all ema gradients are positive, stochastic rsi k crosses above stoch rsi d
+    Short signal = all ema gradients are negative, stochastic rsi k crosses below stoch rsi d
+
+    Arguments:
+    df_scan (pandas dataframe or numpy array): input OHLC dataframe containing Close, or an array of closes
+    stoch_lens (list of int): lengths of stochastic to test
+    stochrsi_lengths (list of int): lengths of rsi within stochastic to test
+    stoch_ks (list of int): lengths of stochatsic k parameter to test
+    stoch_ds (list of int): lengths of stochatsic d parameter to test
+    ema_slow_lens (list of int): slow exponential moving average lengths to test
+    ema_med_lens (list of int): medium exponential moving average lengths to test
+    ema_fast_lens (list of int): fast exponential moving average lengths to test
+    chunk_size (int): number of combinations combined per vectorised step, bounds temporary memory - default 256
+
+    Returns:
+    Tuple of (signals, params)
+    signals - numpy int8 array of shape (bars, combinations), 1 for long, -1 for short
+    params - pandas dataframe with one row per combination, row i describes signals[:, i]
+
+    Raises:
+    None
+
+    Example:
+    signals, params = triple_ema_stoch_rsi_sweep(df_scan = df, stoch_lens = [14], stochrsi_lengths = [14], stoch_ks = [3], stoch_ds = [3], ema_slow_lens = [100, 200], ema_med_lens = [50], ema_fast_lens = [9, 21]).run_scan()
+
+    PRECONDITIONS: Close contains no NaN and number of rows exceeds the longest parameter in the grid.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self,df_scan = None,stoch_lens = None,stochrsi_lengths = None,stoch_ks = None,stoch_ds = None,ema_slow_lens = None,ema_med_lens = None,ema_fast_lens = None,chunk_size = 256):
+
+        self.df = df_scan
+        self.stoch_lens = list(stoch_lens)
+        self.stochrsi_lengths = list(stochrsi_lengths)
+        self.stoch_ks = list(stoch_ks)
+        self.stoch_ds = list(stoch_ds)
+        self.ema_slow_lens = list(ema_slow_lens)
+        self.ema_med_lens = list(ema_med_lens)
+        self.ema_fast_lens = list(ema_fast_lens)
+        self.chunk_size = chunk_size
+
+    @profiled_scan
+    def run_scan(self):
+
+        close = self.df['Close'] if isinstance(self.df, pd.DataFrame) else self.df
+        close = np.asarray(close, dtype=float)
+        n = close.shape[0]
+
+        #ema gradient direction for every distinct period, first row has no gradient
+        ema_periods = sorted(set(self.ema_slow_lens + self.ema_med_lens + self.ema_fast_lens))
+        with profile_stage('ema') as st:
+            ema_grad = np.full((n, len(ema_periods)), np.nan)
+            ema_grad[1:] = np.diff(ema_batch(data_col = close, ema_periods = ema_periods), axis = 0)
+            grad_pos = ema_grad >= 0
+            grad_neg = ema_grad < 0
+            st.record((grad_pos, grad_neg))
+            del ema_grad
+
+        #stoch rsi k/d crossover for every distinct parameter set
+        stoch_params = list(product(self.stoch_lens, self.stochrsi_lengths, self.stoch_ks, self.stoch_ds))
+        with profile_stage('stochrsi') as st:
+            srsik, srsid = stoch_rsi_batch(data_col = close, stoch_params = stoch_params)
+            crossover = np.zeros((n, len(stoch_params)), dtype=np.int8)
+            crossover[1:] = np.diff((srsik > srsid).astype(np.int8), axis = 0)
+            cross_up = crossover == 1
+            cross_down = crossover == -1
+            st.record((cross_up, cross_down))
+            del srsik, srsid, crossover
+
+        combos = list(product(self.ema_slow_lens, self.ema_med_lens, self.ema_fast_lens, range(len(stoch_params))))
+        slow_idx = np.array([ema_periods.index(c[0]) for c in combos], dtype=np.intp)
+        med_idx = np.array([ema_periods.index(c[1]) for c in combos], dtype=np.intp)
+        fast_idx = np.array([ema_periods.index(c[2]) for c in combos], dtype=np.intp)
+        stoch_idx = np.array([c[3] for c in combos], dtype=np.intp)
+
+        with profile_stage('signal') as st:
+            signals = st.record(np.empty((n, len(combos)), dtype=np.int8))
+            for start in range(0, len(combos), self.chunk_size):
+                cols = slice(start, start + self.chunk_size)
+                long = grad_pos[:, slow_idx[cols]] & grad_pos[:, med_idx[cols]] & grad_pos[:, fast_idx[cols]] & cross_up[:, stoch_idx[cols]]
+                short = grad_neg[:, slow_idx[cols]] & grad_neg[:, med_idx[cols]] & grad_neg[:, fast_idx[cols]] & cross_down[:, stoch_idx[cols]]
+                signals[:, cols] = long.view(np.int8) - short.view(np.int8)
+
+        params = pd.DataFrame([(c[0], c[1], c[2]) + stoch_params[c[3]] for c in combos],
+                              columns = ['ema_slow_len', 'ema_med_len', 'ema_fast_len', 'stoch_len', 'stochrsi_length', 'stoch_k', 'stoch_d'])
+
+        return signals, params
@@ -1,8 +1,10 @@
-import pandas_ta as pta
-import trade_strat as ts
-import pandas as pd
 import numpy as np
 
+from trade_strat.graph.nodes import node, scan_graph
+from trade_strat.profiling import profiled_scan
+
+from .output import scan_output, scan_bars
+
 class triple_ema_stoch_rsi:
 
     '''
@@ -26,23 +28,37 @@ class triple_ema_stoch_rsi:
     rsi_upper (int): threshold for rsi to be above or below - typically 50
     stoch_rsi_upper (float): threshold for overbought signal
     stoch_rsi_lower (int): threhsold for oversold signal
+    output (str): 'full' adds every indicator to df_scan, 'compact' leaves df_scan untouched - default 'full'
+    diagnostics (list): indicator columns returned alongside Signal in compact mode e.g. ['EMA GRAD','Crossover'] - default None
+    timeframe (str): higher timeframe to scan on e.g. 'W' for daily df_scan, results are broadcast back onto the df_scan index without lookahead - default None
+    workers (int): threads computing independent indicators at the same time, lowers the latency of one scan on a multi core machine - default None
     
     Returns:
     Pandas dataframe - updated OHLC with the indicators generated from Arguments
     Signal column is a trade flag, 1 for long, -1 for short
+    In compact mode a new dataframe on the input index with Signal (int8) and the diagnostics in their narrowest dtypes
 
     Raises:
-    None
+    ValueError if output is not 'full' or 'compact', or a diagnostic column is unknown.
 
     Example:
     df_scan = weekly_stoch_rsi_scan(df_scan= df,stoch_len = 14,stochrsi_length=14,stoch_k = 3,stoch_d = 3,ema_slow_len = 200,ema_med_len = 50,ema_fast_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
+    df_signals = triple_ema_stoch_rsi(df_scan= df, ..., output = 'compact', diagnostics = ['EMA GRAD']).run_scan()
     
 
     PRECONDITIONS: Input dataframe contains 'Close' column and number of rows exceeds minimum required for calculationns either triple emas, stochastic rsi or rsi.
     KJAGGS SEP 2023
     '''
 
-    def __init__(self,df_scan= None,stoch_len = None,stochrsi_length=None,stoch_k = None,stoch_d = None,ema_slow_len = None,ema_med_len = None,ema_fast_len = None, rsi_len = None, rsi_upper = 50, stoch_rsi_upper = None, stoch_rsi_lower = None):
+    #column -> narrowest dtype used in compact output
+    diagnostic_dtypes = {
+        'srsik': np.float32, 'srsid': np.float32,
+        'EMA SLOW': np.float32, 'EMA MED': np.float32, 'EMA FAST': np.float32, 'RSI': np.float32,
+        'EMA GRAD': np.int8, 'Close > EMA': bool, 'RSI threshold': np.int8, 'Stoch RSI K threshold': np.int8,
+        'Crossover': np.int8, 'Signal': np.int8,
+    }
+
+    def __init__(self,df_scan= None,stoch_len = None,stochrsi_length=None,stoch_k = None,stoch_d = None,ema_slow_len = None,ema_med_len = None,ema_fast_len = None, rsi_len = None, rsi_upper = 50, stoch_rsi_upper = None, stoch_rsi_lower = None, output = 'full', diagnostics = None, timeframe = None, workers = None):
         
         self.df = df_scan
         self.stoch_len = stoch_len
@@ -56,27 +72,44 @@ class triple_ema_stoch_rsi:
         self.rsi_upper = rsi_upper
         self.stoch_rsi_upper = stoch_rsi_upper
         self.stoch_rsi_lower = stoch_rsi_lower
+        self.output = output
+        self.diagnostics = diagnostics
+        self.timeframe = timeframe
+        self.workers = workers
         
-    def run_scan(self):
-        
-        self.df[['srsik','srsid']] = pta.stochrsi(close = self.df['Close'],length = self.stoch_len,rsi_length=self.stochrsi_length,k = self.stoch_k,d = self.stoch_d)
-        self.df["EMA SLOW"] = ts.exp_moving_average(ema_period=self.ema_slow_len, data_col= self.df['Close'])
-        self.df["EMA MED"] = ts.exp_moving_average(ema_period=self.ema_med_len, data_col= self.df['Close'])
-        self.df["EMA FAST"] = ts.exp_moving_average(ema_period=self.ema_fast_len, data_col= self.df['Close'])
+    def graph(self, name = None):
 
-        self.df["RSI"] = pta.rsi(close =  self.df['Close'],length = self.rsi_len)
+        '''
+        Scan as a strategy graph, nodes shared with other strategies are computed once when run together with run_graphs.
+        '''
 
-        self.df['EMA GRAD'] = ts.grad_check(grad_array=self.df[["EMA SLOW","EMA MED","EMA FAST"]])  
-        
-        self.df['Close > EMA'] = (self.df["Close"] > self.df["EMA FAST"]).astype(int)
-        self.df['RSI threshold'] = ts.indicator_threshold(column = self.df['RSI'], upper_threshold = self.rsi_upper, lower_threshold = self.rsi_upper)
-        self.df['Stoch RSI K threshold'] = ts.indicator_threshold(column = self.df['srsik'], upper_threshold = self.stoch_rsi_upper, lower_threshold = self.stoch_rsi_lower)
-        self.df['Crossover'] = ts.crossover(self.df['srsik'],self.df['srsid'])
-        
-        self.df['Signal'] = 0
-        conditions = [(self.df['EMA GRAD'] == 1) & (self.df['Crossover'] == 1), (self.df['EMA GRAD'] == -1)&  (self.df['Crossover'] == -1)]
-        values = [1, -1]
+        graph = scan_graph(name = name or type(self).__name__)
+        close = graph.source('Close')
+
+        stoch_rsi = node('stochrsi', close, length = self.stoch_len, rsi_length = self.stochrsi_length, k = self.stoch_k, d = self.stoch_d)
+        srsik = graph.add('srsik', node('column', stoch_rsi, index = 0))
+        srsid = graph.add('srsid', node('column', stoch_rsi, index = 1))
+        ema_slow = graph.add('EMA SLOW', node('ema', close, ema_period = self.ema_slow_len))
+        ema_med = graph.add('EMA MED', node('ema', close, ema_period = self.ema_med_len))
+        ema_fast = graph.add('EMA FAST', node('ema', close, ema_period = self.ema_fast_len))
+        rsi = graph.add('RSI', node('rsi', close, length = self.rsi_len))
+
+        ema_grad = graph.add('EMA GRAD', node('grad_check', ema_slow, ema_med, ema_fast))
+        graph.add('Close > EMA', node('above', close, ema_fast))
+        graph.add('RSI threshold', node('threshold', rsi, upper_threshold = self.rsi_upper, lower_threshold = self.rsi_upper))
+        graph.add('Stoch RSI K threshold', node('threshold', srsik, upper_threshold = self.stoch_rsi_upper, lower_threshold = self.stoch_rsi_lower))
+        crossover = graph.add('Crossover', node('crossover', srsik, srsid))
 
-        self.df['Signal'] = np.select(conditions, values, 0)
+        #long when every ema rises and k crosses above d, short when every ema falls and k crosses below d
+        long = node('both', ema_grad, crossover, first_value = 1, second_value = 1)
+        short = node('both', ema_grad, crossover, first_value = -1, second_value = -1)
+        graph.add('Signal', node('select', long, short))
+        return graph
 
-        return self.df
\ No newline at end of file
+    @profiled_scan
+    def run_scan(self):
+        
+        #on a higher timeframe the scan runs on resampled bars and out broadcasts each column back
+        df, bins = scan_bars(df = self.df, timeframe = self.timeframe)
+        out = scan_output(df = self.df, output = self.output, diagnostics = self.diagnostics, dtypes = self.diagnostic_dtypes, bins = bins, workers = self.workers)
+        return out.run(graph = self.graph(), df_scan = df)
@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+
+from trade_strat.indicators.streaming import ema_stream, stoch_rsi_stream
+from trade_strat.signals.streaming import crossover_stream
+
+class triple_ema_stoch_rsi_stream:
+
+    '''
+    Class to run the triple_ema_stoch_rsi scan one bar at a time for live feeds.
+    Each new close updates the stochastic RSI, the three EMAs, the EMA gradient check and the stoch rsi crossover in O(1).
+    Signals match the Signal column of triple_ema_stoch_rsi.run_scan on the same history.
+    Long signal = all ema gradients are positive, stochastic rsi k crosses above stoch rsi d
+    Short signal = all ema gradients are negative, stochastic rsi k crosses below stoch rsi d
+
+    Arguments:
+    stoch_len (int): length of stochastic -  typically 14
+    stochrsi_length (int): length of rsi within stochastic -  typically 14
+    stoch_k (int): length of stochatsic k parameter -  typically 3
+    stoch_d (int): length of stochatsic d parameter -  typically 3
+    ema_slow_len (int): length of slow exponential moving average - suggested start point of 200
+    ema_med_len (int): length of medium exponential moving average - suggested start point of 50
+    ema_fast_len (int): length of fast exponential moving average - suggested start point of 21
+    seed_data (float): optional historical array or pandas column of closes used to prime the indicators
+
+    Returns:
+    update returns the Signal for the latest bar, 1 for long, -1 for short, 0 otherwise
+    update_many returns a numpy array of signals, one per input bar
+
+    Raises:
+    None
+
+    Example:
+    scan = triple_ema_stoch_rsi_stream(stoch_len = 14,stochrsi_length=14,stoch_k = 3,stoch_d = 3,ema_slow_len = 200,ema_med_len = 50,ema_fast_len = 21, seed_data = df['Close'])
+    signal = scan.update(new_close)
+
+    PRECONDITIONS: closes are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self,stoch_len = None,stochrsi_length=None,stoch_k = None,stoch_d = None,ema_slow_len = None,ema_med_len = None,ema_fast_len = None, seed_data = None):
+
+        self.stoch_len = stoch_len
+        self.stochrsi_length = stochrsi_length
+        self.stoch_k = stoch_k
+        self.stoch_d = stoch_d
+        self.ema_slow_len = ema_slow_len
+        self.ema_med_len = ema_med_len
+        self.ema_fast_len = ema_fast_len
+
+        self.stoch_rsi = stoch_rsi_stream(stoch_len=stoch_len, stochrsi_length=stochrsi_length, stoch_k=stoch_k, stoch_d=stoch_d)
+        self.emas = [ema_stream(ema_period=ema_slow_len), ema_stream(ema_period=ema_med_len), ema_stream(ema_period=ema_fast_len)]
+        self.crossover = crossover_stream()
+
+        self._prev_emas = [math.nan, math.nan, math.nan]
+        self.ema_grad = 0
+        self.signal = 0
+
+        if seed_data is not None:
+            self.update_many(seed_data)
+
+    def update(self, bar):
+
+        srsik, srsid = self.stoch_rsi.update(bar)
+        emas = [ema.update(bar) for ema in self.emas]
+
+        #gradient check across all emas, a NaN difference is neither positive nor negative
+        grads = [cur - prev for cur, prev in zip(emas, self._prev_emas)]
+        self._prev_emas = emas
+        if all(g >= 0 for g in grads):
+            self.ema_grad = 1
+        elif all(g < 0 for g in grads):
+            self.ema_grad = -1
+        else:
+            self.ema_grad = 0
+
+        cross = self.crossover.update(srsik, srsid)
+
+        if self.ema_grad == 1 and cross == 1:
+            self.signal = 1
+        elif self.ema_grad == -1 and cross == -1:
+            self.signal = -1
+        else:
+            self.signal = 0
+
+        return self.signal
+
+    def update_many(self, data):
+
+        data = np.asarray(data, dtype=float)
+        out = np.zeros(data.shape[0], dtype=int)
+        for i, bar in enumerate(data.tolist()):
+            out[i] = self.update(bar)
+        return out
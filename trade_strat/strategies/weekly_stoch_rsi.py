@@ -1,5 +1,9 @@
-import pandas_ta as pta
-import trade_strat as ts
+import numpy as np
+
+from trade_strat.graph.nodes import node, scan_graph
+from trade_strat.profiling import profiled_scan
+
+from .output import scan_output, scan_bars
 
 class weekly_stoch_rsi:
 
@@ -18,12 +22,17 @@ class weekly_stoch_rsi:
     rsi_len (int): length of reference rsi within stochastic -  typically 14
     stoch_rsi_upper (float): threshold for overbought signal
     stoch_rsi_lower (int): threhsold for oversold signal
+    output (str): 'full' adds every indicator to df_scan, 'compact' leaves df_scan untouched - default 'full'
+    diagnostics (list): indicator columns returned in compact mode e.g. ['Crossover'] - default None
+    timeframe (str): higher timeframe to scan on e.g. 'W' for daily df_scan, results are broadcast back onto the df_scan index without lookahead - default None
+    workers (int): threads computing independent indicators at the same time, lowers the latency of one scan on a multi core machine - default None
     
     Returns:
     Pandas dataframe - updated OHLC with the indicators generated from Arguments
+    In compact mode a new dataframe on the input index with the diagnostics in their narrowest dtypes, this scan has no Signal column
 
     Raises:
-    None
+    ValueError if output is not 'full' or 'compact', or a diagnostic column is unknown.
 
     Example:
     df_scan = weekly_stoch_rsi_scan(df_scan= df,stoch_len = 14,stochrsi_length=14,stoch_k = 3,stoch_d = 3,ema_len = 21, rsi_len = 14, stoch_rsi_upper = 80, stoch_rsi_lower = 20)
@@ -33,7 +42,13 @@ class weekly_stoch_rsi:
     KJAGGS SEP 2023
     '''
 
-    def __init__(self,df_scan= None,stoch_len = None,stochrsi_length=None,stoch_k = None,stoch_d = None,ema_len = None, rsi_len = None, stoch_rsi_upper = None, stoch_rsi_lower = None):
+    #column -> narrowest dtype used in compact output
+    diagnostic_dtypes = {
+        'srsik': np.float32, 'srsid': np.float32, 'EMA': np.float32, 'RSI': np.float32, 'EMA GRAD': np.float32,
+        'Close > EMA': bool, 'Stoch RSI K threshold': np.int8, 'Crossover': np.int8,
+    }
+
+    def __init__(self,df_scan= None,stoch_len = None,stochrsi_length=None,stoch_k = None,stoch_d = None,ema_len = None, rsi_len = None, stoch_rsi_upper = None, stoch_rsi_lower = None, output = 'full', diagnostics = None, timeframe = None, workers = None):
         
         self.df = df_scan
         self.stoch_len = stoch_len
@@ -44,16 +59,36 @@ class weekly_stoch_rsi:
         self.rsi_len = rsi_len
         self.stoch_rsi_upper = stoch_rsi_upper
         self.stoch_rsi_lower = stoch_rsi_lower
+        self.output = output
+        self.diagnostics = diagnostics
+        self.timeframe = timeframe
+        self.workers = workers
         
+    def graph(self, name = None):
+
+        '''
+        Scan as a strategy graph, nodes shared with other strategies are computed once when run together with run_graphs.
+        '''
+
+        graph = scan_graph(name = name or type(self).__name__)
+        close = graph.source('Close')
+
+        stoch_rsi = node('stochrsi', close, length = self.stoch_len, rsi_length = self.stoch_k, k = 3, d = self.stoch_d)
+        srsik = graph.add('srsik', node('column', stoch_rsi, index = 0))
+        srsid = graph.add('srsid', node('column', stoch_rsi, index = 1))
+        ema = graph.add('EMA', node('pta_ema', close, length = self.ema_len))
+        graph.add('RSI', node('rsi', close, length = self.rsi_len))
+
+        graph.add('EMA GRAD', node('diff', ema))
+        graph.add('Close > EMA', node('above', close, ema))
+        graph.add('Stoch RSI K threshold', node('threshold', srsik, upper_threshold = self.stoch_rsi_upper, lower_threshold = self.stoch_rsi_lower))
+        graph.add('Crossover', node('crossover', srsik, srsid))
+        return graph
+
+    @profiled_scan
     def run_scan(self):
-        
-        self.df[['srsik','srsid']] = pta.stochrsi(close = self.df['Close'],length = self.stoch_len,rsi_length=self.stoch_k,k = 3,d = self.stoch_d)
-        self.df["EMA"] = pta.ema(close = self.df.Close,length = self.ema_len)
-        self.df["RSI"] = pta.rsi(close =  self.df['Close'],length = self.rsi_len)
-
-        self.df["EMA GRAD"] = self.df["EMA"].diff()        
-        self.df['Close > EMA'] = (self.df["Close"] > self.df["EMA"]).astype(int)
-        self.df['Stoch RSI K threshold'] = ts.indicator_threshold(column = self.df['srsik'], upper_threshold = self.stoch_rsi_upper, lower_threshold = self.stoch_rsi_lower)
-        self.df['Crossover'] = ts.crossover(self.df['srsik'],self.df['srsid'])
-        
-        return self.df
\ No newline at end of file
+
+        #on a higher timeframe the scan runs on resampled bars and out broadcasts each column back
+        df, bins = scan_bars(df = self.df, timeframe = self.timeframe)
+        out = scan_output(df = self.df, output = self.output, diagnostics = self.diagnostics, dtypes = self.diagnostic_dtypes, bins = bins, workers = self.workers)
+        return out.run(graph = self.graph(), df_scan = df)
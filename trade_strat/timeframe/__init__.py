@@ -0,0 +1,2 @@
+from .resample import timeframe_bins, resample_ohlc, align_htf
+from .aggregator import timeframe_aggregator
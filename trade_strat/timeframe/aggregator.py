@@ -0,0 +1,136 @@
+import math
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+class timeframe_aggregator:
+
+    '''
+    Class to build higher timeframe bars one base bar at a time, for live feeds.
+    The bar currently forming is updated in O(1) by each base bar. When a base bar falls in a new higher timeframe
+    bar the forming bar is finished, kept in the cache of finished bars and returned, and a new bar starts.
+    Finished bars match resample_ohlc, and a finished bar is returned on the same base bar that
+    timeframe_bins.broadcast first makes it visible on, so streamed and batch higher timeframe filters agree.
+
+    Arguments:
+    timeframe (str): pandas frequency of the higher timeframe e.g. '4h', 'D', 'W', 'M'
+    max_bars (int): finished bars kept in the cache, oldest dropped first - default None keeps every bar
+
+    Returns:
+    update returns the finished bar as a dict (Time, Open, High, Low, Close, Volume) when the base bar starts a new one, otherwise None
+    update_many returns a numpy int8 array, 1 on the base rows that finished a bar
+    current holds the bar still forming, bars returns the finished bars as a pandas dataframe like resample_ohlc
+
+    Raises:
+    ValueError if a base bar is older than the bar currently forming.
+
+    Example:
+    weekly = timeframe_aggregator(timeframe = 'W')
+    weekly.update_many(df_scan = df_daily)
+    finished = weekly.update(timestamp, open_, high, low, close, volume)
+    if finished is not None:
+        weekly_ema.update(finished['Close'])
+
+    PRECONDITIONS: base bars are supplied oldest to newest.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, timeframe = None, max_bars = None):
+
+        self.timeframe = timeframe
+        self.offset = pd.tseries.frequencies.to_offset(timeframe)
+        self.max_bars = max_bars
+        self._finished = {field: deque(maxlen=max_bars) for field in ('Time',) + _FIELDS}
+        self.current = None
+        self._end = None
+
+    def _wall_floor(self, timestamp):
+
+        #bin_start of one timezone aware timestamp for a fixed length timeframe, without building an index
+        wall = timestamp.tz_localize(None)
+        floored = wall.floor(self.offset)
+        start = timestamp - (wall - floored)
+        if start.utcoffset() == timestamp.utcoffset():
+            return start
+        start = floored.tz_localize(timestamp.tz, nonexistent='NaT')
+        if start is pd.NaT:
+            #a skipped wall time starts at the clock change
+            start = floored.tz_localize(timestamp.tz, nonexistent='shift_backward') + pd.Timedelta(1, unit='ns')
+        return start
+
+    def _bar_bounds(self, timestamp):
+
+        #start of the bar the timestamp falls in, and the start of the next one
+        timestamp = pd.Timestamp(timestamp)
+        tz = timestamp.tz
+        if isinstance(self.offset, pd.offsets.Tick):
+            if tz is None:
+                start = timestamp.floor(self.offset)
+                return start, start + self.offset
+            #timezone aware bars are floored on wall time as in bin_start, a bar spanning a clock change or starting
+            #late because its wall time was skipped is not a fixed length, None marks its end as unknown
+            start = self._wall_floor(timestamp)
+            end = start + self.offset
+            wall = start.tz_localize(None)
+            return start, end if end.utcoffset() == start.utcoffset() and wall.floor(self.offset) == wall else None
+        period = (timestamp if tz is None else timestamp.tz_localize(None)).to_period(self.offset)
+        start, end = period.start_time, (period + 1).start_time
+        if tz is not None:
+            start, end = start.tz_localize(tz), end.tz_localize(tz)
+        return start, end
+
+    def _in_current(self, timestamp):
+
+        #base bars of a bar with an unknown end are binned one at a time, an earlier bin start is the wall clock going
+        #back over a repeated hour and the bar carries on, as in bin_start
+        return self._wall_floor(pd.Timestamp(timestamp)) <= self.current['Time']
+
+    def update(self, timestamp = None, open_ = math.nan, high = math.nan, low = math.nan, close = None, volume = 0.0):
+
+        #pandas timestamps are datetimes, only strings and numbers need converting
+        if not isinstance(timestamp, datetime):
+            timestamp = pd.Timestamp(timestamp)
+        if self.current is not None and (timestamp < self._end if self._end is not None else self._in_current(timestamp)):
+            if timestamp < self.current['Time']:
+                raise ValueError(f"base bar {timestamp} is older than the forming bar {self.current['Time']}")
+            bar = self.current
+            bar['High'] = max(bar['High'], high)
+            bar['Low'] = min(bar['Low'], low)
+            bar['Close'] = close
+            bar['Volume'] += volume
+            return None
+
+        finished = self.current
+        if finished is not None:
+            if timestamp < finished['Time']:
+                raise ValueError(f"base bar {timestamp} is older than the forming bar {finished['Time']}")
+            for field, values in self._finished.items():
+                values.append(finished[field])
+
+        start, self._end = self._bar_bounds(timestamp)
+        self.current = {'Time': start, 'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+        return finished
+
+    def update_many(self, df_scan = None):
+
+        columns = [df_scan[field].to_numpy() if field in df_scan else np.full(len(df_scan), 0.0 if field == 'Volume' else math.nan) for field in _FIELDS]
+        out = np.zeros(len(df_scan), dtype=np.int8)
+        for i, (timestamp, open_, high, low, close, volume) in enumerate(zip(df_scan.index, *[col.tolist() for col in columns])):
+            out[i] = self.update(timestamp, open_, high, low, close, volume) is not None
+        return out
+
+    def bars(self, include_current = False):
+
+        data = {field: list(values) for field, values in self._finished.items()}
+        if include_current and self.current is not None:
+            for field in data:
+                data[field].append(self.current[field])
+        times = data.pop('Time')
+        return pd.DataFrame(data, index=pd.DatetimeIndex(times))
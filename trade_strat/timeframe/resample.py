@@ -0,0 +1,184 @@
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+def bin_start(timestamps, timeframe = None):
+    '''
+    Start of the higher timeframe bar each timestamp falls in.
+    Fixed length timeframes ('15min', '4h', 'D') are floored from midnight, calendar timeframes ('W', 'W-FRI', 'M', 'Q')
+    start on the first day of their period. Timezone aware timestamps are binned on their local wall time, so a 'D' bar
+    is 23 or 25 hours long on the days the clocks change, and each pass of a repeated hour falls in its own bar for
+    timeframes of an hour or less.
+    '''
+    offset = pd.tseries.frequencies.to_offset(timeframe)
+    tz = timestamps.tz
+    if isinstance(offset, pd.offsets.Tick):
+        if tz is None:
+            return timestamps.floor(offset)
+        #floor the wall time and keep each timestamp's own utc offset, so the two passes of a repeated hour stay apart
+        wall = timestamps.tz_localize(None)
+        floored = wall.floor(offset)
+        starts = (floored - (wall - timestamps.tz_convert(None))).tz_localize('UTC').tz_convert(tz)
+        #where a clock change falls between the bin start and the timestamp the start takes the offset in force at it,
+        #and the wall clock going back over a repeated hour never reopens an earlier bin
+        moved = np.flatnonzero(starts.tz_localize(None) != floored)
+        if moved.shape[0] == 0:
+            return starts
+        utc = starts.tz_convert(None).to_numpy().copy()
+        utc[moved] = floored[moved].tz_localize(tz, nonexistent='shift_backward').tz_convert(None).to_numpy()
+        #a skipped wall time starts at the clock change, one tick after the last wall time before it, pandas
+        #shift_forward overshoots by the size of the change for some pytz zones
+        skipped = moved[floored[moved].tz_localize(tz, nonexistent='NaT').isna()]
+        utc[skipped] += np.timedelta64(1, np.datetime_data(utc.dtype)[0])
+        return pd.DatetimeIndex(np.maximum.accumulate(utc)).tz_localize('UTC').tz_convert(tz)
+
+    naive = timestamps if tz is None else timestamps.tz_localize(None)
+    starts = naive.to_period(offset).start_time
+    return starts if tz is None else starts.tz_localize(tz)
+
+class timeframe_bins:
+
+    '''
+    Class to map base bars onto higher timeframe bars, e.g. daily bars onto weeks.
+    Builds the higher timeframe OHLC with one reduction per column, and broadcasts higher timeframe values back
+    onto the base index without lookahead. A higher timeframe bar is only complete once the first base bar of the next
+    one arrives, so its values are visible from that base bar onwards. Base bars of the first higher timeframe bar
+    see nothing, and the last higher timeframe bar, which may still be forming, is never broadcast.
+    The same bars and the same visibility are produced one base bar at a time by timeframe_aggregator.
+
+    Arguments:
+    index (datetime): pandas DatetimeIndex of the base bars
+    timeframe (str): pandas frequency of the higher timeframe e.g. '4h', 'D', 'W', 'M'
+
+    Returns:
+    labels holds the start time of each higher timeframe bar, first and last the first and last base row of each
+    codes holds the higher timeframe bar number of each base row
+    resample returns the higher timeframe OHLC pandas dataframe
+    broadcast returns a numpy array with one value per base row - declare as a new pandas column
+
+    Raises:
+    ValueError if the index is not sorted oldest to newest.
+
+    Example:
+    bins = timeframe_bins(index = df.index, timeframe = 'W')
+    df_weekly = bins.resample(df_scan = df)
+    df['Weekly EMA'] = bins.broadcast(ts.exp_moving_average(ema_period = 21, data_col = df_weekly['Close']))
+
+    PRECONDITIONS: index is a DatetimeIndex with at least one bar.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, index = None, timeframe = None):
+
+        if not index.is_monotonic_increasing:
+            raise ValueError("base bars must be sorted oldest to newest")
+
+        self.index = index
+        self.timeframe = timeframe
+        starts = bin_start(index, timeframe)
+        self.n_base = len(index)
+
+        #a new higher timeframe bar begins wherever the bin start changes
+        boundary = np.empty(self.n_base, dtype=bool)
+        boundary[:1] = True
+        boundary[1:] = starts[1:] != starts[:-1]
+        self.first = np.flatnonzero(boundary)
+        self.last = np.append(self.first[1:] - 1, self.n_base - 1)
+        self.codes = np.cumsum(boundary) - 1
+        self.labels = starts[self.first]
+        self.n_bars = self.first.shape[0]
+
+    def resample(self, df_scan = None):
+
+        '''
+        Higher timeframe bars from the Open, High, Low, Close and Volume columns present in df_scan, indexed by bar start.
+        '''
+
+        data = {}
+        if 'Open' in df_scan:
+            data['Open'] = df_scan['Open'].to_numpy()[self.first]
+        if 'High' in df_scan:
+            data['High'] = np.maximum.reduceat(df_scan['High'].to_numpy(), self.first)
+        if 'Low' in df_scan:
+            data['Low'] = np.minimum.reduceat(df_scan['Low'].to_numpy(), self.first)
+        data['Close'] = df_scan['Close'].to_numpy()[self.last]
+        if 'Volume' in df_scan:
+            data['Volume'] = np.add.reduceat(df_scan['Volume'].to_numpy(), self.first)
+        return pd.DataFrame(data, index=pd.Index(self.labels, name=df_scan.index.name))
+
+    def broadcast(self, values = None, event = False):
+
+        '''
+        Value of the last completed higher timeframe bar on every base row.
+        With event = True a value is placed only on the base row it first becomes visible and every other row is 0,
+        for signal columns that should fire once rather than once per base bar.
+        Float values are NaN before the first completed bar, integer and boolean values are 0.
+        '''
+
+        values = np.asarray(values)
+        if values.shape[0] != self.n_bars:
+            raise ValueError(f"expected {self.n_bars} higher timeframe values, got {values.shape[0]}")
+        if event:
+            out = np.zeros(self.n_base, dtype=values.dtype)
+            out[self.first[1:]] = values[:-1]
+            return out
+
+        #base rows of bar b see bar b - 1, the rows of the first bar see nothing
+        out = values[np.maximum(self.codes - 1, 0)]
+        out[:self.last[0] + 1] = np.nan if values.dtype.kind in 'fc' else 0
+        return out
+
+def resample_ohlc(df_scan = None, timeframe = None):
+    '''
+    Function to build higher timeframe OHLC bars from base bars, e.g. weekly bars from daily bars.
+    Open is the first open, High the highest high, Low the lowest low, Close the last close and Volume the total
+    of the base bars in each higher timeframe bar. Columns missing from df_scan, other than Close, are skipped.
+
+    Arguments:
+    df_scan (pandas dataframe): base OHLC dataframe on a DatetimeIndex - contains Close as a minimum
+    timeframe (str): pandas frequency of the higher timeframe e.g. '4h', 'D', 'W', 'M'
+
+    Returns:
+    Pandas dataframe - one row per higher timeframe bar, indexed by the bar start time
+    The last row is built from the base bars seen so far and may still be forming
+
+    Raises:
+    ValueError if the index is not sorted oldest to newest.
+
+    Example:
+    df_weekly = resample_ohlc(df_scan = df_daily, timeframe = 'W')
+
+    PRECONDITIONS: Input dataframe is on a DatetimeIndex, prices contain no NaN.
+    KJAGGS OCT 2023
+    '''
+
+    return timeframe_bins(index = df_scan.index, timeframe = timeframe).resample(df_scan = df_scan)
+
+def align_htf(values = None, index = None, timeframe = None, event = False):
+    '''
+    Function to broadcast higher timeframe values, e.g. a weekly EMA, back onto the base bars without lookahead.
+    Each base bar gets the value of the last higher timeframe bar completed before it, a bar still forming is never used.
+
+    Arguments:
+    values (float): numpy array or pandas column with one value per higher timeframe bar, as from resample_ohlc
+    index (datetime): pandas DatetimeIndex of the base bars
+    timeframe (str): pandas frequency used to build the higher timeframe bars
+    event (bool): place each value only on the first base bar it is visible on, 0 elsewhere - default False
+
+    Returns:
+    Numpy array with one value per base bar - declare as a new pandas column
+
+    Raises:
+    ValueError if values do not have one entry per higher timeframe bar.
+
+    Example:
+    df_weekly = resample_ohlc(df_scan = df, timeframe = 'W')
+    df['Weekly Close'] = align_htf(values = df_weekly['Close'], index = df.index, timeframe = 'W')
+
+    PRECONDITIONS: values were computed on the higher timeframe bars of the same base index.
+    KJAGGS OCT 2023
+    '''
+
+    return timeframe_bins(index = index, timeframe = timeframe).broadcast(values = values, event = event)
@@ -0,0 +1,2 @@
+from .scanner import universe_scan
+from .events import signal_index
\ No newline at end of file
@@ -0,0 +1,284 @@
+import json
+import os
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+
+pd = lazy_module('pandas')
+
+MANIFEST = 'manifest.json'
+
+#event fields stored one array per field, snapshot columns are added as float32 arrays
+_FIELDS = {'symbol': np.int32, 'strategy': np.int32, 'bar': np.int64, 'time': 'datetime64[ns]', 'signal': np.int8, 'value': np.float64}
+
+def _snapshot_file(name):
+
+    return 'snap_' + name.encode('utf-8').hex() + '.npy'
+
+class signal_index:
+
+    '''
+    Class to keep the signal and pivot events of many symbols and strategies in one sparse, sorted index.
+    Dense scan results are reduced to their events: one record per non zero Signal, or per non NaN pivot value, holding
+    the symbol, timestamp, bar number, strategy, signal, pivot value and a float32 snapshot of chosen indicator columns.
+    Records are sorted by strategy, symbol and bar with an offset table per (strategy, symbol), so the latest event of every
+    symbol, the events of the last N bars and the last two pivots of every symbol are found with a few vectorised
+    lookups whatever the number of symbols. The index is saved as one .npy file per field plus a manifest and
+    loaded memory mapped.
+
+    Arguments:
+    path (str): directory the index is saved to, an index already saved there is loaded - default None keeps it in memory only
+
+    Returns:
+    latest, recent and events return a dict of numpy arrays (symbol, time, bar, bars_ago, strategy, signal, value and
+    the snapshot columns), one entry per event - pd.DataFrame(result) for a dataframe
+    rising_pivots returns a numpy array of symbol names
+
+    Raises:
+    KeyError if a strategy has no events in the index.
+    ValueError if save is called without a path.
+
+    Example:
+    index = signal_index(path = 'data/events')
+    for symbol, df in frames.items():
+        index.add(symbol, ts.double_rsi(df_scan = df).run_scan(), strategy = 'double_rsi', snapshot = ['RSI Fast'], pivots = ['RSI Trend Min'])
+    index.save()
+    longs = index.recent(strategy = 'double_rsi', signal = 1, last_bars = 5)
+    rising = index.rising_pivots(strategy = 'double_rsi RSI Trend Min')
+
+    Adding a symbol and strategy again replaces its events, so the index can be refreshed after every scan.
+
+    PRECONDITIONS: scan results are in time order, one row per bar.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, path = None):
+
+        self.path = path
+        self.symbols = []
+        self.strategies = []
+        self.snapshot = []
+        self._symbol_codes = {}
+        self._strategy_codes = {}
+        #(strategy code, symbol code) -> bars in the latest scan, and events waiting to be merged
+        self._n_bars = {}
+        self._pending = {}
+        self._events = {field: np.zeros(0, dtype=dtype) for field, dtype in _FIELDS.items()}
+        self._built = False
+
+        if path is not None and os.path.isfile(os.path.join(path, MANIFEST)):
+            self._load()
+
+    def _code(self, names, codes, name):
+
+        if name not in codes:
+            codes[name] = len(names)
+            names.append(name)
+        return codes[name]
+
+    def add(self, symbol = None, df_scan = None, strategy = None, signal_column = 'Signal', snapshot = None, pivots = None):
+
+        '''
+        Record the events of one scan result, replacing any earlier events of the same symbol and strategy.
+        Each column in pivots is recorded under the strategy name 'strategy column', its non NaN rows are the events.
+        A pandas Series is taken as the Signal column, e.g. the results of universe_scan.
+        '''
+
+        if isinstance(df_scan, pd.Series):
+            df_scan = df_scan.to_frame(signal_column)
+        snapshot = list(snapshot or [])
+        for name in snapshot:
+            if name not in self.snapshot:
+                self.snapshot.append(name)
+        times = df_scan.index
+        if isinstance(times, pd.DatetimeIndex):
+            times = (times.tz_convert('UTC').tz_localize(None) if times.tz is not None else times).to_numpy(dtype='datetime64[ns]')
+        else:
+            times = np.full(df_scan.shape[0], np.datetime64('NaT'), dtype='datetime64[ns]')
+
+        symbol_code = self._code(self.symbols, self._symbol_codes, symbol)
+        streams = [(strategy, signal_column, False)] + [(f'{strategy} {column}', column, True) for column in (pivots or [])]
+        for name, column, is_pivot in streams:
+            values = df_scan[column].to_numpy()
+            rows = np.flatnonzero(~np.isnan(values)) if is_pivot else np.flatnonzero(values)
+            strategy_code = self._code(self.strategies, self._strategy_codes, name)
+            events = {
+                'symbol': np.full(rows.shape[0], symbol_code, dtype=np.int32),
+                'strategy': np.full(rows.shape[0], strategy_code, dtype=np.int32),
+                'bar': rows.astype(np.int64),
+                'time': times[rows],
+                'signal': np.zeros(rows.shape[0], dtype=np.int8) if is_pivot else values[rows].astype(np.int8),
+                'value': values[rows].astype(np.float64) if is_pivot else np.full(rows.shape[0], np.nan),
+            }
+            for snap in snapshot:
+                events[snap] = df_scan[snap].to_numpy(dtype=np.float32)[rows]
+            self._pending[(strategy_code, symbol_code)] = events
+            self._n_bars[(strategy_code, symbol_code)] = df_scan.shape[0]
+        self._built = False
+
+    def _build(self):
+
+        '''
+        Merge pending events and sort by strategy, symbol and bar, then rebuild the offset table.
+        '''
+
+        if self._built:
+            return
+
+        n_symbols = len(self.symbols)
+        events = self._events
+        if self._pending:
+            replaced = np.array([strategy * n_symbols + symbol for strategy, symbol in self._pending], dtype=np.int64)
+            keep = ~np.isin(events['strategy'].astype(np.int64) * n_symbols + events['symbol'], replaced)
+            parts = [{field: values[keep] for field, values in events.items()}] + list(self._pending.values())
+            events = {}
+            for field in list(_FIELDS) + self.snapshot:
+                events[field] = np.concatenate([part[field] if field in part else np.full(part['bar'].shape[0], np.nan, dtype=np.float32) for part in parts])
+            self._pending = {}
+
+        group = events['strategy'].astype(np.int64) * n_symbols + events['symbol']
+        order = np.lexsort((events['bar'], group))
+        self._events = {field: values[order] for field, values in events.items()}
+        self._group = group[order]
+        #group in the high bits and bar in the low bits, sorted the same way as the events
+        self._keys = (self._group << 32) | self._events['bar']
+
+        n_groups = len(self.strategies) * n_symbols
+        self._offsets = np.searchsorted(self._group, np.arange(n_groups + 1))
+        self._bars = np.zeros(n_groups, dtype=np.int64)
+        for (strategy, symbol), n_bars in self._n_bars.items():
+            self._bars[strategy * n_symbols + symbol] = n_bars
+        self._symbol_names = np.asarray(self.symbols, dtype=object)
+        self._strategy_names = np.asarray(self.strategies, dtype=object)
+        self._built = True
+
+    def _groups(self, strategy, symbols):
+
+        #(strategy, symbol) groups to search
+        if strategy not in self._strategy_codes:
+            raise KeyError(f"no events for strategy {strategy!r}, available: {self.strategies}")
+        n_symbols = len(self.symbols)
+        codes = np.arange(n_symbols, dtype=np.int64) if symbols is None else np.array([self._symbol_codes[symbol] for symbol in symbols if symbol in self._symbol_codes], dtype=np.int64)
+        return self._strategy_codes[strategy] * n_symbols + codes
+
+    def _records(self, rows):
+
+        events = self._events
+        group = self._group[rows]
+        out = {
+            'symbol': self._symbol_names[events['symbol'][rows]],
+            'time': events['time'][rows],
+            'bar': events['bar'][rows],
+            'bars_ago': self._bars[group] - 1 - events['bar'][rows],
+            'strategy': self._strategy_names[events['strategy'][rows]],
+            'signal': events['signal'][rows],
+            'value': events['value'][rows],
+        }
+        for name in self.snapshot:
+            out[name] = events[name][rows]
+        return out
+
+    def latest(self, strategy = None, signal = None, symbols = None):
+
+        '''
+        Most recent event of each symbol for a strategy, optionally only where that event is the given signal.
+        '''
+
+        self._build()
+        groups = self._groups(strategy, symbols)
+        ends = self._offsets[groups + 1]
+        rows = ends[ends > self._offsets[groups]] - 1
+        if signal is not None:
+            rows = rows[self._events['signal'][rows] == signal]
+        return self._records(rows)
+
+    def recent(self, strategy = None, signal = None, last_bars = 1, symbols = None):
+
+        '''
+        Every event of a strategy in the last last_bars bars of each symbol's latest scan, oldest first per symbol.
+        '''
+
+        self._build()
+        groups = self._groups(strategy, symbols)
+        first_bar = np.maximum(self._bars[groups] - last_bars, 0)
+        starts = np.searchsorted(self._keys, (groups << 32) | first_bar)
+        ends = self._offsets[groups + 1]
+        lengths = np.maximum(ends - starts, 0)
+
+        #row numbers of every range, without a python loop
+        total = int(lengths.sum())
+        rows = np.arange(total) + np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        if signal is not None:
+            rows = rows[self._events['signal'][rows] == signal]
+        return self._records(rows)
+
+    def events(self, strategy = None, symbol = None):
+
+        '''
+        Every event of one symbol for a strategy, oldest first.
+        '''
+
+        self._build()
+        group = self._groups(strategy, [symbol])
+        if group.shape[0] == 0:
+            return self._records(np.zeros(0, dtype=np.int64))
+        return self._records(np.arange(self._offsets[group[0]], self._offsets[group[0] + 1]))
+
+    def rising_pivots(self, strategy = None, symbols = None):
+
+        '''
+        Symbols whose last pivot is higher than the one before it, for a pivot stream 'strategy column'.
+        '''
+
+        self._build()
+        groups = self._groups(strategy, symbols)
+        ends = self._offsets[groups + 1]
+        ends = ends[ends - self._offsets[groups] >= 2]
+        value = self._events['value']
+        rows = ends[value[ends - 2] < value[ends - 1]] - 1
+        return self._symbol_names[self._events['symbol'][rows]]
+
+    def save(self):
+
+        '''
+        Write every field as a .npy file and the manifest last, so a crash never leaves a manifest pointing at partial files.
+        '''
+
+        if self.path is None:
+            raise ValueError("signal_index has no path to save to")
+        self._build()
+        os.makedirs(self.path, exist_ok=True)
+
+        files = {field: f'{field}.npy' for field in _FIELDS}
+        files.update({name: _snapshot_file(name) for name in self.snapshot})
+        for field, file_name in files.items():
+            path = os.path.join(self.path, file_name)
+            values = self._events[field]
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, values.view(np.int64) if field == 'time' else values)
+            os.replace(path + '.tmp', path)
+
+        manifest = {'version': 1, 'symbols': self.symbols, 'strategies': self.strategies, 'snapshot': self.snapshot,
+                    'n_bars': [[strategy, symbol, n_bars] for (strategy, symbol), n_bars in self._n_bars.items()]}
+        path = os.path.join(self.path, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def _load(self):
+
+        with open(os.path.join(self.path, MANIFEST)) as f:
+            manifest = json.load(f)
+        self.symbols = manifest['symbols']
+        self.strategies = manifest['strategies']
+        self.snapshot = manifest['snapshot']
+        self._symbol_codes = {name: code for code, name in enumerate(self.symbols)}
+        self._strategy_codes = {name: code for code, name in enumerate(self.strategies)}
+        self._n_bars = {(strategy, symbol): n_bars for strategy, symbol, n_bars in manifest['n_bars']}
+
+        files = {field: f'{field}.npy' for field in _FIELDS}
+        files.update({name: _snapshot_file(name) for name in self.snapshot})
+        self._events = {field: np.load(os.path.join(self.path, file_name), mmap_mode='r') for field, file_name in files.items()}
+        self._events['time'] = self._events['time'].view('datetime64[ns]')
+        self._built = False
@@ -0,0 +1,212 @@
+import inspect
+import math
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from trade_strat._lazy import lazy_module
+from trade_strat.profiling import active_sink, enable_profiling, profile_scan, profile_stage
+
+pd = lazy_module('pandas')
+
+#per worker handles to the shared input and output blocks, set by _attach_shared
+_worker_blocks = {}
+
+def _attach_shared(input_name, output_name, n_rows, n_cols, profile_sink = None):
+    '''
+    Process pool initializer, attach to the shared blocks once per worker process.
+    A profile sink that can be shared across processes switches profiling on in the worker.
+    '''
+    if profile_sink is not None:
+        enable_profiling(sink = profile_sink)
+
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+
+    _worker_blocks['input_shm'] = input_shm
+    _worker_blocks['output_shm'] = output_shm
+    _worker_blocks['inputs'] = np.ndarray((n_cols, n_rows), dtype=np.float64, buffer=input_shm.buf)
+    _worker_blocks['signals'] = np.ndarray((n_rows,), dtype=np.int8, buffer=output_shm.buf)
+
+def _release_shared(blocks, unlink = False, raise_errors = True):
+    '''
+    Close, and unlink when asked, every shared block even if an earlier one fails. The first error is raised after
+    all are released, or dropped with raise_errors False so an error already being raised is not masked. Close raises
+    BufferError while numpy views of the block are alive, e.g. held by the frames of a traceback.
+    '''
+    first = None
+    for shm in blocks:
+        for step in ([shm.close, shm.unlink] if unlink else [shm.close]):
+            try:
+                step()
+            except Exception as e:
+                first = first or e
+    if first is not None and raise_errors:
+        raise first
+
+def _scan_batch(strategy, strategy_params, columns, batch):
+    '''
+    Run the strategy over a batch of (symbol, offset, length) slices of the shared block.
+    Signals are written straight into the shared output block, only failures are returned.
+    '''
+    inputs = _worker_blocks['inputs']
+    signals = _worker_blocks['signals']
+    errors = {}
+
+    for symbol, offset, length in batch:
+        try:
+            view = inputs[:, offset:offset + length]
+            df = pd.DataFrame({col: view[j] for j, col in enumerate(columns)}, copy=False)
+            with profile_scan(symbol = symbol):
+                df_scan = strategy(df, **strategy_params).run_scan()
+            signals[offset:offset + length] = df_scan['Signal'].to_numpy()
+        except Exception:
+            errors[symbol] = traceback.format_exc()
+
+    return errors
+
+class universe_scan:
+
+    '''
+    Class to run a strategy scan over a universe of financial instruments on a process pool.
+    Input columns for every symbol are packed once into a shared memory block, workers read them without pickling
+    and write each Signal back into a shared int8 output block. Failures are isolated per symbol.
+
+    Arguments:
+    data (dict or pandas dataframe): dict of symbol -> OHLC dataframe, or a panel dataframe with (symbol, column) MultiIndex columns
+    strategy (class): strategy class with a run_scan method that returns a Signal column e.g. ts.triple_ema_stoch_rsi
+    strategy_params (dict): keyword arguments passed to the strategy after the dataframe, output defaults to 'compact' where the strategy supports it
+    columns (list): input columns shared with the workers - default ['Close']
+    workers (int): number of worker processes - default os.cpu_count(), 1 runs in the calling process
+    batches_per_worker (int): number of symbol batches queued per worker, balances uneven history lengths - default 4
+
+    Returns:
+    Dict of symbol -> pandas Series (int8) Signal on the input index, 1 for long, -1 for short
+    Symbols that raised are left out of the result and recorded in self.errors as symbol -> traceback text
+
+    Raises:
+    KeyError if a requested column is missing from a symbol's dataframe.
+
+    Example:
+    scan = universe_scan(data = frames, strategy = ts.double_rsi, strategy_params = {'fast_rsi_len': 2, 'slow_rsi_len': 14}, workers = 8)
+    signals = scan.run_scan()
+    failed = scan.errors
+
+    Profiling records are labelled with the symbol. Worker processes only report them when a jsonl_sink is active,
+    each worker appends to the same file.
+
+    PRECONDITIONS: strategy class and parameters are picklable, strategy does not modify the input columns.
+    KJAGGS OCT 2023
+    '''
+
+    def __init__(self, data = None, strategy = None, strategy_params = None, columns = None, workers = None, batches_per_worker = 4):
+
+        if isinstance(data, pd.DataFrame):
+            data = {symbol: data[symbol] for symbol in data.columns.get_level_values(0).unique()}
+
+        self.data = data
+        self.strategy = strategy
+        self.strategy_params = dict(strategy_params or {})
+        #workers only read Signal, strategies that support it skip building the indicator columns
+        if 'output' in inspect.signature(strategy).parameters:
+            self.strategy_params.setdefault('output', 'compact')
+        self.columns = list(columns) if columns is not None else ['Close']
+        self.workers = workers or os.cpu_count() or 1
+        self.batches_per_worker = batches_per_worker
+        self.errors = {}
+
+    def _layout(self):
+        '''
+        Offset and length of every symbol inside the packed block.
+        '''
+        layout = []
+        offset = 0
+        for symbol, df in self.data.items():
+            layout.append((symbol, offset, df.shape[0]))
+            offset += df.shape[0]
+        return layout, offset
+
+    def _batches(self, layout):
+        '''
+        Split the layout into contiguous batches of roughly equal row counts.
+        '''
+        n_batches = max(1, min(len(layout), self.workers * self.batches_per_worker))
+        total_rows = sum(length for _, _, length in layout)
+        target = max(1, math.ceil(total_rows / n_batches))
+
+        batches = [[]]
+        rows = 0
+        for item in layout:
+            if rows >= target:
+                batches.append([])
+                rows = 0
+            batches[-1].append(item)
+            rows += item[2]
+        return [batch for batch in batches if batch]
+
+    def run_scan(self):
+
+        layout, n_rows = self._layout()
+        n_cols = len(self.columns)
+        self.errors = {}
+
+        input_shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * n_cols * 8))
+        output_shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows))
+        inputs = signals = None
+
+        try:
+            #pack every symbol into the shared input block
+            with profile_stage('universe pack'):
+                inputs = np.ndarray((n_cols, n_rows), dtype=np.float64, buffer=input_shm.buf)
+                for symbol, offset, length in layout:
+                    df = self.data[symbol]
+                    for j, col in enumerate(self.columns):
+                        inputs[j, offset:offset + length] = df[col].to_numpy(dtype=np.float64)
+
+            signals = np.ndarray((n_rows,), dtype=np.int8, buffer=output_shm.buf)
+            signals[:] = 0
+
+            batches = self._batches(layout)
+            init_args = (input_shm.name, output_shm.name, n_rows, n_cols)
+
+            if self.workers == 1:
+                _attach_shared(*init_args)
+                try:
+                    for batch in batches:
+                        self.errors.update(_scan_batch(self.strategy, self.strategy_params, self.columns, batch))
+                finally:
+                    _worker_blocks.pop('inputs', None)
+                    _worker_blocks.pop('signals', None)
+                    #the blocks are unlinked below, a failed close here would only hide the error of the scan
+                    _release_shared([_worker_blocks.pop('input_shm'), _worker_blocks.pop('output_shm')], raise_errors = False)
+            else:
+                sink = active_sink()
+                profile_sink = sink if getattr(sink, 'forward_to_workers', False) else None
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_shared, initargs=init_args + (profile_sink,)) as pool:
+                    futures = {pool.submit(_scan_batch, self.strategy, self.strategy_params, self.columns, batch): batch for batch in batches}
+                    for future in as_completed(futures):
+                        try:
+                            self.errors.update(future.result())
+                        except BrokenProcessPool:
+                            #a crashed worker takes its whole batch with it
+                            for symbol, _, _ in futures[future]:
+                                self.errors[symbol] = traceback.format_exc()
+
+            #copy results out of the shared block before it is released
+            results = {}
+            for symbol, offset, length in layout:
+                if symbol not in self.errors:
+                    results[symbol] = pd.Series(signals[offset:offset + length].copy(), index=self.data[symbol].index, name='Signal')
+        except BaseException:
+            #views of the blocks go before they are closed, the scan's error propagates rather than a cleanup error
+            inputs = signals = None
+            _release_shared([input_shm, output_shm], unlink = True, raise_errors = False)
+            raise
+
+        inputs = signals = None
+        _release_shared([input_shm, output_shm], unlink = True)
+        return results